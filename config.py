@@ -19,6 +19,7 @@ DEBUG_BOT_STATE_AUTO_DISABLE_ON_ALARM = False # Desabilitar HUD automaticamente
 DEBUG_PATHFINDING = False  # Ativa logs detalhados do A* quando não encontra caminho
 DEBUG_MEMORY_MAP = False  # Caro de performance, ativar apenas quando necessário
 DEBUG_GLOBAL_MAP = False  # Ativa logs quando GlobalMap tenta encontrar rotas
+MEMORY_RECORDING_FILE = None  # Caminho para gravar as leituras de memória (replay offline, utils/replay_benchmark.py). None = desligado
 
 # Obstacle & Stack Clearing
 DEBUG_OBSTACLE_CLEARING = False   # Ativa logs detalhados do obstacle clearing
@@ -74,6 +75,11 @@ SNIFFER_SERVER_IP = "135.148.27.135"  # IP do servidor OT
 # Market Intelligence - Deduplicacao de ofertas (anti-spam)
 OFFER_DEDUP_WINDOW = 300  # Segundos para considerar oferta duplicada (5 min)
 
+# Game State (core/game_state.py) - única thread que lê a memória e publica snapshots
+GAME_STATE_TICK_S = 0.05     # Intervalo do tick T1 (vitals, posição, target) - 50ms = 20Hz
+GAME_STATE_T2_EVERY = 3      # T2 (battlelist, mapa, movimento) a cada N ticks
+GAME_STATE_T3_EVERY = 10     # T3 (skills, equipamento, containers) a cada N ticks
+
 # ==============================================================================
 # GUI SETTINGS
 # ==============================================================================
@@ -567,6 +573,12 @@ BLACKSQUARE_THRESHOLD_MS = 5000       # Considerar criatura atacando se atacou h
 
 WALKABLE_COLORS = [24, 129, 121, 210, 179, 207] # Grama, Chão Padrão cinza, Chão de Dirt/Caverna, Amarelo: escada/buraco, Neve/Gelo, Deserto/Areia
 MAPS_DIRECTORY = r"c:\Users\vitor\Downloads\amera-client-latest"
+MAP_ATLAS_FILENAME = "map_atlas.bin"  # Atlas empacotado (utils/generate_atlas.py), procurado dentro de MAPS_DIRECTORY
+USE_HIERARCHICAL_PATHFINDING = True   # HPA* para rotas longas/cross-floor no get_path_multilevel (só com HPA_GRAPH_FILENAME válido)
+USE_JPS_PATHFINDING = False           # Jump Point Search no get_path same-floor (rotas 4-conexas, expande bem menos nós)
+HPA_GRAPH_FILENAME = "hpa_graph.bin"  # Grafo de clusters (utils/generate_hpa_graph.py), procurado dentro de MAPS_DIRECTORY
+CONNECTIVITY_FILENAME = "connectivity.bin"  # Labels de componentes conexas (utils/generate_connectivity.py), procurado dentro de MAPS_DIRECTORY
+LANDMARKS_FILENAME = "landmarks.bin"  # Landmarks da heurística ALT (utils/generate_landmarks.py), procurado dentro de MAPS_DIRECTORY
 
 # ==============================================================================
 # PATHFINDING CONFIG
@@ -575,6 +587,12 @@ MAPS_DIRECTORY = r"c:\Users\vitor\Downloads\amera-client-latest"
 # False = usa cache de caminho completo (mais fluido, pode dessincronizar)
 REALTIME_PATHING_ENABLED = True
 
+# Rota global calculada em background (core/route_planner.py): o cavebot segue
+# andando com o walker local enquanto o A* roda
+ASYNC_ROUTE_PLANNING = True
+ROUTE_PLANNER_WORKERS = 1             # Workers do pool (threads; cada um com um fork do GlobalMap)
+ROUTE_PLANNING_BUDGET_S = 3.0         # Tempo máximo por rota; ao estourar usa a melhor rota parcial
+
 # ==============================================================================
 # OBSTACLE CLEARING CONFIG
 # ==============================================================================
@@ -2,17 +2,63 @@
 import heapq
 import random
 
-class Node:
-    def __init__(self, x, y, parent=None, g=0, h=0):
-        self.x = x
-        self.y = y
-        self.parent = parent
-        self.g = g
-        self.h = h
-        self.f = g + h
-
-    def __lt__(self, other):
-        return self.f < other.f
+from core.map_analyzer import GRID_RADIUS, LocalCostGrid
+
+# Janela de busca: grid confiável do MapAnalyzer (raio 7) + 1 anel para destinos
+# logo fora dele (fora do grid o tile é bloqueado, só entra como destino).
+# Índice: (rel_y + SEARCH_RADIUS) * SEARCH_SIZE + (rel_x + SEARCH_RADIUS)
+SEARCH_RADIUS = GRID_RADIUS + 1
+SEARCH_SIZE = 2 * SEARCH_RADIUS + 1
+SEARCH_CELLS = SEARCH_SIZE * SEARCH_SIZE
+_START = SEARCH_RADIUS * SEARCH_SIZE + SEARCH_RADIUS
+
+# Heap de inteiros: (f * _F_SCALE) << _IDX_BITS | índice (sem objeto/tupla por push)
+_IDX_BITS = 9
+_IDX_MASK = (1 << _IDX_BITS) - 1
+_F_SCALE = 16
+
+# Heurística Manhattan otimista usando ground_speed mínimo (marble floor = 100)
+# Isso garante que a heurística nunca superestima o custo real (admissível)
+MIN_GROUND_SPEED = 100
+
+# Ordem de vizinhos de cada busca (mesma das versões anteriores)
+_STEP_ORDER = ((0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1))
+_PATH_ORDER = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1))
+
+
+def _build_adjacency(order):
+    """Por célula: tupla de (índice vizinho, rel_x, rel_y, diagonal) dentro da janela."""
+    adjacency = []
+    for i in range(SEARCH_CELLS):
+        y, x = divmod(i, SEARCH_SIZE)
+        cell = []
+        for dx, dy in order:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < SEARCH_SIZE and 0 <= ny < SEARCH_SIZE:
+                cell.append((ny * SEARCH_SIZE + nx, nx - SEARCH_RADIUS, ny - SEARCH_RADIUS, dx != 0 and dy != 0))
+        adjacency.append(tuple(cell))
+    return tuple(adjacency)
+
+
+_ADJ_STEP = _build_adjacency(_STEP_ORDER)
+_ADJ_PATH = _build_adjacency(_PATH_ORDER)
+
+# Custos do mapa de distâncias (mesma escala de trainer.get_bot_path_cost: diagonal = 3x)
+DIST_CARDINAL = 10
+DIST_DIAGONAL = 30
+
+# Human variance ±10% to break determinism: tabela pré-sorteada, percorrida a partir
+# de um offset aleatório por busca (em vez de random.uniform por aresta)
+_VARIANCE_SIZE = 4096
+_VARIANCE = [random.uniform(0.9, 1.1) for _ in range(_VARIANCE_SIZE)]
+
+
+def _cell(rel_x, rel_y):
+    """Índice da célula na janela de busca, ou -1 se fora."""
+    if -SEARCH_RADIUS <= rel_x <= SEARCH_RADIUS and -SEARCH_RADIUS <= rel_y <= SEARCH_RADIUS:
+        return (rel_y + SEARCH_RADIUS) * SEARCH_SIZE + rel_x + SEARCH_RADIUS
+    return -1
+
 
 class AStarWalker:
     def __init__(self, map_analyzer, max_depth=500, debug=False):
@@ -20,6 +66,95 @@ class AStarWalker:
         self.max_depth = max_depth
         self.debug = debug
 
+        # Buffers da busca, reutilizados entre chamadas. Em vez de limpar a cada
+        # busca, cada célula guarda a geração em que foi escrita pela última vez.
+        self._g = [0.0] * SEARCH_CELLS
+        self._parent = [-1] * SEARCH_CELLS
+        self._seen = [0] * SEARCH_CELLS     # Geração em que _g/_parent são válidos
+        self._closed = [0] * SEARCH_CELLS   # Geração em que a célula foi fechada
+        self._generation = 0
+
+        # Janela (raio 8) derivada do LocalCostGrid do snapshot atual
+        self._grid = None
+        self._walkable = bytearray(SEARCH_CELLS)
+        self._cost = [999] * SEARCH_CELLS
+        self._speed = [150] * SEARCH_CELLS
+
+        # Mapa de distâncias do player (get_path_cost), um por snapshot
+        self._distance_grid = None
+        self._distance = [float('inf')] * SEARCH_CELLS
+
+    def _sync_grid(self):
+        """Copia o grid do snapshot para a janela de busca (uma vez por snapshot)."""
+        grid = self.analyzer.get_cost_grid()
+        if grid is self._grid:
+            return
+        self._grid = grid
+        walkable = self._walkable
+        cost = self._cost
+        speed = self._speed
+        for i in range(SEARCH_CELLS):
+            y, x = divmod(i, SEARCH_SIZE)
+            gi = LocalCostGrid.index(x - SEARCH_RADIUS, y - SEARCH_RADIUS)
+            if gi < 0:
+                # Fora do grid: bloqueado, ground speed fallback (grass)
+                walkable[i] = 0
+                cost[i] = 999
+                speed[i] = 150
+            else:
+                walkable[i] = grid.walkable[gi]
+                cost[i] = grid.cost[gi]
+                speed[i] = grid.speed[gi]
+
+    def get_path_cost(self, rel_x, rel_y):
+        """
+        Custo de movimento (cardinal 10, diagonal 30) do player até o tile relativo,
+        ou float('inf') se não houver caminho dentro da janela visível.
+
+        Todos os tiles saem de um único Dijkstra por snapshot do mapa, então ranquear
+        N criaturas custa O(1) por criatura. O tile de destino pode ser não-andável
+        (mesma exceção de destino do get_full_path).
+        """
+        if rel_x == 0 and rel_y == 0:
+            return 0
+        self._sync_grid()
+        if self._distance_grid is not self._grid:
+            self._build_distance_map()
+        i = _cell(rel_x, rel_y)
+        return self._distance[i] if i >= 0 else float('inf')
+
+    def _build_distance_map(self):
+        inf = float('inf')
+        dist = self._distance
+        for i in range(SEARCH_CELLS):
+            dist[i] = inf
+        walkable = self._walkable
+        adjacency = _ADJ_PATH
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        dist[_START] = 0
+        open_list = [_START]
+        while open_list:
+            key = heappop(open_list)
+            current = key & _IDX_MASK
+            d = key >> _IDX_BITS
+            if d != dist[current]:
+                continue
+            # Tiles não andáveis só servem como destino
+            if current != _START and not walkable[current]:
+                continue
+            for nxt, _, _, is_diagonal in adjacency[current]:
+                nd = d + (DIST_DIAGONAL if is_diagonal else DIST_CARDINAL)
+                if nd < dist[nxt]:
+                    dist[nxt] = nd
+                    heappush(open_list, (nd << _IDX_BITS) | nxt)
+        self._distance_grid = self._grid
+
+    def _next_generation(self):
+        self._generation += 1
+        return self._generation
+
     def get_next_step(self, target_rel_x, target_rel_y, activate_fallback=True):
         """
         Calcula o PRIMEIRO passo (dx, dy) para chegar no destino relativo.
@@ -28,23 +163,41 @@ class AStarWalker:
         if target_rel_x == 0 and target_rel_y == 0:
             return None
 
-        start_node = Node(0, 0)
-        open_list = []
-        closed_set = set()
-        heapq.heappush(open_list, start_node)
+        self._sync_grid()
+        gen = self._next_generation()
+        g_score = self._g
+        parent = self._parent
+        seen = self._seen
+        closed = self._closed
+        walkable = self._walkable
+        cost = self._cost
+        speed = self._speed
+        adjacency = _ADJ_STEP
+        variance = _VARIANCE
+        v = random.randrange(_VARIANCE_SIZE)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        target = _cell(target_rel_x, target_rel_y)
+
+        g_score[_START] = 0.0
+        parent[_START] = -1
+        seen[_START] = gen
+        open_list = [_START]
 
         iterations = 0
         walkable_count = 0
         blocked_count = 0
+        closed_count = 0
 
         while open_list:
-            current_node = heapq.heappop(open_list)
+            current = heappop(open_list) & _IDX_MASK
 
             # Se chegamos ao destino
-            if current_node.x == target_rel_x and current_node.y == target_rel_y:
-                return self._reconstruct_first_step(current_node)
+            if current == target:
+                return self._reconstruct_first_step(target)
 
-            if (current_node.x, current_node.y) in closed_set:
+            if closed[current] == gen:
                 continue
 
             # Conta apenas nós únicos processados (não duplicatas)
@@ -52,60 +205,45 @@ class AStarWalker:
             if iterations > self.max_depth:
                 break # Evita travar se não achar caminho
 
-            closed_set.add((current_node.x, current_node.y))
+            closed[current] = gen
+            closed_count += 1
+            current_g = g_score[current]
 
             # Vizinhos (8 direções: N, S, E, W + Diagonais)
-            neighbors = [
-                (0, -1), (0, 1), (-1, 0), (1, 0),
-                (-1, -1), (-1, 1), (1, -1), (1, 1)
-            ]
-
-            for dx, dy in neighbors:
-                nx, ny = current_node.x + dx, current_node.y + dy
-
-                if (nx, ny) in closed_set:
+            for nxt, nx, ny, is_diagonal in adjacency[current]:
+                if closed[nxt] == gen:
                     continue
 
                 # --- ANÁLISE DO TILE ---
-                props = self.analyzer.get_tile_properties(nx, ny)
+                is_target_node = nxt == target
 
-                is_target_node = (nx == target_rel_x and ny == target_rel_y)
-
-                if not props['walkable'] and not is_target_node:
+                if not walkable[nxt] and not is_target_node:
                     blocked_count += 1
                     continue
 
                 walkable_count += 1
 
                 # --- CUSTO DINÂMICO BASEADO EM GROUND SPEED ---
-                # Obtém o ground speed do tile destino para cálculo de tempo real
-                ground_speed = self.analyzer.get_ground_speed(nx, ny)
-
-                # Calcula custo baseado no tempo real de travessia
-                is_diagonal = (dx != 0 and dy != 0)
-                base_move_cost = ground_speed * 3 if is_diagonal else ground_speed
-                # Human variance ±10% to break determinism
-                human_variance = random.uniform(0.9, 1.1)
-                move_cost = base_move_cost * human_variance
+                # Custo baseado no tempo real de travessia do tile destino
+                base_move_cost = speed[nxt] * 3 if is_diagonal else speed[nxt]
+                v = (v + 1) & (_VARIANCE_SIZE - 1)
+                move_cost = base_move_cost * variance[v]
 
                 # Se for o destino final, ignoramos o custo extra de "Special Tile" (Ex: Escada)
-                is_target = (nx == target_rel_x and ny == target_rel_y)
-                tile_cost = 0 if is_target else props['cost']
+                tile_cost = 0 if is_target_node else cost[nxt]
 
                 if tile_cost >= 999:
                     continue
 
-                total_cost = move_cost + tile_cost
-                new_g = current_node.g + total_cost
-
-                # Heurística Manhattan otimista usando ground_speed mínimo (marble floor = 100)
-                # Isso garante que a heurística nunca superestima o custo real (admissível)
-                MIN_GROUND_SPEED = 100
-                manhattan_dist = abs(nx - target_rel_x) + abs(ny - target_rel_y)
-                new_h = manhattan_dist * MIN_GROUND_SPEED
+                new_g = current_g + move_cost + tile_cost
+                if seen[nxt] == gen and new_g >= g_score[nxt]:
+                    continue
+                seen[nxt] = gen
+                g_score[nxt] = new_g
+                parent[nxt] = current
 
-                new_node = Node(nx, ny, current_node, new_g, new_h)
-                heapq.heappush(open_list, new_node)
+                new_h = (abs(nx - target_rel_x) + abs(ny - target_rel_y)) * MIN_GROUND_SPEED
+                heappush(open_list, (int((new_g + new_h) * _F_SCALE) << _IDX_BITS) | nxt)
 
         # DEBUG: Log quando não encontra caminho (COM MOTIVO)
         if self.debug:
@@ -115,7 +253,7 @@ class AStarWalker:
 
             if iterations > self.max_depth:
                 print(f"[A*] ⚠️ TIMEOUT: Atingiu max_depth ({self.max_depth}) sem encontrar target ({target_rel_x}, {target_rel_y})")
-                print(f"[A*]   Explored {iterations} nodes, closed_set size: {len(closed_set)}")
+                print(f"[A*]   Explored {iterations} nodes, closed_set size: {closed_count}")
             elif walkable_count == 0:
                 print(f"[A*] ⚠️ DEBUG: Nenhum tile walkable encontrado ao redor! Target: ({target_rel_x}, {target_rel_y})")
                 print(f"[A*] Tiles analisados: {blocked_count} bloqueados, {walkable_count} walkable")
@@ -125,7 +263,7 @@ class AStarWalker:
                 items = target_props.get('items', [])
 
                 print(f"[A*] ⚠️ TARGET BLOQUEADO: O tile de destino ({target_rel_x}, {target_rel_y}) é NÃO-WALKABLE!")
-                print(f"[A*]   Explored {len(closed_set)} reachable nodes antes de descobrir isso")
+                print(f"[A*]   Explored {closed_count} reachable nodes antes de descobrir isso")
 
                 if reason == 'BLOCKING_ID':
                     blocking_id = target_props.get('blocking_item_id', '?')
@@ -143,7 +281,7 @@ class AStarWalker:
                     print(f"[A*]   Target properties: {target_props}")
             else:
                 print(f"[A*] ⚠️ FAILED: Fim do open_list sem encontrar target ({target_rel_x}, {target_rel_y})")
-                print(f"[A*]   Iterations: {iterations}, closed_set size: {len(closed_set)}, walkable_count: {walkable_count}")
+                print(f"[A*]   Iterations: {iterations}, closed_set size: {closed_count}, walkable_count: {walkable_count}")
 
         # FALLBACK: Se A* não encontrou caminho, tenta dar um passo em direção ao waypoint
         # (Útil quando o target está fora do chunk visível - ex: Cavebot)
@@ -207,21 +345,19 @@ class AStarWalker:
 
     def _reconstruct_first_step(self, node):
         """Reconstrói o primeiro passo da rota planejada pelo A*."""
+        parent = self._parent
         curr = node
-        path = []
-        while curr.parent:
-            path.append(curr)
-            curr = curr.parent
+        first = -1
+        while parent[curr] != -1:
+            first = curr
+            curr = parent[curr]
 
-        if not path:
+        if first == -1:
             return None
-        # O último da lista é o filho direto do start (o primeiro passo)
-        first = path[-1]
-        return (first.x, first.y)
-    
+        # O último antes do start é o filho direto dele (o primeiro passo)
+        y, x = divmod(first, SEARCH_SIZE)
+        return (x - SEARCH_RADIUS, y - SEARCH_RADIUS)
 
-    # Adicione dentro da classe AStarWalker em core/astar_walker.py
-    
     def get_full_path(self, target_rel_x, target_rel_y):
         """
         Retorna a lista completa de passos [(dx, dy), (dx, dy)...] até o destino.
@@ -229,71 +365,534 @@ class AStarWalker:
         if target_rel_x == 0 and target_rel_y == 0:
             return []
 
-        # Usa uma lista aberta de prioridade
-        start_node = Node(0, 0)
-        open_list = []
-        heapq.heappush(open_list, start_node)
-        
-        # Dicionário para rastrear nós visitados e reconstruir caminho
-        # Key: (x,y), Value: Node
-        visited = {(0,0): start_node}
-        
+        self._sync_grid()
+        gen = self._next_generation()
+        g_score = self._g
+        parent = self._parent
+        seen = self._seen
+        walkable = self._walkable
+        speed = self._speed
+        adjacency = _ADJ_PATH
+        variance = _VARIANCE
+        v = random.randrange(_VARIANCE_SIZE)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        target = _cell(target_rel_x, target_rel_y)
+
+        # Fila de prioridade; _seen/_g/_parent rastreiam nós visitados e reconstroem o caminho
+        g_score[_START] = 0.0
+        parent[_START] = -1
+        seen[_START] = gen
+        open_list = [_START]
+
         # Limite de segurança para não travar o bot em rotas impossíveis
         iterations = 0
 
         while open_list and iterations < self.max_depth:
-            current_node = heapq.heappop(open_list)
+            key = heappop(open_list)
+            current = key & _IDX_MASK
             iterations += 1
 
             # Chegou no destino?
-            if current_node.x == target_rel_x and current_node.y == target_rel_y:
-                return self._reconstruct_path_list(current_node)
+            if current == target:
+                return self._reconstruct_path_list(target)
+
+            current_g = g_score[current]
+            y, x = divmod(current, SEARCH_SIZE)
+            h = (abs(target_rel_x - (x - SEARCH_RADIUS)) + abs(target_rel_y - (y - SEARCH_RADIUS))) * MIN_GROUND_SPEED
+            # Entrada desatualizada (nó já reinserido com G menor)
+            if current != _START and (key >> _IDX_BITS) != int((current_g + h) * _F_SCALE):
+                continue
 
             # Só expande vizinhos se não estourou o limite de custo (G)
-            if current_node.g > 200: # Exemplo de limite de custo
+            if current_g > 200: # Exemplo de limite de custo
                 continue
 
-            # Expande vizinhos (use self.neighbors que deve incluir diagonais)
-            # IMPORTANTE: Garanta que self.neighbors tenha diagonais no __init__
-            for dx, dy in [(-1,0),(1,0),(0,-1),(0,1), (-1,-1),(1,-1),(-1,1),(1,1)]:
-                nx, ny = current_node.x + dx, current_node.y + dy
-                is_target_node = (nx == target_rel_x and ny == target_rel_y)
+            # Expande vizinhos (com diagonais)
+            for nxt, nx, ny, is_diagonal in adjacency[current]:
+                is_target_node = nxt == target
                 # Verifica colisão
-                props = self.analyzer.get_tile_properties(nx, ny)
-                if not props['walkable'] and not is_target_node:
+                if not walkable[nxt] and not is_target_node:
                     continue
 
-                # Obtém o ground speed do tile destino para cálculo de tempo real
-                ground_speed = self.analyzer.get_ground_speed(nx, ny)
-
                 # Custo baseado no tempo real de travessia
-                is_diagonal = (dx != 0 and dy != 0)
-                base_move_cost = ground_speed * 3 if is_diagonal else ground_speed
-                # Human variance ±10% to break determinism
-                human_variance = random.uniform(0.9, 1.1)
-                move_cost = base_move_cost * human_variance
-                new_g = current_node.g + move_cost
-
-                if (nx, ny) not in visited or new_g < visited[(nx, ny)].g:
-                    # Heurística Manhattan otimista usando ground_speed mínimo (marble floor = 100)
-                    # Isso garante que a heurística nunca superestima o custo real (admissível)
-                    MIN_GROUND_SPEED = 100
+                base_move_cost = speed[nxt] * 3 if is_diagonal else speed[nxt]
+                v = (v + 1) & (_VARIANCE_SIZE - 1)
+                new_g = current_g + base_move_cost * variance[v]
+
+                if seen[nxt] != gen or new_g < g_score[nxt]:
+                    seen[nxt] = gen
+                    g_score[nxt] = new_g
+                    parent[nxt] = current
                     manhattan_dist = abs(target_rel_x - nx) + abs(target_rel_y - ny)
-                    h = manhattan_dist * MIN_GROUND_SPEED
-                    neighbor = Node(nx, ny, parent=current_node, g=new_g, h=h)
-                    
-                    visited[(nx, ny)] = neighbor
-                    heapq.heappush(open_list, neighbor)
+                    heappush(open_list, (int((new_g + manhattan_dist * MIN_GROUND_SPEED) * _F_SCALE) << _IDX_BITS) | nxt)
 
         return []
 
     def _reconstruct_path_list(self, node):
+        parent = self._parent
         path = []
         curr = node
-        while curr.parent:
-            dx = curr.x - curr.parent.x
-            dy = curr.y - curr.parent.y
-            path.append((dx, dy))
-            curr = curr.parent
+        while parent[curr] != -1:
+            prev = parent[curr]
+            cy, cx = divmod(curr, SEARCH_SIZE)
+            py, px = divmod(prev, SEARCH_SIZE)
+            path.append((cx - px, cy - py))
+            curr = prev
         path.reverse()
-        return path
\ No newline at end of file
+        return path
+
+
+
+# ── ChasePlanner (Moving Target D* Lite) ─────────────────────────────────
+# Tabuleiro em coordenadas absolutas (ancorado no início do chase) por onde a
+# janela do walker desliza conforme o player anda. Fora da janela o tile é
+# bloqueado, igual ao get_next_step. Custos inteiros; chave do heap:
+# ((k1 << _K2_BITS) | k2) << _BOARD_BITS | índice
+BOARD_SIZE = 64
+BOARD_CELLS = BOARD_SIZE * BOARD_SIZE
+_BOARD_BITS = 12
+_BOARD_MASK = (1 << _BOARD_BITS) - 1
+_BOARD_MARGIN = SEARCH_RADIUS + 1   # Janela inteira (+ borda) precisa caber no tabuleiro
+
+_INF = 1 << 30
+_K2_BITS = 24
+_KEY_INF = _INF << (2 * _K2_BITS + _BOARD_BITS)
+
+_BOARD_XY = tuple(divmod(i, BOARD_SIZE)[::-1] for i in range(BOARD_CELLS))
+
+
+def _build_board_adjacency():
+    adjacency = []
+    for i in range(BOARD_CELLS):
+        y, x = divmod(i, BOARD_SIZE)
+        cell = []
+        for dx, dy in _STEP_ORDER:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
+                cell.append((ny * BOARD_SIZE + nx, dx != 0 and dy != 0))
+        adjacency.append(tuple(cell))
+    return tuple(adjacency)
+
+
+_ADJ_BOARD = None
+
+
+class ChasePlanner:
+    """
+    Planejamento incremental (Moving Target D* Lite) para perseguir criaturas.
+
+    Busca para frente: raiz no player, destino no tile da criatura. g/rhs/open e
+    a árvore (parent) ficam guardados entre chamadas:
+    - criatura andou: só o tile antigo e o novo mudam de custo e km compensa a
+      troca de heurística;
+    - player andou: a raiz passa para o novo tile e só os estados fora da
+      subárvore dele são descartados (o resto continua válido, com g deslocado);
+    - snapshot do mapa mudou: só as células alteradas são reparadas.
+
+    Custos iguais aos do get_next_step (ground speed, diagonal 3x, custo do tile,
+    destino pode ser não-andável), sem a variância humana: o D* Lite precisa de
+    custos estáveis entre chamadas.
+    """
+
+    def __init__(self, walker):
+        global _ADJ_BOARD
+        if _ADJ_BOARD is None:
+            _ADJ_BOARD = _build_board_adjacency()
+
+        self.walker = walker
+
+        self._g = [_INF] * BOARD_CELLS
+        self._rhs = [_INF] * BOARD_CELLS
+        self._parent = [-1] * BOARD_CELLS
+        self._open_key = [-1] * BOARD_CELLS     # Chave atual da célula no heap (-1 = fora)
+        self._open = []
+        self._touched = []                      # Células que já receberam g/rhs finito
+        self._in_touched = bytearray(BOARD_CELLS)
+
+        # Tabuleiro com o último snapshot visto (fora da janela: bloqueado)
+        self._walkable = bytearray(BOARD_CELLS)
+        self._blocked = bytearray(b"\x01") * BOARD_CELLS
+        self._cost = [999] * BOARD_CELLS
+        self._speed = [150] * BOARD_CELLS
+
+        self._origin = None     # Posição absoluta do canto (0, 0) do tabuleiro
+        self._window = None     # Índice no tabuleiro do canto da janela atual
+        self._grid = None
+        self._start = -1
+        self._goal = -1
+        self._km = 0
+        self._h_scale = 1
+
+    def reset(self):
+        """Descarta o estado da busca (novo alvo / chase parado)."""
+        self._origin = None
+        self._grid = None
+
+    def get_next_step(self, my_x, my_y, target_rel_x, target_rel_y):
+        """
+        Primeiro passo (dx, dy) até o alvo relativo, ou None se não houver caminho
+        dentro da janela visível (o chamador decide o fallback).
+        """
+        if _cell(target_rel_x, target_rel_y) < 0 or (target_rel_x == 0 and target_rel_y == 0):
+            return None
+
+        self.walker._sync_grid()
+        start = self._board_index(my_x, my_y)
+        if start < 0:
+            self._initialize(my_x, my_y)
+            start = self._start
+        elif start != self._start and not self._move_start(start):
+            self._initialize(my_x, my_y)
+            start = self._start
+
+        sx, sy = _BOARD_XY[start]
+        goal = (sy + target_rel_y) * BOARD_SIZE + sx + target_rel_x
+        if goal != self._goal:
+            self._move_goal(goal)
+        if self.walker._grid is not self._grid and not self._sync_window(start):
+            self._initialize(my_x, my_y)
+            self._move_goal(goal)
+
+        self._compute()
+        return self._first_step()
+
+    # --- Estado -----------------------------------------------------------
+
+    def _board_index(self, abs_x, abs_y):
+        """Índice do tile no tabuleiro, ou -1 se a janela ao redor dele não cabe."""
+        if self._origin is None:
+            return -1
+        x = abs_x - self._origin[0]
+        y = abs_y - self._origin[1]
+        if _BOARD_MARGIN <= x < BOARD_SIZE - _BOARD_MARGIN and _BOARD_MARGIN <= y < BOARD_SIZE - _BOARD_MARGIN:
+            return y * BOARD_SIZE + x
+        return -1
+
+    def _initialize(self, my_x, my_y):
+        """Busca nova com o tabuleiro centrado no player."""
+        half = BOARD_SIZE // 2
+        self._origin = (my_x - half, my_y - half)
+        self._start = half * BOARD_SIZE + half
+        self._goal = -1
+        self._km = 0
+
+        g = self._g
+        rhs = self._rhs
+        parent = self._parent
+        open_key = self._open_key
+        in_touched = self._in_touched
+        for i in self._touched:
+            g[i] = _INF
+            rhs[i] = _INF
+            parent[i] = -1
+            open_key[i] = -1
+            in_touched[i] = 0
+        self._touched = []
+        self._open = []
+
+        # Fora da janela o tabuleiro já está bloqueado: limpa só a janela antiga
+        # e copia a atual
+        if self._window is not None:
+            for row in range(SEARCH_SIZE):
+                b = self._window + row * BOARD_SIZE
+                self._walkable[b:b + SEARCH_SIZE] = bytes(SEARCH_SIZE)
+                self._blocked[b:b + SEARCH_SIZE] = b"\x01" * SEARCH_SIZE
+                self._cost[b:b + SEARCH_SIZE] = [999] * SEARCH_SIZE
+                self._speed[b:b + SEARCH_SIZE] = [150] * SEARCH_SIZE
+            self._window = None
+        self._sync_window(self._start, repair=False)
+
+        # Heurística Manhattan * menor ground speed da janela: diagonal custa 3x e
+        # anda no máximo 2 de Manhattan, então continua consistente
+        self._h_scale = max(1, min(self.walker._speed))
+
+        rhs[self._start] = 0
+        self._touched.append(self._start)
+        in_touched[self._start] = 1
+        self._update_vertex(self._start)
+
+    def _move_start(self, start):
+        """
+        Player andou: a raiz passa para o novo tile. Mantém a subárvore dele e
+        descarta o resto (os g continuam deslocados pelo g do novo start, o que
+        não muda a ordem dos caminhos). Retorna False se precisa reiniciar.
+        """
+        g = self._g
+        rhs = self._rhs
+        if g[start] >= _INF or g[start] != rhs[start]:
+            return False
+
+        parent = self._parent
+        # 1 = dentro da subárvore do novo start, 2 = fora
+        mark = bytearray(BOARD_CELLS)
+        mark[start] = 1
+        parent[start] = -1
+        for i in self._touched:
+            chain = []
+            curr = i
+            while curr >= 0 and not mark[curr] and len(chain) < BOARD_CELLS:
+                chain.append(curr)
+                curr = parent[curr]
+            state = mark[curr] if curr >= 0 else 2
+            if state == 0:
+                state = 2
+            for c in chain:
+                mark[c] = state
+
+        open_key = self._open_key
+        in_touched = self._in_touched
+        kept = []
+        deleted = []
+        for i in self._touched:
+            if mark[i] == 1:
+                kept.append(i)
+            else:
+                g[i] = _INF
+                rhs[i] = _INF
+                parent[i] = -1
+                open_key[i] = -1
+                in_touched[i] = 0
+                deleted.append(i)
+        self._touched = kept
+        self._start = start
+
+        update_vertex = self._update_vertex
+        for i in deleted:
+            update_vertex(i)
+        # O start serve de passagem mesmo bloqueado (ex: player em cima do tile do
+        # alvo antigo): vizinhos que nunca tiveram g finito também precisam saber
+        for nxt, _ in _ADJ_BOARD[start]:
+            update_vertex(nxt)
+        return True
+
+    def _move_goal(self, goal):
+        """Troca o destino: só os tiles do alvo antigo e novo mudam de custo."""
+        old_goal = self._goal
+        self._goal = goal
+        if old_goal >= 0:
+            ox, oy = _BOARD_XY[old_goal]
+            gx, gy = _BOARD_XY[goal]
+            self._km += (abs(ox - gx) + abs(oy - gy)) * self._h_scale
+            self._update_vertex(old_goal)
+        self._update_vertex(goal)
+
+    def _sync_window(self, start, repair=True):
+        """
+        Copia o snapshot atual para o tabuleiro e repara as células alteradas
+        (inclusive as que saíram da janela). Retorna False se a heurística deixou
+        de ser válida (precisa reiniciar).
+        """
+        walker = self.walker
+        self._grid = walker._grid
+        walkable = self._walkable
+        blocked = self._blocked
+        cost = self._cost
+        speed = self._speed
+        w_walkable = walker._walkable
+        w_cost = walker._cost
+        w_speed = walker._speed
+        h_scale = self._h_scale
+
+        sx, sy = _BOARD_XY[start]
+        window = (sy - SEARCH_RADIUS) * BOARD_SIZE + sx - SEARCH_RADIUS
+        changed = []
+        flipped = []    # Células que passaram de bloqueadas para livres ou vice-versa
+
+        old_window = self._window
+        if old_window is not None and old_window != window:
+            # Células que saíram da janela voltam a ser bloqueadas
+            oy, ox = divmod(old_window, BOARD_SIZE)
+            ny, nx = divmod(window, BOARD_SIZE)
+            for y in range(oy, oy + SEARCH_SIZE):
+                base = y * BOARD_SIZE
+                if ny <= y < ny + SEARCH_SIZE:
+                    # Linha continua na janela: só as colunas fora dela
+                    xs = range(ox, nx) if ox < nx else range(nx + SEARCH_SIZE, ox + SEARCH_SIZE)
+                else:
+                    xs = range(ox, ox + SEARCH_SIZE)
+                for x in xs:
+                    b = base + x
+                    if walkable[b] or cost[b] != 999 or speed[b] != 150:
+                        if not blocked[b]:
+                            flipped.append(b)
+                        walkable[b] = 0
+                        blocked[b] = 1
+                        cost[b] = 999
+                        speed[b] = 150
+                        changed.append(b)
+        self._window = window
+
+        for row in range(SEARCH_SIZE):
+            b = window + row * BOARD_SIZE
+            i = row * SEARCH_SIZE
+            end_b = b + SEARCH_SIZE
+            end_i = i + SEARCH_SIZE
+            if not repair:
+                walkable[b:end_b] = w_walkable[i:end_i]
+                cost[b:end_b] = w_cost[i:end_i]
+                speed[b:end_b] = w_speed[i:end_i]
+                for j in range(SEARCH_SIZE):
+                    blocked[b + j] = not w_walkable[i + j] or w_cost[i + j] >= 999
+                continue
+            # Linha inteira igual: nada a reparar
+            if (walkable[b:end_b] == w_walkable[i:end_i] and cost[b:end_b] == w_cost[i:end_i]
+                    and speed[b:end_b] == w_speed[i:end_i]):
+                continue
+            for j in range(SEARCH_SIZE):
+                if walkable[b] != w_walkable[i] or cost[b] != w_cost[i] or speed[b] != w_speed[i]:
+                    if w_speed[i] < h_scale:
+                        return False
+                    walkable[b] = w_walkable[i]
+                    cost[b] = w_cost[i]
+                    speed[b] = w_speed[i]
+                    now_blocked = not w_walkable[i] or w_cost[i] >= 999
+                    if blocked[b] != now_blocked:
+                        flipped.append(b)
+                    blocked[b] = now_blocked
+                    changed.append(b)
+                b += 1
+                i += 1
+
+        # Custo de entrar na célula muda o rhs dela. Bloquear ou liberar a passagem
+        # muda o rhs dos vizinhos, mas só importa se a célula tem g finito (ex: o
+        # tile do alvo antigo, bloqueado na borda da janela e liberado ao andar)
+        g = self._g
+        update_vertex = self._update_vertex
+        adjacency = _ADJ_BOARD
+        for b in changed:
+            update_vertex(b)
+        for b in flipped:
+            if g[b] < _INF:
+                for nxt, _ in adjacency[b]:
+                    update_vertex(nxt)
+        return True
+
+    # --- D* Lite ----------------------------------------------------------
+
+    def _key(self, i):
+        g = self._g[i]
+        rhs = self._rhs[i]
+        k2 = g if g < rhs else rhs
+        if k2 >= _INF:
+            return _KEY_INF
+        x, y = _BOARD_XY[i]
+        gx, gy = _BOARD_XY[self._goal]
+        k1 = k2 + (abs(x - gx) + abs(y - gy)) * self._h_scale + self._km
+        return (((k1 << _K2_BITS) | k2) << _BOARD_BITS) | i
+
+    def _update_vertex(self, v):
+        g = self._g
+        rhs = self._rhs
+        if v != self._start:
+            best = _INF
+            best_u = -1
+            if v == self._goal:
+                tile_cost = 0
+            elif self._blocked[v]:
+                tile_cost = _INF
+            else:
+                tile_cost = self._cost[v]
+            if tile_cost < _INF:
+                s = self._speed[v]
+                blocked = self._blocked
+                start = self._start
+                for u, is_diagonal in _ADJ_BOARD[v]:
+                    gu = g[u]
+                    # Tiles não andáveis (inclusive o do alvo) não servem de passagem
+                    if gu >= _INF or (blocked[u] and u != start):
+                        continue
+                    new_rhs = gu + (s * 3 if is_diagonal else s) + tile_cost
+                    if new_rhs < best:
+                        best = new_rhs
+                        best_u = u
+            if best < _INF and not self._in_touched[v]:
+                self._in_touched[v] = 1
+                self._touched.append(v)
+            rhs[v] = best
+            self._parent[v] = best_u
+
+        if g[v] != rhs[v]:
+            key = self._key(v)
+            self._open_key[v] = key
+            heapq.heappush(self._open, key)
+        else:
+            self._open_key[v] = -1
+
+    def _compute(self):
+        g = self._g
+        rhs = self._rhs
+        open_key = self._open_key
+        open_list = self._open
+        goal = self._goal
+        adjacency = _ADJ_BOARD
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        update_vertex = self._update_vertex
+        key_of = self._key
+
+        # Descarta entradas desatualizadas acumuladas ao longo do chase
+        if len(open_list) > BOARD_CELLS:
+            open_list[:] = [k for k in open_list if open_key[k & _BOARD_MASK] == k]
+            heapq.heapify(open_list)
+
+        while open_list:
+            top = open_list[0]
+            u = top & _BOARD_MASK
+            # Entrada desatualizada (célula reinserida com outra chave ou já consistente)
+            if open_key[u] != top:
+                heappop(open_list)
+                continue
+            if top >= key_of(goal) and rhs[goal] == g[goal]:
+                break
+
+            heappop(open_list)
+            new_key = key_of(u)
+            if top < new_key:
+                open_key[u] = new_key
+                heappush(open_list, new_key)
+                continue
+
+            open_key[u] = -1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = _INF
+                update_vertex(u)
+            for nxt, _ in adjacency[u]:
+                update_vertex(nxt)
+
+    def _first_step(self):
+        """Volta do destino pelo predecessor de menor custo até o filho do start."""
+        g = self._g
+        blocked = self._blocked
+        speed = self._speed
+        cost = self._cost
+        start = self._start
+        goal = self._goal
+        curr = goal
+        if g[curr] >= _INF:
+            return None
+
+        for _ in range(SEARCH_CELLS):
+            tile_cost = 0 if curr == goal else cost[curr]
+            s = speed[curr]
+            best = _INF
+            best_u = -1
+            for u, is_diagonal in _ADJ_BOARD[curr]:
+                gu = g[u]
+                if gu >= _INF or (blocked[u] and u != start):
+                    continue
+                c = gu + (s * 3 if is_diagonal else s) + tile_cost
+                if c < best:
+                    best = c
+                    best_u = u
+            if best_u < 0:
+                return None
+            if best_u == start:
+                x, y = _BOARD_XY[curr]
+                sx, sy = _BOARD_XY[start]
+                return (x - sx, y - sy)
+            curr = best_u
+        return None
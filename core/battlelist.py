@@ -9,8 +9,10 @@ SEM CACHE - dados em tempo real são críticos para:
 - Visibilidade (para detectar spawn/despawn)
 """
 import struct
+import sys
 import time
-from typing import List, Optional, Callable
+from operator import itemgetter
+from typing import List, Optional, Callable, Iterable
 from config import (
     BATTLELIST_BEGIN_ADDRESS, TARGET_ID_PTR, REL_FIRST_ID,
     STEP_SIZE, MAX_CREATURES,
@@ -28,6 +30,94 @@ from core.models import Creature, Position
 # Scan Adaptativo (Early-Exit)
 INVALID_SLOT_THRESHOLD = 5  # Slots inválidos consecutivos para parar scan (battlelist é contíguo)
 
+NAME_SIZE = 32
+
+
+def _build_slot_struct(fields, size):
+    """Struct de um slot inteiro (campos na ordem dos offsets + padding) e índice campo -> posição."""
+    codes = ['<']
+    index = {}
+    cursor = 0
+    for position, (offset, code, key) in enumerate(sorted(fields)):
+        if offset > cursor:
+            codes.append(f'{offset - cursor}x')
+        codes.append(code)
+        cursor = offset + struct.calcsize('<' + code)
+        index[key] = position
+    if size > cursor:
+        codes.append(f'{size - cursor}x')
+    return struct.Struct(''.join(codes)), index
+
+
+# Layout do slot espelhando os OFFSET_* do config: um unpack_from por criatura
+_SLOT, _FIELD = _build_slot_struct([
+    (OFFSET_ID, 'I', 'id'),
+    (OFFSET_NAME, f'{NAME_SIZE}s', 'name'),
+    (OFFSET_X, 'i', 'x'),
+    (OFFSET_Y, 'i', 'y'),
+    (OFFSET_Z, 'i', 'z'),
+    (OFFSET_HP, 'i', 'hp'),
+    (OFFSET_SPEED, 'i', 'speed'),
+    (OFFSET_VISIBLE, 'i', 'visible'),
+    (OFFSET_WALK_DIRECTION, 'i', 'walk_dir'),
+    (OFFSET_MOVEMENT_STATUS, 'i', 'moving'),
+    (OFFSET_FACING_DIRECTION, 'i', 'facing'),
+    # Outfit (para detecção precisa de player vs criatura humanoid)
+    (OFFSET_OUTFIT_TYPE, 'I', 'outfit_type'),
+    (OFFSET_OUTFIT_HEAD, 'I', 'outfit_head'),
+    (OFFSET_OUTFIT_BODY, 'I', 'outfit_body'),
+    (OFFSET_OUTFIT_LEGS, 'I', 'outfit_legs'),
+    (OFFSET_OUTFIT_FEET, 'I', 'outfit_feet'),
+    # Campos adicionais (tibianic-dll structures.h)
+    (OFFSET_LIGHT, 'I', 'light'),
+    (OFFSET_LIGHT_COLOR, 'I', 'light_color'),
+    (OFFSET_BLACKSQUARE, 'I', 'blacksquare'),  # uint32_t (GetTickCount)
+    # PvP status
+    (OFFSET_SKULL, 'I', 'skull'),  # 0=none, 1=yellow, 2=green, 3=white, 4=red
+    (OFFSET_PARTY, 'I', 'party'),
+], STEP_SIZE)
+
+_ID, _NAME, _X, _Y, _Z = (_FIELD[k] for k in ('id', 'name', 'x', 'y', 'z'))
+_HP, _SPEED, _VISIBLE = (_FIELD[k] for k in ('hp', 'speed', 'visible'))
+_MOVING, _FACING, _WALK_DIR = (_FIELD[k] for k in ('moving', 'facing', 'walk_dir'))
+# Campos finais de Creature (outfit_type .. party), na ordem da dataclass
+_CREATURE_TAIL = itemgetter(*(_FIELD[k] for k in (
+    'outfit_type', 'outfit_head', 'outfit_body', 'outfit_legs', 'outfit_feet',
+    'light', 'light_color', 'blacksquare', 'skull', 'party')))
+
+# Colunas usadas nos filtros (id, z, hp, visible) saem do buffer inteiro via
+# memoryview.cast + slice com passo, sem decodificar os slots. cast() usa a
+# ordem nativa; o battlelist é little-endian.
+_NATIVE_LE = sys.byteorder == 'little'
+_COLUMNAR = _NATIVE_LE and STEP_SIZE % 4 == 0 and all(
+    offset % 4 == 0 for offset in (OFFSET_ID, OFFSET_Z, OFFSET_HP, OFFSET_VISIBLE))
+_U32 = struct.Struct('<I')
+_I32 = struct.Struct('<i')
+
+# Bytes que viram whitespace no decode latin-1 (nome só com espaços = slot inválido)
+_SPACE_BYTES = frozenset(b for b in range(256) if chr(b).isspace())
+
+
+def _columns(data, count):
+    """(ids, zs, hps, visibles) dos count primeiros slots do buffer."""
+    if _COLUMNAR:
+        step = STEP_SIZE // 4
+        signed = memoryview(data).cast('i')
+        ids = memoryview(data).cast('I')[OFFSET_ID // 4::step][:count].tolist()
+        zs = signed[OFFSET_Z // 4::step][:count].tolist()
+        hps = signed[OFFSET_HP // 4::step][:count].tolist()
+        visibles = signed[OFFSET_VISIBLE // 4::step][:count].tolist()
+        return ids, zs, hps, visibles
+    offsets = range(0, count * STEP_SIZE, STEP_SIZE)
+    return ([_U32.unpack_from(data, o + OFFSET_ID)[0] for o in offsets],
+            [_I32.unpack_from(data, o + OFFSET_Z)[0] for o in offsets],
+            [_I32.unpack_from(data, o + OFFSET_HP)[0] for o in offsets],
+            [_I32.unpack_from(data, o + OFFSET_VISIBLE)[0] for o in offsets])
+
+
+def _decode_name(raw_name: bytes) -> str:
+    return raw_name.split(b'\x00', 1)[0].decode('latin-1', errors='ignore').strip()
+
 
 class BattleListScanner:
     """
@@ -39,12 +129,22 @@ class BattleListScanner:
         self.pm = pm
         self.base_addr = base_addr
 
-    def scan_all(self, filter_fn: Optional[Callable[[Creature], bool]] = None) -> List[Creature]:
+    def scan_all(self, filter_fn: Optional[Callable[[Creature], bool]] = None,
+                 z: Optional[int] = None, alive_only: bool = False,
+                 names: Optional[Iterable[str]] = None,
+                 creature_id: Optional[int] = None) -> List[Creature]:
         """
         Scan completo do battlelist.
 
+        Os filtros por coluna (z, alive_only, names, creature_id) são aplicados
+        antes de decodificar o slot: Creature só é criada para quem passa neles.
+
         Args:
             filter_fn: Função opcional para filtrar (ex: lambda c: c.hp_percent > 0)
+            z: Apenas criaturas neste andar
+            alive_only: Apenas vivas e visíveis (Creature.is_alive)
+            names: Apenas criaturas com estes nomes (exato)
+            creature_id: Apenas a criatura com este ID
 
         Returns:
             Lista de Creature válidas
@@ -58,99 +158,75 @@ class BattleListScanner:
             # Reduz de ~255 syscalls para 1, diminuindo overhead de kernel transitions
             total_size = STEP_SIZE * MAX_CREATURES
             all_data = self.pm.read_bytes(list_start, total_size)
+            count = min(MAX_CREATURES, len(all_data) // STEP_SIZE)
+            ids, zs, hps, visibles = _columns(all_data, count)
         except Exception:
             # Fallback: se batch falhar, retorna lista vazia
             return creatures
 
-        for i in range(MAX_CREATURES):
-            try:
-                # Extrai bytes do slot do buffer já lido (sem syscall)
-                offset = i * STEP_SIZE
-                raw_bytes = all_data[offset:offset + STEP_SIZE]
-
-                creature = self._parse_creature(raw_bytes, i)
-
-                if creature is None or not creature.is_valid:
-                    invalid_streak += 1
-                    if invalid_streak >= INVALID_SLOT_THRESHOLD:
-                        break  # Early exit - fim da lista
-                    continue
+        name_set = set(names) if names else None
+        first_chars = all_data[OFFSET_NAME::STEP_SIZE]
+
+        for i in range(count):
+            # Mesmos critérios de Creature.is_valid, direto nas colunas
+            c_id, c_z, hp = ids[i], zs[i], hps[i]
+            first = first_chars[i]
+            valid = c_id != 0 and 0 <= hp <= 100 and 0 <= c_z <= 15 and first != 0
+            if valid and first in _SPACE_BYTES:
+                offset = i * STEP_SIZE + OFFSET_NAME
+                valid = bool(_decode_name(all_data[offset:offset + NAME_SIZE]))
+            if not valid:
+                invalid_streak += 1
+                if invalid_streak >= INVALID_SLOT_THRESHOLD:
+                    break  # Early exit - fim da lista
+                continue
 
-                invalid_streak = 0
+            invalid_streak = 0
 
-                # Aplica filtro se fornecido
-                if filter_fn is None or filter_fn(creature):
-                    creatures.append(creature)
+            if creature_id is not None and c_id != creature_id:
+                continue
+            if z is not None and c_z != z:
+                continue
+            if alive_only and (hp <= 0 or visibles[i] != 1):
+                continue
 
+            try:
+                creature = self._parse_slot(all_data, i, name_set)
             except Exception:
                 continue
+            if creature is None:
+                continue
+
+            # Aplica filtro se fornecido
+            if filter_fn is None or filter_fn(creature):
+                creatures.append(creature)
 
         return creatures
 
+    @staticmethod
+    def _parse_slot(data: bytes, slot_index: int, name_set=None) -> Optional[Creature]:
+        """Decodifica o slot slot_index do buffer (None se o nome não estiver em name_set)."""
+        v = _SLOT.unpack_from(data, slot_index * STEP_SIZE)
+        name = _decode_name(v[_NAME])
+        if name_set is not None and name not in name_set:
+            return None
+        # Posicional (mesma ordem dos campos de Creature): ~3x mais rápido que kwargs
+        return Creature(
+            v[_ID], name, Position(v[_X], v[_Y], v[_Z]),
+            v[_HP], v[_SPEED],
+            v[_VISIBLE] == 1, v[_MOVING] == 1,
+            v[_FACING], v[_WALK_DIR], slot_index,
+            *_CREATURE_TAIL(v)
+        )
+
     def _parse_creature(self, raw_bytes: bytes, slot_index: int) -> Optional[Creature]:
-        """Parse bytes para objeto Creature."""
+        """Parse bytes de um slot para objeto Creature."""
         try:
-            # ID está no offset 0 (4 bytes, little-endian unsigned int)
-            c_id = struct.unpack_from('<I', raw_bytes, OFFSET_ID)[0]
-            if c_id == 0:
+            if _U32.unpack_from(raw_bytes, OFFSET_ID)[0] == 0:
                 return None
-
-            # Parse nome (offset 4, até 32 bytes, null-terminated)
-            name_bytes = raw_bytes[OFFSET_NAME:OFFSET_NAME + 32]
-            name = name_bytes.split(b'\x00')[0].decode('latin-1', errors='ignore').strip()
-
-            # Parse posição
-            cx = struct.unpack_from('<i', raw_bytes, OFFSET_X)[0]
-            cy = struct.unpack_from('<i', raw_bytes, OFFSET_Y)[0]
-            cz = struct.unpack_from('<i', raw_bytes, OFFSET_Z)[0]
-
-            # Parse stats
-            hp = struct.unpack_from('<i', raw_bytes, OFFSET_HP)[0]
-            speed = struct.unpack_from('<i', raw_bytes, OFFSET_SPEED)[0]
-            visible = struct.unpack_from('<i', raw_bytes, OFFSET_VISIBLE)[0]
-            walk_dir = struct.unpack_from('<i', raw_bytes, OFFSET_WALK_DIRECTION)[0]
-            moving = struct.unpack_from('<i', raw_bytes, OFFSET_MOVEMENT_STATUS)[0]
-            facing = struct.unpack_from('<i', raw_bytes, OFFSET_FACING_DIRECTION)[0]
-
-            # Parse outfit (para detecção precisa de player vs criatura humanoid)
-            outfit_type = struct.unpack_from('<I', raw_bytes, OFFSET_OUTFIT_TYPE)[0]
-            outfit_head = struct.unpack_from('<I', raw_bytes, OFFSET_OUTFIT_HEAD)[0]
-            outfit_body = struct.unpack_from('<I', raw_bytes, OFFSET_OUTFIT_BODY)[0]
-            outfit_legs = struct.unpack_from('<I', raw_bytes, OFFSET_OUTFIT_LEGS)[0]
-            outfit_feet = struct.unpack_from('<I', raw_bytes, OFFSET_OUTFIT_FEET)[0]
-
-            # Parse campos adicionais (tibianic-dll structures.h)
-            light = struct.unpack_from('<I', raw_bytes, OFFSET_LIGHT)[0]
-            light_color = struct.unpack_from('<I', raw_bytes, OFFSET_LIGHT_COLOR)[0]
-            blacksquare = struct.unpack_from('<I', raw_bytes, OFFSET_BLACKSQUARE)[0]  # uint32_t (GetTickCount)
-
-            # Parse PvP status
-            skull = struct.unpack_from('<I', raw_bytes, OFFSET_SKULL)[0]  # 0=none, 1=yellow, 2=green, 3=white, 4=red
-            party = struct.unpack_from('<I', raw_bytes, OFFSET_PARTY)[0]
-
-            return Creature(
-                id=c_id,
-                name=name,
-                position=Position(cx, cy, cz),
-                hp_percent=hp,
-                speed=speed,
-                is_visible=(visible == 1),
-                is_moving=(moving == 1),
-                facing_direction=facing,
-                walk_direction=walk_dir,
-                slot_index=slot_index,
-                outfit_type=outfit_type,
-                outfit_head=outfit_head,
-                outfit_body=outfit_body,
-                outfit_legs=outfit_legs,
-                outfit_feet=outfit_feet,
-                light=light,
-                light_color=light_color,
-                blacksquare=blacksquare,
-                skull=skull,
-                party=party
-            )
-
+            creature = self._parse_slot(raw_bytes, 0)
+            creature.slot_index = slot_index
+            return creature
         except Exception:
             return None
 
@@ -168,18 +244,8 @@ class BattleListScanner:
 
         NOTA: NPCs aparecem no battlelist com bit 31 do ID setado (filtrados via is_npc).
         """
-        def is_valid_monster(c: Creature) -> bool:
-            if c.is_player:
-                return False
-            if not include_dead and not c.is_alive:
-                return False
-            if player_z is not None and c.position.z != player_z:
-                return False
-            if target_names and c.name not in target_names:
-                return False
-            return True
-
-        return self.scan_all(filter_fn=is_valid_monster)
+        return self.scan_all(filter_fn=lambda c: not c.is_player, z=player_z,
+                             alive_only=not include_dead, names=target_names)
 
     def get_dead_creatures(self) -> List[Creature]:
         """
@@ -196,10 +262,8 @@ class BattleListScanner:
 
     def get_creature_by_id(self, creature_id: int) -> Optional[Creature]:
         """Busca criatura específica por ID."""
-        for c in self.scan_all():
-            if c.id == creature_id:
-                return c
-        return None
+        found = self.scan_all(creature_id=creature_id)
+        return found[0] if found else None
 
     def get_nearest_monster(self, player_pos: Position,
                            target_names: List[str] = None,
@@ -235,12 +299,7 @@ class BattleListScanner:
             attack_range: Alcance de ataque
             player_z: Se fornecido, filtra apenas criaturas no mesmo andar
         """
-        def in_range_filter(c: Creature) -> bool:
-            if player_z is not None and c.position.z != player_z:
-                return False
-            return c.is_in_range(player_pos, attack_range)
-
-        return self.scan_all(filter_fn=in_range_filter)
+        return self.scan_all(filter_fn=lambda c: c.is_in_range(player_pos, attack_range), z=player_z)
 
 
 class SpawnTracker:
@@ -262,6 +321,7 @@ class SpawnTracker:
         self.floor_change_cooldown = floor_change_cooldown
         self.cleanup_age = cleanup_age
         self._warmed_up = False  # Primeiro ciclo apenas registra
+        self._present_ids = None  # IDs no battlelist segundo os deltas (None = ressincronizar)
 
     def reset(self):
         """
@@ -271,6 +331,7 @@ class SpawnTracker:
         self.known_creatures.clear()
         self._warmed_up = False
         self.last_player_z = None
+        self._present_ids = None
 
     def update(self, creatures: List[Creature], player_x: int, player_y: int, player_z: int, self_id: int = 0) -> List[Creature]:
         """
@@ -286,67 +347,120 @@ class SpawnTracker:
         """
         now = time.time()
         suspicious = []
-
-        # Detecta mudança de andar do player
-        if self.last_player_z is not None and player_z != self.last_player_z:
-            self.last_floor_change_time = now
-        self.last_player_z = player_z
-
-        recently_changed_floor = (now - self.last_floor_change_time) < self.floor_change_cooldown
+        recently_changed_floor = self._track_floor(player_z, now)
 
         # IDs presentes neste scan (para cleanup)
         current_ids = set()
 
         for creature in creatures:
             current_ids.add(creature.id)
+            if self._register_new(creature, now, player_x, player_y, player_z,
+                                  recently_changed_floor, self_id):
+                suspicious.append(creature)
 
-            # Ignora o próprio personagem
-            if creature.id == self_id:
-                continue
+        if not self._warmed_up:
+            self._warmed_up = True
 
-            # Ignora players e NPCs (apenas monstros são relevantes)
-            if creature.is_player:
-                continue
+        # Scan completo: o conjunto mantido pelos deltas deixa de valer
+        self._present_ids = None
+        self._cleanup(now, current_ids)
+        return suspicious
 
-            # Criatura já conhecida - não é suspeita
-            if creature.id in self.known_creatures:
-                continue
+    def update_from_deltas(self, deltas, snapshot, self_id: int = 0) -> List[Creature]:
+        """
+        Mesma detecção de update(), mas a partir dos CreatureDeltaEvent do
+        game_state (ver core/creature_table.py): só as criaturas em appeared
+        são avaliadas, cada uma com a posição do player no tick em que surgiu.
 
-            # Criatura nova - registra
-            self.known_creatures[creature.id] = now
+        Args:
+            deltas: CreatureDeltaFeed.drain() (None = eventos perdidos)
+            snapshot: GameSnapshot atual (warmup/ressincronização)
+            self_id: ID do próprio personagem (para excluir do tracking)
 
-            # Primeiro ciclo: apenas registra sem avaliar (warmup)
-            if not self._warmed_up:
-                continue
+        Returns:
+            Lista de Creature que apareceram suspeitamente perto
+        """
+        suspicious = []
+        if deltas is None:
+            self.reset()
+
+        if not self._warmed_up or self._present_ids is None:
+            # Registra (ou avalia, se já aquecido) o battlelist inteiro do snapshot;
+            # deltas até a versão dele já estão refletidos nessa lista
+            entities = snapshot.creatures + snapshot.players
+            pos = snapshot.player.position
+            suspicious = self.update(entities, pos.x, pos.y, pos.z, self_id=self_id)
+            self._present_ids = {creature.id for creature in entities}
+            deltas = [delta for delta in deltas or () if delta.version > snapshot.t2_version]
+
+        present_ids = self._present_ids
+        for delta in deltas:
+            pos = delta.player_position
+            now = delta.timestamp
+            recently_changed_floor = self._track_floor(pos.z, now)
+            for creature in delta.disappeared:
+                present_ids.discard(creature.id)
+            for creature in delta.appeared:
+                present_ids.add(creature.id)
+                if self._register_new(creature, now, pos.x, pos.y, pos.z,
+                                      recently_changed_floor, self_id):
+                    suspicious.append(creature)
+
+        self._cleanup(time.time(), present_ids)
+        return suspicious
 
-            # Não avalia se mudou de andar recentemente (tudo é novo)
-            if recently_changed_floor:
-                continue
+    def _track_floor(self, player_z: int, now: float) -> bool:
+        """Detecta mudança de andar do player; True se mudou há pouco (tudo é novo)."""
+        if self.last_player_z is not None and player_z != self.last_player_z:
+            self.last_floor_change_time = now
+        self.last_player_z = player_z
+        return (now - self.last_floor_change_time) < self.floor_change_cooldown
 
-            # Não avalia se criatura está em outro andar
-            if creature.position.z != player_z:
-                continue
+    def _register_new(self, creature: Creature, now: float, player_x: int, player_y: int,
+                      player_z: int, recently_changed_floor: bool, self_id: int) -> bool:
+        """Registra criatura ainda não conhecida; True se o spawn dela é suspeito."""
+        # Ignora o próprio personagem
+        if creature.id == self_id:
+            return False
 
-            # Não avalia se não está visível
-            if not creature.is_visible:
-                continue
+        # Ignora players e NPCs (apenas monstros são relevantes)
+        if creature.is_player:
+            return False
 
-            # Calcula distância Chebyshev
-            dist = max(abs(player_x - creature.position.x), abs(player_y - creature.position.y))
+        # Criatura já conhecida - não é suspeita
+        if creature.id in self.known_creatures:
+            return False
 
-            # Spawn suspeito: apareceu perto sem histórico prévio
-            if dist < self.suspicious_range:
-                suspicious.append(creature)
+        # Criatura nova - registra
+        self.known_creatures[creature.id] = now
 
+        # Primeiro ciclo: apenas registra sem avaliar (warmup)
         if not self._warmed_up:
-            self._warmed_up = True
+            return False
+
+        # Não avalia se mudou de andar recentemente (tudo é novo)
+        if recently_changed_floor:
+            return False
 
-        # Cleanup: remove criaturas que não aparecem há muito tempo
+        # Não avalia se criatura está em outro andar
+        if creature.position.z != player_z:
+            return False
+
+        # Não avalia se não está visível
+        if not creature.is_visible:
+            return False
+
+        # Calcula distância Chebyshev
+        dist = max(abs(player_x - creature.position.x), abs(player_y - creature.position.y))
+
+        # Spawn suspeito: apareceu perto sem histórico prévio
+        return dist < self.suspicious_range
+
+    def _cleanup(self, now: float, current_ids) -> None:
+        """Remove criaturas que não aparecem há muito tempo."""
         stale_ids = [
             cid for cid, ts in self.known_creatures.items()
             if cid not in current_ids and (now - ts) > self.cleanup_age
         ]
         for cid in stale_ids:
             del self.known_creatures[cid]
-
-        return suspicious
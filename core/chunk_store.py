@@ -0,0 +1,218 @@
+# core/chunk_store.py
+"""
+Store compartilhado dos chunks .map do minimapa (256x256 bytes por arquivo).
+
+O diretório é indexado em (chunk_x, chunk_y, z) -> caminho na criação, e
+chunks que o cliente salvar depois são achados no primeiro get() (stat dos dois
+nomes possíveis, com cache negativo curto). O conteúdo fica num LRU de bytes
+compartilhado pelos consumidores (GlobalMap, minimap em tempo real,
+visualize_path), então um chunk não é lido mais de uma vez por processo.
+
+Os arquivos não ficam abertos nem mapeados: é a pasta do cliente, e no Windows
+um arquivo com mmap aberto não pode ser truncado/substituído ao salvar o automap.
+
+Arquivos gerados offline a partir dos chunks (atlas, conectividade, grafo HPA,
+landmarks) guardam fingerprints() de quando foram gerados; changed_chunks()
+diz quais chunks o cliente regravou desde então (o jogador explorou mais).
+"""
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+CHUNK_SIZE = 256 * 256
+MISSING_TTL = 5.0  # Segundos até procurar de novo um chunk que não existia
+
+_FINGERPRINT_COUNT = struct.Struct("<I")
+_FINGERPRINT = struct.Struct("<HHBxIqI")  # cx, cy, z, tamanho, mtime_ns, crc32
+
+
+def parse_map_filename(filename):
+    """Extrai (chunk_x, chunk_y, z) do nome do arquivo .map (ex: 12912407.map)."""
+    name, ext = os.path.splitext(filename)
+    if ext != ".map" or not name.isdigit() or len(name) < 4:
+        return None
+    rest = name[:-2]
+    if len(rest) % 2 != 0:
+        return None
+    half = len(rest) // 2
+    return int(rest[:half]), int(rest[half:]), int(name[-2:])
+
+
+class ChunkStore:
+    """Índice + cache LRU (bytes) dos arquivos .map de um diretório."""
+
+    def __init__(self, maps_dir, max_cached=256, max_missing=4096):
+        self.maps_dir = maps_dir
+        self._max_cached = max_cached     # 256 * 64 KB = 16 MB
+        self._max_missing = max_missing
+        self._lock = threading.Lock()
+        self._paths = {}              # (chunk_x, chunk_y, z) -> caminho absoluto
+        self._data = OrderedDict()    # (chunk_x, chunk_y, z) -> bytes (LRU)
+        self._missing = OrderedDict() # (chunk_x, chunk_y, z) -> time.time() da última procura
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reindexa o diretório e descarta o conteúdo em cache. Afeta todos os
+        consumidores do processo (o store é compartilhado).
+        """
+        paths = {key: path for key, (path, _, _) in self._scan().items()}
+        with self._lock:
+            self._paths = paths
+            self._data.clear()
+            self._missing.clear()
+
+    def _scan(self):
+        """{(chunk_x, chunk_y, z): (caminho, tamanho, mtime_ns)} dos .map no disco agora."""
+        found = {}
+        try:
+            with os.scandir(self.maps_dir) as entries:
+                for entry in entries:
+                    key = parse_map_filename(entry.name)
+                    if key is None:
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found[key] = (entry.path, st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        return found
+
+    def fingerprints(self):
+        """
+        {(chunk_x, chunk_y, z): (tamanho, mtime_ns, crc32)} de todos os chunks no
+        disco. Lê todos os arquivos (uso offline, pelos geradores).
+        """
+        result = {}
+        for key, (path, size, mtime_ns) in self._scan().items():
+            data = self._read_file(path)
+            if data is not None:
+                result[key] = (size, mtime_ns, zlib.crc32(data))
+        return result
+
+    def changed_chunks(self, fingerprints):
+        """
+        Chunks criados, removidos ou com conteúdo diferente desde fingerprints.
+        Tamanho e mtime iguais bastam; se diferem, compara o crc32 do arquivo
+        (o cliente às vezes regrava o chunk sem mudar nada).
+        """
+        current = self._scan()
+        changed = set(fingerprints.keys() ^ current.keys())
+        for key, (path, size, mtime_ns) in current.items():
+            old = fingerprints.get(key)
+            if old is None or (old[0] == size and old[1] == mtime_ns):
+                continue
+            data = self._read_file(path)
+            if data is None or zlib.crc32(data) != old[2]:
+                changed.add(key)
+        return changed
+
+    def __contains__(self, key):
+        return key in self._paths
+
+    def __len__(self):
+        return len(self._paths)
+
+    def keys(self):
+        """Chaves (chunk_x, chunk_y, z) de todos os chunks indexados."""
+        return list(self._paths)
+
+    def path(self, chunk_x, chunk_y, z):
+        """Caminho do arquivo .map do chunk (ou None)."""
+        return self._paths.get((chunk_x, chunk_y, z))
+
+    def get(self, chunk_x, chunk_y, z):
+        """
+        Retorna o conteúdo do chunk (bytes) ou None se não existir.
+        Index do tile: rel_x * 256 + rel_y.
+        """
+        key = (chunk_x, chunk_y, z)
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+                return data
+
+            path = self._paths.get(key)
+            if path is None:
+                path = self._find_file(key)
+                if path is None:
+                    return None
+            data = self._read_file(path)
+            if data is None:
+                return None
+
+            self._data[key] = data
+            while len(self._data) > self._max_cached:
+                self._data.popitem(last=False)
+            return data
+
+    def _find_file(self, key):
+        """Chunk fora do índice: procura no disco (o cliente salva chunks novos ao explorar)."""
+        now = time.time()
+        checked = self._missing.get(key)
+        if checked is not None and now - checked < MISSING_TTL:
+            return None
+
+        chunk_x, chunk_y, z = key
+        for name in (f"{chunk_x}{chunk_y}{z:02}.map", f"{chunk_x:03}{chunk_y:03}{z:02}.map"):
+            path = os.path.join(self.maps_dir, name)
+            if os.path.isfile(path):
+                self._paths[key] = path
+                self._missing.pop(key, None)
+                return path
+
+        self._missing[key] = now
+        self._missing.move_to_end(key)
+        while len(self._missing) > self._max_missing:
+            self._missing.popitem(last=False)
+        return None
+
+    @staticmethod
+    def _read_file(path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return data or None
+
+
+def pack_fingerprints(fingerprints):
+    """Serializa fingerprints() (nº de chunks + um registro por chunk)."""
+    parts = [_FINGERPRINT_COUNT.pack(len(fingerprints))]
+    for (cx, cy, z), (size, mtime_ns, crc) in sorted(fingerprints.items()):
+        parts.append(_FINGERPRINT.pack(cx, cy, z, size, mtime_ns, crc))
+    return b"".join(parts)
+
+
+def unpack_fingerprints(data, offset):
+    """Lê um bloco de pack_fingerprints. Retorna (fingerprints, offset depois do bloco)."""
+    (count,) = _FINGERPRINT_COUNT.unpack_from(data, offset)
+    offset += _FINGERPRINT_COUNT.size
+    fingerprints = {}
+    for _ in range(count):
+        cx, cy, z, size, mtime_ns, crc = _FINGERPRINT.unpack_from(data, offset)
+        offset += _FINGERPRINT.size
+        fingerprints[(cx, cy, z)] = (size, mtime_ns, crc)
+    return fingerprints, offset
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_chunk_store(maps_dir):
+    """Retorna o ChunkStore compartilhado do diretório (um por processo)."""
+    key = os.path.normcase(os.path.abspath(maps_dir))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ChunkStore(maps_dir)
+            _stores[key] = store
+        return store
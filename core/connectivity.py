@@ -0,0 +1,383 @@
+# core/connectivity.py
+"""
+Labels de conectividade do GlobalMap (componentes conexas pré-computadas).
+
+Cada andar é rotulado em componentes 8-conexas de tiles não bloqueados da
+máscara de walkability (WALK_OPEN e WALK_TRANSITION). É um superconjunto do
+que get_path e get_path_multilevel conseguem percorrer, então labels diferentes
+provam que não existe rota. As transições do floor_transitions.json unem
+componentes de andares diferentes em componentes "de mundo" (multilevel).
+
+Gerado offline (utils/generate_connectivity.py) e salvo em um único arquivo:
+
+    header   magic, versão, assinatura do mapa, nº chunks, nº componentes
+    chunks   fingerprints dos .map usados (core/chunk_store.py)
+    mundo    array('I'): componente do andar -> componente do mundo
+    chunk    cx, cy, z, nº labels locais, tamanho comprimido
+             + array('I') label local -> componente do andar
+             + zlib(array('H') label local por tile, 0 = bloqueado)
+
+Temp blocks não entram nos labels (são só um filtro para rejeitar rotas
+impossíveis antes do A*).
+
+O cliente regrava os .map conforme o jogador explora, e tiles novos podem unir
+componentes que os labels dão como separadas. Chunks que mudaram desde a
+geração (mark_stale) deixam "desconhecidas" as componentes que encostam neles:
+disconnected() não prova nada com elas até os labels serem gerados de novo.
+"""
+import array
+import os
+import re
+import struct
+import zlib
+from collections import OrderedDict
+
+from core.chunk_store import pack_fingerprints, unpack_fingerprints
+
+CONNECTIVITY_MAGIC = b"MBCONN\x00\x00"
+CONNECTIVITY_VERSION = 2
+
+_HEADER = struct.Struct("<8sIIII")    # magic, versão, assinatura, nº chunks, nº componentes
+_RECORD = struct.Struct("<HHBHI")     # cx, cy, z, nº labels locais, tamanho comprimido
+
+# Sequências de tiles não bloqueados dentro de uma coluna da máscara
+_RUN_RE = re.compile(rb"[^\x00]+")
+
+
+# ── Construção (offline) ──────────────────────────────────────────────
+
+def label_chunk(mask):
+    """
+    Rotula as componentes 8-conexas de um chunk (máscara de 65536 bytes,
+    index = rel_x * 256 + rel_y) por sequências de tiles em cada coluna.
+
+    Returns:
+        (array('H') com o label local de cada tile (0 = bloqueado), nº de labels)
+    """
+    parent = []
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    columns = []
+    prev = []
+    for x in range(256):
+        base = x << 8
+        runs = []
+        j = 0
+        for m in _RUN_RE.finditer(mask, base, base + 256):
+            y0 = m.start() - base
+            y1 = m.end() - base - 1
+            run_id = len(parent)
+            parent.append(run_id)
+            # 8-conexo: encosta em sequências da coluna anterior até 1 tile na diagonal
+            while j < len(prev) and prev[j][1] < y0 - 1:
+                j += 1
+            k = j
+            while k < len(prev) and prev[k][0] <= y1 + 1:
+                a, b = find(run_id), find(prev[k][2])
+                if a != b:
+                    parent[b] = a
+                k += 1
+            runs.append((y0, y1, run_id))
+        columns.append(runs)
+        prev = runs
+
+    labels = array.array("H", bytes(2 * 256 * 256))
+    compact = {}
+    for x, runs in enumerate(columns):
+        base = x << 8
+        for y0, y1, run_id in runs:
+            root = find(run_id)
+            label = compact.get(root)
+            if label is None:
+                label = compact[root] = len(compact) + 1
+            labels[base + y0:base + y1 + 1] = array.array("H", [label]) * (y1 - y0 + 1)
+    return labels, len(compact)
+
+
+def border_strips(labels):
+    """Labels das 4 bordas do chunk: (x=0, x=255, y=0, y=255), 256 valores cada."""
+    return (labels[0:256], labels[255 * 256:256 * 256],
+            labels[0::256], labels[255::256])
+
+
+class ConnectivityBuilder:
+    """Une os labels locais de todos os chunks em componentes de andar e de mundo."""
+
+    def __init__(self):
+        self._chunks = {}      # (cx, cy, z) -> (offset global, nº labels, labels comprimidos)
+        self._borders = {}     # (cx, cy, z) -> border_strips
+        self._parent = []
+
+    def _find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a != b:
+            self._parent[b] = a
+
+    def add_chunk(self, key, count, compressed, borders):
+        offset = len(self._parent)
+        self._parent.extend(range(offset, offset + count))
+        self._chunks[key] = (offset, count, compressed)
+        self._borders[key] = borders
+
+    def _join_borders(self):
+        """Une labels que se tocam através das bordas dos chunks (8-conexo)."""
+        for (cx, cy, z), (offset, _, _) in self._chunks.items():
+            _, right, _, bottom = self._borders[(cx, cy, z)]
+            # Vizinho à direita (x + 1): (255, y) encosta em (0, y-1..y+1)
+            other = self._chunks.get((cx + 1, cy, z))
+            if other:
+                left = self._borders[(cx + 1, cy, z)][0]
+                for y in range(256):
+                    a = right[y]
+                    if not a:
+                        continue
+                    for ny in (y - 1, y, y + 1):
+                        if 0 <= ny < 256 and left[ny]:
+                            self._union(offset + a - 1, other[0] + left[ny] - 1)
+            # Vizinho abaixo (y + 1): (x, 255) encosta em (x-1..x+1, 0)
+            other = self._chunks.get((cx, cy + 1, z))
+            if other:
+                top = self._borders[(cx, cy + 1, z)][2]
+                for x in range(256):
+                    a = bottom[x]
+                    if not a:
+                        continue
+                    for nx in (x - 1, x, x + 1):
+                        if 0 <= nx < 256 and top[nx]:
+                            self._union(offset + a - 1, other[0] + top[nx] - 1)
+            # Quinas diagonais
+            a = right[255]
+            other = self._chunks.get((cx + 1, cy + 1, z))
+            if a and other:
+                b = self._borders[(cx + 1, cy + 1, z)][0][0]
+                if b:
+                    self._union(offset + a - 1, other[0] + b - 1)
+            a = right[0]
+            other = self._chunks.get((cx + 1, cy - 1, z))
+            if a and other:
+                b = self._borders[(cx + 1, cy - 1, z)][0][255]
+                if b:
+                    self._union(offset + a - 1, other[0] + b - 1)
+
+    def build(self, transitions):
+        """
+        Calcula os componentes. transitions: [(x, y, z_from, z_to), ...].
+
+        Returns:
+            ConnectivityLabels
+        """
+        self._join_borders()
+
+        # Componentes de andar: raízes do union-find compactadas em 1..n
+        floor_ids = {}
+        chunk_tables = {}
+        for key, (offset, count, compressed) in self._chunks.items():
+            table = array.array("I")
+            for i in range(offset, offset + count):
+                root = self._find(i)
+                fid = floor_ids.get(root)
+                if fid is None:
+                    fid = floor_ids[root] = len(floor_ids) + 1
+                table.append(fid)
+            chunk_tables[key] = (table, compressed)
+
+        labels = ConnectivityLabels(chunk_tables, array.array("I", range(len(floor_ids) + 1)))
+
+        # Componentes de mundo: a transição une origem e chegada. O A* 3D entra
+        # no tile de chegada mesmo se ele estiver bloqueado na máscara e expande
+        # os vizinhos a partir dele, então um tile bloqueado vale pelos 8 vizinhos
+        world = list(range(len(floor_ids) + 1))
+
+        def find(i):
+            while world[i] != i:
+                world[i] = world[world[i]]
+                i = world[i]
+            return i
+
+        def touching(x, y, z):
+            label = labels.floor_label(x, y, z)
+            if label:
+                return (label,)
+            return tuple(labels.floor_label(x + dx, y + dy, z)
+                         for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+
+        for x, y, z_from, z_to in transitions:
+            roots = {find(c) for c in touching(x, y, z_from) + touching(x, y, z_to) if c}
+            if len(roots) > 1:
+                root = roots.pop()
+                for other in roots:
+                    world[other] = root
+        labels._world = array.array("I", (find(i) for i in range(len(world))))
+        return labels
+
+
+# ── Consulta (runtime) ────────────────────────────────────────────────
+
+class ConnectivityLabels:
+    """Labels de componente por tile, com os chunks descomprimidos sob demanda (LRU)."""
+
+    def __init__(self, chunks, world, max_decoded=64, fingerprints=None):
+        self._chunks = chunks          # (cx, cy, z) -> (array('I') local -> andar, zlib bytes)
+        self._world = world            # componente do andar -> componente do mundo
+        self._decoded = OrderedDict()  # (cx, cy, z) -> array('H') (LRU)
+        self._max_decoded = max_decoded
+        self.fingerprints = fingerprints or {}  # Chunks .map usados na geração
+        self._stale_floor = frozenset()  # Componentes de andar sem garantia (mark_stale)
+        self._stale_world = frozenset()
+
+    def fork(self):
+        """Cópia para outra thread (mesmos labels, LRU de chunks descomprimidos próprio)."""
+        clone = ConnectivityLabels(self._chunks, self._world, self._max_decoded, self.fingerprints)
+        clone._stale_floor = self._stale_floor
+        clone._stale_world = self._stale_world
+        return clone
+
+    def mark_stale(self, changed, transition_lookup):
+        """
+        Chunks que mudaram desde a geração (ChunkStore.changed_chunks). Tiles
+        novos só unem componentes que têm tiles no chunk ou nos 8 vizinhos dele
+        (ou que chegam nele por uma transição); essas passam a ser desconhecidas.
+        """
+        floor_ids = set()
+        for cx, cy, z in changed:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    entry = self._chunks.get((cx + dx, cy + dy, z))
+                    if entry is not None:
+                        floor_ids.update(entry[0])
+
+        for (x, y, z_from), z_tos in transition_lookup.items():
+            ends = (z_from,) + tuple(z_tos)
+            if not any((x >> 8, y >> 8, z) in changed for z in ends):
+                continue
+            for z in ends:
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        label = self.floor_label(x + dx, y + dy, z)
+                        if label:
+                            floor_ids.add(label)
+
+        self._stale_floor = frozenset(floor_ids)
+        self._stale_world = frozenset(self._world[f] for f in floor_ids)
+
+    @property
+    def component_count(self):
+        return len(self._world) - 1
+
+    def _chunk_labels(self, key):
+        labels = self._decoded.get(key)
+        if labels is not None:
+            self._decoded.move_to_end(key)
+            return labels
+        entry = self._chunks.get(key)
+        if entry is None:
+            return None
+        labels = array.array("H")
+        labels.frombytes(zlib.decompress(entry[1]))
+        self._decoded[key] = labels
+        while len(self._decoded) > self._max_decoded:
+            self._decoded.popitem(last=False)
+        return labels
+
+    def floor_label(self, x, y, z):
+        """Componente do tile no próprio andar (0 = bloqueado / fora do mapa)."""
+        key = (x >> 8, y >> 8, z)
+        labels = self._chunk_labels(key)
+        if labels is None:
+            return 0
+        local = labels[((x & 255) << 8) | (y & 255)]
+        if not local:
+            return 0
+        return self._chunks[key][0][local - 1]
+
+    def world_label(self, x, y, z):
+        """Componente do tile considerando as transições entre andares (0 = bloqueado)."""
+        label = self.floor_label(x, y, z)
+        return self._world[label] if label else 0
+
+    def disconnected(self, start_pos, end_pos, same_floor=True):
+        """
+        True se os labels provam que não há rota. Tiles sem label (ex: player em
+        cima de um tile bloqueado, chunk fora do arquivo) e componentes marcadas
+        por mark_stale não provam nada.
+        """
+        if same_floor:
+            label, stale = self.floor_label, self._stale_floor
+        else:
+            label, stale = self.world_label, self._stale_world
+        a = label(*start_pos)
+        if not a:
+            return False
+        b = label(*end_pos)
+        if not b or a == b:
+            return False
+        return not (a in stale or b in stale)
+
+    # ── Persistência ───────────────────────────────────────────────
+
+    def save(self, path, signature, fingerprints):
+        """fingerprints: ChunkStore.fingerprints() dos .map usados na geração."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(CONNECTIVITY_MAGIC, CONNECTIVITY_VERSION, signature,
+                                 len(self._chunks), self.component_count))
+            f.write(pack_fingerprints(fingerprints))
+            f.write(self._world.tobytes())
+            for (cx, cy, z), (table, compressed) in self._chunks.items():
+                f.write(_RECORD.pack(cx, cy, z, len(table), len(compressed)))
+                f.write(table.tobytes())
+                f.write(compressed)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """
+        Carrega os labels. Retorna None se o arquivo não existe ou não bate com o
+        mapa (cores/transições/archways). Chunks .map alterados desde a geração
+        são conferidos por quem carrega (labels.fingerprints + mark_stale).
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, file_signature, count, components = _HEADER.unpack_from(data, 0)
+        if (magic != CONNECTIVITY_MAGIC or version != CONNECTIVITY_VERSION
+                or file_signature != signature):
+            return None
+
+        offset = _HEADER.size
+        try:
+            fingerprints, offset = unpack_fingerprints(data, offset)
+            world = array.array("I")
+            world.frombytes(data[offset:offset + (components + 1) * 4])
+            offset += (components + 1) * 4
+            chunks = {}
+            for _ in range(count):
+                cx, cy, z, n, size = _RECORD.unpack_from(data, offset)
+                offset += _RECORD.size
+                table = array.array("I")
+                table.frombytes(data[offset:offset + n * 4])
+                offset += n * 4
+                chunks[(cx, cy, z)] = (table, data[offset:offset + size])
+                offset += size
+        except (struct.error, ValueError):
+            return None
+        if len(world) != components + 1:
+            return None
+        return cls(chunks, world, fingerprints=fingerprints)
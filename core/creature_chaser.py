@@ -1,6 +1,6 @@
 # core/creature_chaser.py
 """
-Sistema de perseguicao de criaturas usando A* walker.
+Sistema de perseguicao de criaturas usando D* Lite incremental (ChasePlanner) + A* walker.
 Substitui packet.follow() com suporte a obstacle clearing e movimentacao humanizada.
 
 Projetado para ser chamado tick-a-tick pelo trainer loop (nao-bloqueante).
@@ -10,7 +10,7 @@ import time
 import random
 from enum import Enum
 
-from core.astar_walker import AStarWalker
+from core.astar_walker import AStarWalker, ChasePlanner
 from core.map_analyzer import MapAnalyzer
 from core.memory_map import MemoryMap
 from core.map_core import get_player_pos
@@ -78,6 +78,9 @@ class CreatureChaser:
         self.memory_map = memory_map
         self.debug = debug
 
+        # Busca incremental (D* Lite) mantida entre ticks do mesmo chase
+        self.planner = ChasePlanner(walker)
+
         # Estado do chase
         self._active = False
         self._creature_id = 0
@@ -120,6 +123,7 @@ class CreatureChaser:
         self._last_pos = None
         self._step_history.clear()
         self._last_step_dir = None
+        self.planner.reset()
 
         if self.debug:
             print(f"[CHASE] Iniciando chase: creature_id={creature_id} pos=({x},{y},{z})")
@@ -132,6 +136,7 @@ class CreatureChaser:
         self._creature_id = 0
         self._stuck_counter = 0
         self._step_history.clear()
+        self.planner.reset()
 
     def update(self, creature_x, creature_y, creature_z=None):
         """
@@ -193,8 +198,11 @@ class CreatureChaser:
                 print(f"[CHASE] BLOCKED: stuck_counter={self._stuck_counter} na pos ({my_x},{my_y})")
             return ChaseResult.BLOCKED
 
-        # Calcula proximo passo via A*
-        step = self.walker.get_next_step(rel_x, rel_y, activate_fallback=True)
+        # Calcula proximo passo via D* Lite (repara a busca anterior); sem caminho
+        # na janela, o A* do walker decide o fallback
+        step = self.planner.get_next_step(my_x, my_y, rel_x, rel_y)
+        if step is None:
+            step = self.walker.get_next_step(rel_x, rel_y, activate_fallback=True)
 
         if step is None:
             # A* nao encontrou caminho - tenta limpar obstaculos
@@ -0,0 +1,200 @@
+# core/creature_table.py
+"""
+Tabela persistente do battlelist, indexada por creature id.
+
+Cada scan T2 do game_state devolvia listas novas de Creature, e o
+SpawnTracker (trainer e alarm), o EngagementDetector e o overlay refaziam o
+diff por id em cima delas. A CreatureTable recebe o scan, mantém o último
+estado de cada id e calcula o que mudou no tick:
+
+    appeared        ids novos no battlelist
+    disappeared     ids que saíram (último estado conhecido)
+    moved           posição mudou          -> (Creature, Position anterior)
+    hp_changed      hp_percent mudou       -> (Creature, hp anterior)
+    status_changed  skull ou party mudou   -> (Creature, skull, party anteriores)
+
+O delta é publicado no EventBus (EVENT_CREATURE_DELTA) pelo game_state, e
+cada consumidor lê os seus com um CreatureDeltaFeed.
+
+Creatures guardadas nunca são alteradas (os snapshots as compartilham): uma
+criatura sem mudança continua sendo o mesmo objeto do tick anterior, e uma
+que mudou é trocada pelo objeto do scan. As tuplas creatures/players só são
+refeitas quando algo mudou, então ticks parados não alocam nada além do scan.
+"""
+import threading
+from collections import deque
+from typing import List, Optional
+
+from core.event_bus import EventBus, CreatureDeltaEvent, EVENT_CREATURE_DELTA
+from core.models import Creature
+
+
+class CreatureTable:
+    """Último estado de cada criatura do battlelist + delta do último update."""
+
+    def __init__(self):
+        self._by_id = {}        # {creature_id: Creature}
+        self._order = []        # ids na ordem do battlelist (ordem das tuplas)
+        self._is_player = {}    # {creature_id: bool} - recalculado só se nome/outfit mudam
+        self.creatures = ()     # Monstros/NPCs na ordem do battlelist
+        self.players = ()       # Players na ordem do battlelist
+        self._initialized = False
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def get(self, creature_id: int) -> Optional[Creature]:
+        return self._by_id.get(creature_id)
+
+    def reset(self):
+        """Esquece todas as criaturas (novo attach/login: ids antigos não valem mais)."""
+        self._by_id.clear()
+        self._order.clear()
+        self._is_player.clear()
+        self.creatures = ()
+        self.players = ()
+        self._initialized = False
+
+    def update(self, scanned: List[Creature], version: int = 0,
+               player_position=None) -> Optional[CreatureDeltaEvent]:
+        """
+        Aplica um scan completo do battlelist (scan_all()).
+
+        Args:
+            scanned: Creatures do scan, na ordem dos slots
+            version: Versão do snapshot que o game_state vai publicar
+            player_position: Position do player no mesmo tick
+
+        Returns:
+            CreatureDeltaEvent com o que mudou, ou None se nada mudou
+        """
+        by_id = self._by_id
+        order = self._order
+        is_player_cache = self._is_player
+
+        appeared = []
+        moved = []
+        hp_changed = []
+        status_changed = []
+        reordered = len(scanned) != len(order)
+        updated = False
+
+        for index, creature in enumerate(scanned):
+            cid = creature.id
+            if not reordered and order[index] != cid:
+                reordered = True
+
+            previous = by_id.get(cid)
+            if previous is None:
+                by_id[cid] = creature
+                appeared.append(creature)
+                reordered = True
+                continue
+
+            # Comparação campo a campo sem montar tuplas (dataclass __eq__ aloca)
+            if previous.__dict__ == creature.__dict__:
+                continue
+
+            by_id[cid] = creature
+            updated = True
+            if previous.position != creature.position:
+                moved.append((creature, previous.position))
+            if previous.hp_percent != creature.hp_percent:
+                hp_changed.append((creature, previous.hp_percent))
+            if previous.skull != creature.skull or previous.party != creature.party:
+                status_changed.append((creature, previous.skull, previous.party))
+            if (previous.name != creature.name
+                    or previous.outfit_type != creature.outfit_type
+                    or previous.outfit_head != creature.outfit_head
+                    or previous.outfit_body != creature.outfit_body
+                    or previous.outfit_legs != creature.outfit_legs
+                    or previous.outfit_feet != creature.outfit_feet):
+                is_player_cache.pop(cid, None)
+
+        disappeared = []
+        if reordered:
+            # Mesma ordem e mesmo tamanho sem ids novos = ninguém saiu; só aqui
+            # se monta o conjunto de ids do scan
+            current_ids = {creature.id for creature in scanned}
+            for cid in [cid for cid in by_id if cid not in current_ids]:
+                disappeared.append(by_id.pop(cid))
+                is_player_cache.pop(cid, None)
+        if reordered or updated:
+            self._rebuild(scanned)
+
+        initial = not self._initialized
+        self._initialized = self._initialized or bool(scanned)
+
+        if not (appeared or disappeared or moved or hp_changed or status_changed):
+            return None  # Tick parado (ou só reordenação de slots)
+        return CreatureDeltaEvent(
+            version=version,
+            player_position=player_position,
+            appeared=appeared,
+            disappeared=disappeared,
+            moved=moved,
+            hp_changed=hp_changed,
+            status_changed=status_changed,
+            initial=initial,
+        )
+
+    def _rebuild(self, scanned):
+        """Refaz ordem e tuplas creatures/players com os objetos guardados."""
+        by_id = self._by_id
+        is_player_cache = self._is_player
+        creatures = []
+        players = []
+        order = []
+        for creature in scanned:
+            cid = creature.id
+            stored = by_id[cid]
+            is_player = is_player_cache.get(cid)
+            if is_player is None:
+                is_player = is_player_cache[cid] = stored.is_player
+            (players if is_player else creatures).append(stored)
+            order.append(cid)
+        self._order = order
+        self.creatures = tuple(creatures)
+        self.players = tuple(players)
+
+
+class CreatureDeltaFeed:
+    """
+    Fila de CreatureDeltaEvent de um consumidor, inscrita no EventBus.
+
+    O game_state publica no thread de polling; o módulo drena no seu ciclo.
+    Se o consumidor ficar parado tempo demais a fila é descartada e drain()
+    devolve None uma vez, para o consumidor se ressincronizar pelo snapshot.
+    """
+
+    def __init__(self, max_pending: int = 200):
+        self._pending = deque()
+        self._max_pending = max_pending
+        self._overflowed = False
+        self._lock = threading.Lock()
+        self._event_bus = EventBus.get_instance()
+        self._event_bus.subscribe(EVENT_CREATURE_DELTA, self._on_delta)
+
+    def _on_delta(self, event: CreatureDeltaEvent):
+        with self._lock:
+            if len(self._pending) >= self._max_pending:
+                self._pending.clear()
+                self._overflowed = True
+            self._pending.append(event)
+
+    def drain(self) -> Optional[List[CreatureDeltaEvent]]:
+        """Deltas recebidos desde o último drain (em ordem), ou None se houve perda."""
+        with self._lock:
+            if self._overflowed:
+                self._overflowed = False
+                self._pending.clear()
+                return None
+            pending = list(self._pending)
+            self._pending.clear()
+            return pending
+
+    def close(self):
+        """Cancela a inscrição no EventBus."""
+        self._event_bus.unsubscribe(EVENT_CREATURE_DELTA, self._on_delta)
+        with self._lock:
+            self._pending.clear()
@@ -40,6 +40,25 @@ class SystemMessageEvent:
     timestamp: float = field(default_factory=time.time)
 
 
+@dataclass
+class CreatureDeltaEvent:
+    """Mudanças no battlelist entre dois scans T2 do game_state (ver core/creature_table.py)."""
+    version: int          # Versão do GameSnapshot publicado no mesmo tick (t2_version)
+    player_position: Any  # Position do player no tick do scan
+    appeared: List[Any] = field(default_factory=list)        # [Creature] novas no battlelist
+    disappeared: List[Any] = field(default_factory=list)     # [Creature] (último estado conhecido)
+    moved: List[tuple] = field(default_factory=list)         # [(Creature, Position anterior)]
+    hp_changed: List[tuple] = field(default_factory=list)    # [(Creature, hp_percent anterior)]
+    status_changed: List[tuple] = field(default_factory=list)  # [(Creature, skull anterior, party anterior)]
+    initial: bool = False  # Primeiro scan da tabela: todo o battlelist vem em appeared
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.appeared or self.disappeared or self.moved
+                    or self.hp_changed or self.status_changed)
+
+
 class EventBus:
     """
     Barramento de eventos thread-safe.
@@ -177,3 +196,4 @@ EVENT_CHAT = "chat"
 EVENT_CONTAINER_OPEN = "container_open"
 EVENT_CONTAINER_CLOSE = "container_close"
 EVENT_SYSTEM_MSG = "system_msg"
+EVENT_CREATURE_DELTA = "creature_delta"
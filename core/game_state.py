@@ -20,10 +20,11 @@ Modules query game_state instead of reading memory directly.
 
 import threading
 import time
+from types import MappingProxyType
 from typing import Optional, List, Dict, Tuple, Any
 
 # Import shared models
-from core.models import Position, Player, Creature
+from core.models import Position, Player, Creature, GameSnapshot
 
 # Import existing scanners
 from core.battlelist import BattleListScanner
@@ -31,12 +32,12 @@ from core.memory_map import MemoryMap
 from core.map_analyzer import MapAnalyzer
 from core.map_core import get_player_pos
 from core.player_core import (
-    get_player_id, get_target_id,
+    get_player_id,
     is_player_moving, get_player_speed,
     get_connected_char_name, get_player_facing_direction
 )
 from modules.auto_loot import scan_containers, is_player_full
-from core.inventory_core import get_item_id_in_hand
+from core.read_plan import ReadPlan
 from config import (
     OFFSET_PLAYER_HP, OFFSET_PLAYER_HP_MAX,
     OFFSET_PLAYER_MANA, OFFSET_PLAYER_MANA_MAX,
@@ -46,13 +47,39 @@ from config import (
     OFFSET_SKILL_SHIELD, OFFSET_SKILL_SHIELD_PCT,
     OFFSET_SLOT_RIGHT, OFFSET_SLOT_LEFT, OFFSET_SLOT_AMMO,
     TARGET_ID_PTR,
+    GAME_STATE_TICK_S, GAME_STATE_T2_EVERY, GAME_STATE_T3_EVERY,
 )
 
 # Import bot control state (GM detection, alarm)
 from core.bot_state import state as legacy_state
 
 # Import event bus for event-driven detection
-from core.event_bus import EventBus, EVENT_SYSTEM_MSG
+from core.event_bus import EventBus, EVENT_SYSTEM_MSG, EVENT_CREATURE_DELTA
+from core.creature_table import CreatureTable
+
+
+# Campos lidos a cada tick (T1) e a cada 10 ticks (T3), agrupados em poucos
+# read_bytes (no Tibia 7.72: 1 span para vitals, 2 para stats/equipamento)
+_VITALS_PLAN = (ReadPlan()
+                .add("hp", OFFSET_PLAYER_HP)
+                .add("hp_max", OFFSET_PLAYER_HP_MAX)
+                .add("mana", OFFSET_PLAYER_MANA)
+                .add("mana_max", OFFSET_PLAYER_MANA_MAX)
+                .add("cap", OFFSET_PLAYER_CAP, "f")
+                .add("target_id", TARGET_ID_PTR))
+
+_STATS_PLAN = (ReadPlan()
+               .add("level", OFFSET_LEVEL)
+               .add("experience", OFFSET_EXP)
+               .add("magic_level", OFFSET_MAGIC_LEVEL)
+               .add("magic_level_pct", OFFSET_MAGIC_PCT)
+               .add("sword_skill", OFFSET_SKILL_SWORD)
+               .add("sword_skill_pct", OFFSET_SKILL_SWORD_PCT)
+               .add("shield_skill", OFFSET_SKILL_SHIELD)
+               .add("shield_skill_pct", OFFSET_SKILL_SHIELD_PCT)
+               .add("right_hand", OFFSET_SLOT_RIGHT)
+               .add("left_hand", OFFSET_SLOT_LEFT)
+               .add("ammo", OFFSET_SLOT_AMMO))
 
 
 class GameState:
@@ -68,6 +95,9 @@ class GameState:
         T3 (2Hz / 500ms):  Stats — Skills, Equipment, Containers, Level/Exp
 
     All modules query this instead of reading memory directly.
+    Each tick is also published as an immutable GameSnapshot; module loops
+    can block on wait_for_snapshot() instead of issuing their own reads.
+    Tier rates come from GAME_STATE_TICK_S / GAME_STATE_T2_EVERY / GAME_STATE_T3_EVERY.
 
     This provides:
     - Single source of truth (all modules see same snapshot)
@@ -100,9 +130,10 @@ class GameState:
         self._cached_char_name = ""  # Cached - never changes during session
         self._target_id: int = 0
 
-        # Creatures & players
-        self._creatures: List[Creature] = []
-        self._players: List[Creature] = []
+        # Creatures & players (immutable tuples owned by the creature table)
+        self._creatures: Tuple[Creature, ...] = ()
+        self._players: Tuple[Creature, ...] = ()
+        self.creature_table = CreatureTable()
 
         # Containers
         self._containers: List[Any] = []  # List of Container objects from auto_loot
@@ -114,10 +145,26 @@ class GameState:
         self._left_hand_id: int = 0
         self._right_hand_id: int = 0
 
+        # Map block of the last T2 read (shared via snapshot)
+        self._map_raw: Optional[bytes] = None
+        self._map_player_id: int = 0
+        self._map_position: Optional[Position] = None
+
+        # Published snapshots (version increments every tick)
+        self._snapshot: Optional[GameSnapshot] = None
+        self._snapshot_version: int = 0
+        self._snapshot_cond = threading.Condition(self._lock)
+        self._t2_version: int = 0
+        self._t2_timestamp: float = 0.0
+        self._t3_version: int = 0
+        self._t3_timestamp: float = 0.0
+
         # Update thread
         self._running = False
         self._update_thread: Optional[threading.Thread] = None
-        self._update_interval = 0.05  # 20Hz = 50ms
+        self._update_interval = GAME_STATE_TICK_S  # 20Hz = 50ms
+        self._t2_every = max(1, GAME_STATE_T2_EVERY)
+        self._t3_every = max(1, GAME_STATE_T3_EVERY)
 
         # Performance stats
         self._update_count = 0
@@ -150,7 +197,8 @@ class GameState:
             self.pm = pm
             self.base_addr = base_addr
 
-            # Initialize scanners
+            # Initialize scanners (fresh creature table: ids from a previous attach are stale)
+            self.creature_table = CreatureTable()
             self.battlelist = BattleListScanner(pm, base_addr)
             self.memory_map = MemoryMap(pm, base_addr)
             self.map_analyzer = MapAnalyzer(self.memory_map)
@@ -254,23 +302,25 @@ class GameState:
         if not self.pm or not self.base_addr:
             return
 
+        creature_delta = None
         try:
-            is_t2_tick = (self._tick_counter % 3 == 0)
-            is_t3_tick = (self._tick_counter % 10 == 0)
+            is_t2_tick = (self._tick_counter % self._t2_every == 0)
+            is_t3_tick = (self._tick_counter % self._t3_every == 0)
 
             # ============================================================
             # T1: VITALS — Every tick (20Hz)
             # ============================================================
             player_id = get_player_id(self.pm, self.base_addr)
             player_pos = get_player_pos(self.pm, self.base_addr)
-            hp = self.pm.read_int(self.base_addr + OFFSET_PLAYER_HP)
-            hp_max = self.pm.read_int(self.base_addr + OFFSET_PLAYER_HP_MAX)
-            mana = self.pm.read_int(self.base_addr + OFFSET_PLAYER_MANA)
-            mana_max = self.pm.read_int(self.base_addr + OFFSET_PLAYER_MANA_MAX)
-            cap = self.pm.read_float(self.base_addr + OFFSET_PLAYER_CAP)
+            vitals = _VITALS_PLAN.read(self.pm, self.base_addr)
+            hp = vitals["hp"]
+            hp_max = vitals["hp_max"]
+            mana = vitals["mana"]
+            mana_max = vitals["mana_max"]
+            cap = vitals["cap"]
             hp_percent = (hp / hp_max * 100) if hp_max > 0 else 0
             mana_percent = (mana / mana_max * 100) if mana_max > 0 else 0
-            target_id = get_target_id(self.pm, self.base_addr)
+            target_id = vitals["target_id"]
             facing_direction = get_player_facing_direction(self.pm, self.base_addr)
             # Sync combat state to legacy bot_state (replaces combat_loot_monitor_thread)
             legacy_state.set_combat_state(target_id != 0)
@@ -293,24 +343,33 @@ class GameState:
                 is_moving = is_player_moving(self.pm, self.base_addr)
                 speed = get_player_speed(self.pm, self.base_addr)
 
+                # The table diffs the scan by id: unchanged creatures keep their
+                # objects and the creatures/players tuples are only rebuilt on change.
+                # An empty scan is a failed read (the player is always listed), so it
+                # keeps the previous table instead of reporting everyone as gone.
                 all_entities = self.battlelist.scan_all() if self.battlelist else []
-                creatures = []
-                players = []
-                for creature in all_entities:
-                    if creature.is_player:
-                        players.append(creature)
-                    else:
-                        creatures.append(creature)
-
-                if self.memory_map and player_pos:
-                    map_data = self.memory_map.read_full_map()
-                    map_tiles = {}
-                    for tile in map_data:
-                        pos = tile.get('position')
-                        if pos:
-                            map_tiles[pos] = tile
-                else:
-                    map_tiles = {}
+                table = self.creature_table
+                if all_entities:
+                    creature_delta = table.update(
+                        all_entities,
+                        version=self._snapshot_version + 1,
+                        player_position=position,
+                    )
+                creatures = table.creatures
+                players = table.players
+
+                map_tiles = {}
+                map_raw, map_player_id, map_position = None, player_id, None
+                if self.memory_map and player_pos and player_id:
+                    if self.memory_map.read_full_map(player_id):
+                        map_raw = self.memory_map.raw_data
+                        map_position = position
+                        # Andar visível inteiro (18x14) em coordenadas absolutas
+                        for dy in range(-6, 8):
+                            for dx in range(-8, 10):
+                                tile = self.memory_map.get_tile(dx, dy)
+                                if tile is not None:
+                                    map_tiles[(position.x + dx, position.y + dy, position.z)] = tile
             else:
                 # Reuse cached values from previous scan
                 with self._lock:
@@ -319,25 +378,29 @@ class GameState:
                     creatures = self._creatures
                     players = self._players
                     map_tiles = self._map_tiles
+                    map_raw = self._map_raw
+                    map_player_id = self._map_player_id
+                    map_position = self._map_position
 
             # ============================================================
             # T3: STATS/INVENTORY — Every 10 ticks (2Hz / 500ms)
             # ============================================================
             if is_t3_tick:
-                level = self.pm.read_int(self.base_addr + OFFSET_LEVEL)
-                experience = self.pm.read_int(self.base_addr + OFFSET_EXP)
-                magic_level = self.pm.read_int(self.base_addr + OFFSET_MAGIC_LEVEL)
-                magic_level_pct = self.pm.read_int(self.base_addr + OFFSET_MAGIC_PCT)
-                sword_skill = self.pm.read_int(self.base_addr + OFFSET_SKILL_SWORD)
-                sword_skill_pct = self.pm.read_int(self.base_addr + OFFSET_SKILL_SWORD_PCT)
-                shield_skill = self.pm.read_int(self.base_addr + OFFSET_SKILL_SHIELD)
-                shield_skill_pct = self.pm.read_int(self.base_addr + OFFSET_SKILL_SHIELD_PCT)
-                right_hand_equip = self.pm.read_int(self.base_addr + OFFSET_SLOT_RIGHT)
-                left_hand_equip = self.pm.read_int(self.base_addr + OFFSET_SLOT_LEFT)
-                ammo_equip = self.pm.read_int(self.base_addr + OFFSET_SLOT_AMMO)
+                stats = _STATS_PLAN.read(self.pm, self.base_addr)
+                level = stats["level"]
+                experience = stats["experience"]
+                magic_level = stats["magic_level"]
+                magic_level_pct = stats["magic_level_pct"]
+                sword_skill = stats["sword_skill"]
+                sword_skill_pct = stats["sword_skill_pct"]
+                shield_skill = stats["shield_skill"]
+                shield_skill_pct = stats["shield_skill_pct"]
+                right_hand_equip = stats["right_hand"]
+                left_hand_equip = stats["left_hand"]
+                ammo_equip = stats["ammo"]
                 containers = scan_containers(self.pm, self.base_addr)
-                left_hand = get_item_id_in_hand(self.pm, self.base_addr, is_left=True)
-                right_hand = get_item_id_in_hand(self.pm, self.base_addr, is_left=False)
+                left_hand = left_hand_equip
+                right_hand = right_hand_equip
             else:
                 # Reuse cached values from previous scan
                 with self._lock:
@@ -393,15 +456,59 @@ class GameState:
                 self._players = players
                 self._containers = containers
                 self._map_tiles = map_tiles
+                self._map_raw = map_raw
+                self._map_player_id = map_player_id
+                self._map_position = map_position
                 self._left_hand_id = left_hand
                 self._right_hand_id = right_hand
+                self._publish_snapshot(is_t2_tick, is_t3_tick)
 
         except Exception:
             # Ignore read errors (disconnected, etc.)
             pass
 
+        # Outside the lock: subscribers run synchronously on this thread. Published
+        # even if a later read failed, since the table has already applied it.
+        if creature_delta is not None:
+            self._event_bus.publish(EVENT_CREATURE_DELTA, creature_delta)
+
         self._tick_counter += 1
 
+    def _publish_snapshot(self, is_t2_tick: bool, is_t3_tick: bool):
+        """Publish the current state as a new GameSnapshot (caller holds _lock)."""
+        now = time.time()
+        version = self._snapshot_version + 1
+        if is_t2_tick or self._snapshot is None:
+            self._t2_version, self._t2_timestamp = version, now
+        if is_t3_tick or self._snapshot is None:
+            self._t3_version, self._t3_timestamp = version, now
+
+        previous = self._snapshot
+        t2_unchanged = previous is not None and previous.t2_version == self._t2_version
+        t3_unchanged = previous is not None and previous.t3_version == self._t3_version
+        self._snapshot = GameSnapshot(
+            version=version,
+            timestamp=now,
+            player=self._player,
+            target_id=self._target_id,
+            t2_version=self._t2_version,
+            t2_timestamp=self._t2_timestamp,
+            # Ticks without a T2/T3 read reuse the previous (already immutable) tuples
+            creatures=previous.creatures if t2_unchanged else tuple(self._creatures),
+            players=previous.players if t2_unchanged else tuple(self._players),
+            map_raw=self._map_raw,
+            map_player_id=self._map_player_id,
+            map_position=self._map_position,
+            map_tiles=previous.map_tiles if t2_unchanged else MappingProxyType(self._map_tiles),
+            t3_version=self._t3_version,
+            t3_timestamp=self._t3_timestamp,
+            containers=previous.containers if t3_unchanged else tuple(self._containers),
+            left_hand_id=self._left_hand_id,
+            right_hand_id=self._right_hand_id,
+        )
+        self._snapshot_version = version
+        self._snapshot_cond.notify_all()
+
     def _check_is_full_hybrid(self) -> bool:
         """
         Hybrid food satiation detection: Event-based with memory fallback.
@@ -446,6 +553,46 @@ class GameState:
         with self._lock:
             self._is_full_event = False
 
+    # =========================================================================
+    # QUERY API - Snapshots
+    # =========================================================================
+
+    def get_snapshot(self) -> Optional[GameSnapshot]:
+        """Latest published snapshot (None before the first tick)."""
+        with self._lock:
+            return self._snapshot
+
+    @property
+    def snapshot_version(self) -> int:
+        """Version of the latest published snapshot (0 = none yet)."""
+        return self._snapshot_version
+
+    def wait_for_snapshot(self, after_version: int = 0, timeout: Optional[float] = None,
+                          tier: int = 1) -> Optional[GameSnapshot]:
+        """
+        Block until a snapshot newer than after_version is published.
+
+        tier=2 / tier=3 compare t2_version / t3_version instead, i.e. wait
+        for battlelist+map / containers data read after after_version.
+
+        Returns:
+            The snapshot, or None on timeout.
+        """
+        def _is_newer():
+            snapshot = self._snapshot
+            if snapshot is None:
+                return False
+            if tier == 3:
+                return snapshot.t3_version > after_version
+            if tier == 2:
+                return snapshot.t2_version > after_version
+            return snapshot.version > after_version
+
+        with self._snapshot_cond:
+            if not self._snapshot_cond.wait_for(_is_newer, timeout):
+                return None
+            return self._snapshot
+
     # =========================================================================
     # QUERY API - Player State
     # =========================================================================
@@ -676,6 +823,7 @@ class GameState:
                 "players_cached": len(self._players),
                 "containers_cached": len(self._containers),
                 "map_tiles_cached": len(self._map_tiles),
+                "snapshot_version": self._snapshot_version,
                 "active_module": self._active_module,
             }
 
@@ -1,25 +1,72 @@
 import os
+import copy
 import json
 import heapq
 import time
 import re
+import zlib
 from collections import defaultdict, OrderedDict
 
+from core.chunk_store import get_chunk_store, CHUNK_SIZE
+from core.map_atlas import MapAtlas
+from core.route_cache import RouteCache
+
 # Custos de movimento (Tibia: diagonal = 3x cardinal)
 COST_CARDINAL = 10
 COST_DIAGONAL = 30
 COST_TRANSITION = 20
 LEVEL_PENALTY = 80
+HPA_MIN_DISTANCE = 64  # A partir daqui (sqm) get_path_multilevel usa o HPA*, se ativo
+BUDGET_CHECK_INTERVAL = 512  # Iterações do A* entre consultas ao budget (tempo/cancelamento)
+LOCAL_ROUTE_MAX_NODES = 512  # local_route: tiles expandidos antes de desistir
+# get_path_with_fallback: penalidade por sqm (Manhattan) de distância ao waypoint.
+# Um tile alternativo só ganha do waypoint se a rota até ele for ~50 tiles mais curta por sqm.
+FALLBACK_OFFSET_PENALTY = COST_CARDINAL * 50
+
+# Valores da máscara de walkability (1 byte por tile, mesmo layout do .map)
+WALK_BLOCKED = 0
+WALK_OPEN = 1
+WALK_TRANSITION = 2  # Walkable, mas é buraco/escada (bloqueado no same-floor)
+
+_EMPTY_MASK = bytes(CHUNK_SIZE)
+
+# Vizinhos do A* 3D: (dx, dy, custo, offset na máscara); index = rel_x * 256 + rel_y
+_MOVES_3D = tuple((dx, dy, cost, dx * 256 + dy) for dx, dy, cost in (
+    (0, 1, COST_CARDINAL), (0, -1, COST_CARDINAL),
+    (1, 0, COST_CARDINAL), (-1, 0, COST_CARDINAL),
+    (1, 1, COST_DIAGONAL), (1, -1, COST_DIAGONAL),
+    (-1, 1, COST_DIAGONAL), (-1, -1, COST_DIAGONAL),
+))
 
 class GlobalMap:
-    def __init__(self, maps_dir, walkable_ids, transitions_file=None, archway_files=None):
+    def __init__(self, maps_dir, walkable_ids, transitions_file=None, archway_files=None,
+                 atlas_file=None, hpa_file=None):
         self.maps_dir = maps_dir
         self.walkable_ids = set(walkable_ids) # Ex: {186, 121} - IDs que são chão
-        self.cache = OrderedDict()  # LRU cache de arquivos carregados
-        self._cache_max = 150  # ~9.6 MB max (150 * 64 KB)
-        self._filename_cache = OrderedDict()  # (chunk_x, chunk_y, z) -> filename or None
-        self._filename_cache_max = 2048
         self.temporary_obstacles = {} # (x, y, z) -> timestamp
+        # Incrementa a cada bloqueio criado/removido (caches de walkability comparam)
+        self.temp_blocks_version = 0
+        # Rotas globais já calculadas (cavebot em loop repete os mesmos trechos)
+        self.route_cache = RouteCache()
+
+        # Backend alternativo: atlas empacotado (utils/generate_atlas.py)
+        self._atlas = None
+        if atlas_file and os.path.isfile(atlas_file):
+            try:
+                self._atlas = MapAtlas(atlas_file)
+            except (OSError, ValueError) as e:
+                print(f"[GlobalMap] Atlas ignorado ({e}), usando diretório de mapas")
+
+        # Chunks .map em cache de bytes compartilhado no processo (core/chunk_store.py)
+        self._chunk_store = get_chunk_store(maps_dir)
+        if self._atlas is not None:
+            # .map regravados pelo cliente depois da geração do atlas vêm do ChunkStore
+            changed = self._changed_chunks(self._atlas.fingerprints)
+            if changed:
+                self._atlas.use_live_chunks(self._chunk_store, changed)
+                print(f"[GlobalMap] {len(changed)} chunks mudaram desde a geração do atlas, "
+                      f"lidos do diretório de mapas (rode utils/generate_atlas.py)")
+        self._chunks = self._atlas if self._atlas is not None else self._chunk_store
 
         # Transições entre andares: z -> [(x, y, z_to), ...]
         self._transitions_by_floor = defaultdict(list)
@@ -34,18 +81,184 @@ class GlobalMap:
 
         # Overrides de tiles walkables (ex: stone archways que aparecem como montanha)
         self._walkable_overrides = set()
-        if archway_files:
+        if self._atlas is not None:
+            self._walkable_overrides.update(self._atlas.overrides)
+        elif archway_files:
             self._load_archways(archway_files)
 
+        # Máscaras de walkability pré-computadas por chunk: (chunk_x, chunk_y, z) -> bytes
+        # Já incluem archways e tiles de transição (ver WALK_*)
+        self._walk_table = bytes(WALK_OPEN if c in self.walkable_ids else WALK_BLOCKED
+                                 for c in range(256))
+        self._walk_masks = OrderedDict()
+        self._walk_masks_max = 150  # ~9.6 MB max (150 * 64 KB)
+        self._overlay_index = None  # (chunk_x, chunk_y, z) -> ([overrides], [transições])
+
+        if self._atlas is not None:
+            # Transições já vêm no atlas (sem JSON para carregar)
+            self._transitions_file = None
+            self._transitions_loaded = True
+            self._add_transitions(self._atlas.transitions)
+
+        # Jump Point Search como motor padrão do get_path (same-floor)
+        self.use_jps = False
+
+        # Pathfinding hierárquico (HPA*) para rotas longas / cross-floor
+        self._hpa = None
+        if hpa_file:
+            self.enable_hierarchical(hpa_file)
+
+        # Labels de componentes conexas (rejeita rotas impossíveis sem rodar o A*)
+        self._connectivity = None
+        # Landmarks da heurística ALT do A* 3D (None = só octile + LEVEL_PENALTY)
+        self._landmarks = None
+
+    def _changed_chunks(self, fingerprints):
+        """
+        Chunks .map alterados desde a geração de um arquivo pré-computado.
+        Sem o diretório de mapas (só o atlas) não há o que comparar.
+        """
+        if not os.path.isdir(self.maps_dir):
+            return set()
+        return self._chunk_store.changed_chunks(fingerprints)
+
+    def enable_hierarchical(self, cache_file):
+        """
+        Ativa o HPA* no get_path_multilevel com o grafo de clusters de cache_file
+        (utils/generate_hpa_graph.py). Sem arquivo compatível o HPA* fica
+        desligado: montar os clusters durante a busca custa mais que o A* 3D.
+        Retorna o HierarchicalPathfinder ou None.
+        """
+        from core.hpa_pathfinder import HierarchicalPathfinder
+        hpa = HierarchicalPathfinder(self)
+        if not cache_file or not os.path.isfile(cache_file):
+            print(f"[GlobalMap] Grafo HPA não encontrado ({cache_file}), HPA* desativado")
+            hpa = None
+        elif not hpa.load(cache_file):
+            print(f"[GlobalMap] Grafo HPA desatualizado ({cache_file}), HPA* desativado "
+                  f"(gere de novo com utils/generate_hpa_graph.py)")
+            hpa = None
+        else:
+            changed = self._changed_chunks(hpa.fingerprints)
+            if changed:
+                dropped = hpa.drop_chunks(changed)
+                print(f"[GlobalMap] {len(changed)} chunks mudaram desde a geração do grafo HPA, "
+                      f"{dropped} clusters serão recalculados (rode utils/generate_hpa_graph.py)")
+        self._hpa = hpa
+        return hpa
+
+    def load_connectivity(self, path):
+        """
+        Carrega os labels de conectividade (utils/generate_connectivity.py).
+        Com eles, get_path/get_path_multilevel retornam None na hora quando
+        origem e destino estão em componentes diferentes. Componentes perto de
+        chunks que o cliente regravou desde a geração ficam sem essa garantia.
+        """
+        from core.connectivity import ConnectivityLabels
+        labels = ConnectivityLabels.load(path, self.signature())
+        if labels is None:
+            print(f"[GlobalMap] Labels de conectividade desatualizados ({path}), ignorando")
+        else:
+            changed = self._changed_chunks(labels.fingerprints)
+            if changed:
+                self._ensure_transitions_loaded()
+                labels.mark_stale(changed, self._transition_lookup)
+                print(f"[GlobalMap] {len(changed)} chunks mudaram desde a geração dos labels "
+                      f"de conectividade ({path}); componentes vizinhas tratadas como "
+                      f"desconhecidas (rode utils/generate_connectivity.py)")
+        self._connectivity = labels
+        return labels
+
+    def load_landmarks(self, path):
+        """
+        Carrega a tabela de landmarks (utils/generate_landmarks.py). Com ela o
+        get_path_multilevel usa a heurística ALT, que enxerga desvios até a
+        escada/buraco e expande bem menos nós em rotas entre andares. Com algum
+        chunk alterado desde a geração a tabela é recusada (limite inadmissível).
+        """
+        from core.landmarks import LandmarkTable
+        table = LandmarkTable.load(path, self.signature())
+        if table is not None and self._changed_chunks(table.fingerprints):
+            table = None
+        if table is None:
+            print(f"[GlobalMap] Landmarks desatualizados ({path}), usando heurística octile "
+                  f"(gere de novo com utils/generate_landmarks.py)")
+        self._landmarks = table
+        return table
+
+    def fork(self):
+        """
+        Cópia para usar em outra thread (ex: RoutePlanner). Compartilha os dados
+        somente leitura (chunks, transições, overrides, grafos carregados) e tem
+        caches, route_cache e bloqueios temporários próprios.
+        """
+        self._ensure_transitions_loaded()
+        clone = copy.copy(self)
+        clone.temporary_obstacles = dict(self.temporary_obstacles)
+        clone.route_cache = RouteCache()
+        clone._walk_masks = OrderedDict(self._walk_masks)
+        if self._hpa is not None:
+            clone._hpa = self._hpa.fork(clone)
+        if self._connectivity is not None:
+            clone._connectivity = self._connectivity.fork()
+        if self._landmarks is not None:
+            clone._landmarks = self._landmarks.fork()
+        return clone
+
+    def signature(self):
+        """Assinatura dos dados que influenciam as rotas (cores, transições, archways)."""
+        self._ensure_transitions_loaded()
+        crc = zlib.crc32(self._walk_table)
+        crc = zlib.crc32(repr(sorted(
+            (k, tuple(v)) for k, v in self._transition_lookup.items())).encode(), crc)
+        crc = zlib.crc32(repr(sorted(self._walkable_overrides)).encode(), crc)
+        return crc
+
+    def load_route_bundle(self, path, waypoints):
+        """
+        Fixa no route_cache os trechos pré-computados do script
+        (utils/generate_route_bundle.py). Remove o bundle anterior.
+
+        Returns:
+            Número de trechos carregados (0 se o arquivo não existe ou está desatualizado)
+        """
+        from core.route_bundle import read_bundle, waypoints_signature, BUNDLE_KINDS
+
+        self.route_cache.unpin_all()
+        bundle = read_bundle(path)
+        if bundle is None:
+            return 0
+        map_sig, wp_sig, legs = bundle
+        if map_sig != self.signature() or wp_sig != waypoints_signature(waypoints):
+            print(f"[GlobalMap] Bundle de rotas desatualizado ({path}), usando A* em tempo real")
+            return 0
+
+        loaded = 0
+        for kind_code, start, end, path_tiles in legs:
+            # Mapa mudou desde a geração sem mudar a assinatura (ex: .map regravado)
+            if not all(self.is_walkable_offline(x, y, z, ignore_transitions=True)
+                       for x, y, z in path_tiles):
+                continue
+            self.route_cache.pin(BUNDLE_KINDS[kind_code], start, end, path_tiles)
+            loaded += 1
+        return loaded
+
     def _load_transitions(self, filepath):
         with open(filepath, 'r') as f:
             data = json.load(f)
-        for t in data.get("transitions", []):
-            self._transitions_by_floor[t["z_from"]].append(
-                (t["x"], t["y"], t["z_to"])
-            )
-            self._transition_lookup[(t["x"], t["y"], t["z_from"])].append(t["z_to"])
-            self._transition_tiles.add((t["x"], t["y"], t["z_from"]))
+        self._add_transitions(
+            (t["x"], t["y"], t["z_from"], t["z_to"]) for t in data.get("transitions", [])
+        )
+
+    def _add_transitions(self, transitions):
+        """Registra transições (x, y, z_from, z_to)."""
+        for x, y, z_from, z_to in transitions:
+            self._transitions_by_floor[z_from].append((x, y, z_to))
+            self._transition_lookup[(x, y, z_from)].append(z_to)
+            self._transition_tiles.add((x, y, z_from))
+        # Máscaras geradas antes do load não conhecem as transições
+        self._walk_masks.clear()
+        self._overlay_index = None
 
     def _load_archways(self, filepaths):
         """Carrega coordenadas de stone archways dos arquivos (tiles forçados como walkable)."""
@@ -68,95 +281,206 @@ class GlobalMap:
         if self._transitions_file:
             self._load_transitions(self._transitions_file)
 
-    def _resolve_filename(self, chunk_x, chunk_y, abs_z):
-        """Resolve e cacheia o nome do arquivo .map para um chunk."""
-        key = (chunk_x, chunk_y, abs_z)
-        if key in self._filename_cache:
-            self._filename_cache.move_to_end(key)
-            return self._filename_cache[key]
-
-        for f in (f"{chunk_x}{chunk_y}{abs_z:02}.map",
-                  f"{chunk_x:03}{chunk_y:03}{abs_z:02}.map"):
-            if os.path.exists(os.path.join(self.maps_dir, f)):
-                self._filename_cache[key] = f
-                if len(self._filename_cache) > self._filename_cache_max:
-                    self._filename_cache.popitem(last=False)
-                return f
-
-        self._filename_cache[key] = None
-        if len(self._filename_cache) > self._filename_cache_max:
-            self._filename_cache.popitem(last=False)
-        return None
+    def _read_chunk(self, chunk_x, chunk_y, abs_z):
+        """Conteúdo bruto de um chunk .map (bytes do ChunkStore, memoryview do atlas, ou None)."""
+        return self._chunks.get(chunk_x, chunk_y, abs_z)
 
     def get_color_id(self, abs_x, abs_y, abs_z):
         """Lê o byte do arquivo .map correto."""
-        chunk_x = abs_x // 256
-        chunk_y = abs_y // 256
-
-        filename = self._resolve_filename(chunk_x, chunk_y, abs_z)
-        if not filename:
+        data = self._chunks.get(abs_x // 256, abs_y // 256, abs_z)
+        if data is None:
             return 0
 
-        if filename in self.cache:
-            self.cache.move_to_end(filename)  # Mark as recently used
-        else:
-            try:
-                with open(os.path.join(self.maps_dir, filename), "rb") as f:
-                    self.cache[filename] = f.read()
-            except:
-                return 0
-            # Evict oldest entries if over capacity
-            while len(self.cache) > self._cache_max:
-                self.cache.popitem(last=False)
-
         rel_x = abs_x % 256
         rel_y = abs_y % 256
         index = (rel_x * 256) + rel_y
 
-        data = self.cache[filename]
         if index < len(data):
             return data[index]
         return 0
 
+    # ── Máscaras de walkability ────────────────────────────────────
+
+    def _build_walk_mask(self, chunk_x, chunk_y, abs_z):
+        """
+        Converte um chunk .map em máscara de walkability (1 byte por tile).
+        A tradução cor -> walkable é feita em C via bytes.translate; archways
+        e tiles de transição são aplicados por cima.
+        """
+        if self._atlas is not None and self._atlas.walk_table == self._walk_table:
+            # Máscara pré-computada no atlas (mesmas cores walkable)
+            mask = self._atlas.get_mask(chunk_x, chunk_y, abs_z)
+            if mask is not None:
+                return mask
+
+        data = self._read_chunk(chunk_x, chunk_y, abs_z)
+        if data is not None:
+            mask = bytes(data[:CHUNK_SIZE]).translate(self._walk_table)
+            if len(mask) < CHUNK_SIZE:
+                mask += bytes(CHUNK_SIZE - len(mask))
+        else:
+            mask = _EMPTY_MASK
+
+        if self._overlay_index is None:
+            self._overlay_index = self._build_overlay_index()
+        overlay = self._overlay_index.get((chunk_x, chunk_y, abs_z))
+        if not overlay:
+            return mask
+
+        overrides, transitions = overlay
+        mask = bytearray(mask)
+        for idx in overrides:
+            mask[idx] = WALK_OPEN
+        for idx in transitions:
+            if mask[idx] != WALK_BLOCKED:
+                mask[idx] = WALK_TRANSITION
+        return bytes(mask)
+
+    def _build_overlay_index(self):
+        """Agrupa archways e tiles de transição por chunk (índice dentro da máscara)."""
+        index = {}
+        for slot, tiles in ((0, self._walkable_overrides), (1, self._transition_tiles)):
+            for x, y, z in tiles:
+                entry = index.setdefault((x >> 8, y >> 8, z), ([], []))
+                entry[slot].append(((x & 255) << 8) | (y & 255))
+        return index
+
+    def _get_walk_mask(self, chunk_x, chunk_y, abs_z):
+        """Retorna a máscara de walkability do chunk (LRU)."""
+        key = (chunk_x, chunk_y, abs_z)
+        mask = self._walk_masks.get(key)
+        if mask is not None:
+            self._walk_masks.move_to_end(key)
+            return mask
+        mask = self._build_walk_mask(chunk_x, chunk_y, abs_z)
+        self._walk_masks[key] = mask
+        while len(self._walk_masks) > self._walk_masks_max:
+            self._walk_masks.popitem(last=False)
+        return mask
+
+    def _walk_value(self, x, y, z):
+        """Valor WALK_* do tile (sem considerar bloqueios temporários)."""
+        mask = self._walk_masks.get((x >> 8, y >> 8, z))
+        if mask is None:
+            mask = self._get_walk_mask(x >> 8, y >> 8, z)
+        return mask[((x & 255) << 8) | (y & 255)]
+
+    def _active_temp_blocks(self):
+        """Remove bloqueios expirados e retorna o conjunto de tiles ainda bloqueados."""
+        if not self.temporary_obstacles:
+            return frozenset()
+        now = time.time()
+        for key in [k for k, until in self.temporary_obstacles.items() if until <= now]:
+            self._expire_temp_block(key)
+        return frozenset(self.temporary_obstacles)
+
+    def _expire_temp_block(self, key):
+        del self.temporary_obstacles[key]
+        self.temp_blocks_version += 1
+        # Rotas que desviaram desse tile podem ter ficado piores que o necessário
+        self.route_cache.invalidate_expired_block(key)
+
     def is_walkable(self, x, y, z, ignore_transitions=False):
         # 1. Verifica bloqueio temporário
         if (x, y, z) in self.temporary_obstacles:
             if time.time() < self.temporary_obstacles[(x, y, z)]:
                 return False
             else:
-                del self.temporary_obstacles[(x, y, z)] # Expire
+                self._expire_temp_block((x, y, z)) # Expire
 
-        # 2. Verifica se é tile de transição (buraco/escada) — evitar roteamento acidental
-        if not ignore_transitions and (x, y, z) in self._transition_tiles:
-            return False
-
-        # 3. Verifica se é override walkable (stone archways)
-        if (x, y, z) in self._walkable_overrides:
-            return True
-
-        # 4. Verifica cor do mapa
-        color = self.get_color_id(x, y, z)
-        return color in self.walkable_ids
+        # 2. Máscara já inclui transições (buraco/escada) e overrides (stone archways)
+        value = self._walk_value(x, y, z)
+        if value == WALK_TRANSITION:
+            return ignore_transitions
+        return value == WALK_OPEN
 
     def is_walkable_offline(self, x, y, z, ignore_transitions=False):
         """Versão sem temp obstacles/time.time() para geração offline."""
-        if not ignore_transitions and (x, y, z) in self._transition_tiles:
-            return False
-        if (x, y, z) in self._walkable_overrides:
-            return True
-        return self.get_color_id(x, y, z) in self.walkable_ids
+        value = self._walk_value(x, y, z)
+        if value == WALK_TRANSITION:
+            return ignore_transitions
+        return value == WALK_OPEN
 
     def add_temp_block(self, x, y, z, duration=10):
         """Bloqueia um tile temporariamente (ex: player trapando)."""
         self.temporary_obstacles[(x, y, z)] = time.time() + duration
+        self.temp_blocks_version += 1
+        self.route_cache.invalidate_tile((x, y, z))
 
     def clear_temp_blocks(self):
+        for key in list(self.temporary_obstacles):
+            self.route_cache.invalidate_expired_block(key)
         self.temporary_obstacles.clear()
+        self.temp_blocks_version += 1
+
+    def can_step(self, from_pos, to_pos):
+        """True se to_pos é um passo válido a partir de from_pos (mesmas regras do A* 3D)."""
+        to_pos = tuple(to_pos)
+        return any(neighbor == to_pos for neighbor, _ in self._get_neighbors_3d(*from_pos))
 
-    def get_path(self, start_pos, end_pos, max_dist=5000, max_iter=0, offline=False):
+    def local_route(self, start_pos, end_pos, max_nodes=LOCAL_ROUTE_MAX_NODES):
+        """
+        Rota curta no mesmo andar com as regras do A* 3D (corner-cutting e
+        bloqueios temporários), sem o tile de início. Limitada a max_nodes
+        tiles expandidos: serve para emendar o player numa rota já calculada.
+        """
+        start = tuple(start_pos)
+        end = tuple(end_pos)
+        z = start[2]
+        if end[2] != z:
+            return None
+        self._ensure_transitions_loaded()
+        blocked = self._active_temp_blocks()
+        ex, ey = end[0], end[1]
+
+        def _h(pos):
+            dx, dy = abs(pos[0] - ex), abs(pos[1] - ey)
+            return COST_CARDINAL * max(dx, dy)
+
+        open_list = [(_h(start), 0, start)]
+        cost_so_far = {start: 0}
+        came_from = {}
+        expanded = 0
+        while open_list and expanded < max_nodes:
+            _, cost, current = heapq.heappop(open_list)
+            if current == end:
+                path = []
+                while current != start:
+                    path.append(current)
+                    current = came_from[current]
+                path.reverse()
+                return path
+            if cost > cost_so_far[current]:
+                continue
+            expanded += 1
+            for neighbor, move_cost in self._get_neighbors_3d(*current, _blocked=blocked):
+                if neighbor[2] != z:
+                    continue
+                new_cost = cost + move_cost
+                if new_cost < cost_so_far.get(neighbor, new_cost + 1):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    heapq.heappush(open_list, (new_cost + _h(neighbor), new_cost, neighbor))
+        return None
+
+    def _cached_route(self, kind, start_pos, end_pos, compute):
+        """Consulta o route_cache; em caso de miss calcula a rota e guarda."""
+        path = self.route_cache.get(kind, start_pos, end_pos, can_step=self.can_step,
+                                    local_route=self.local_route)
+        if path:
+            return path
+        blocked = self._active_temp_blocks()
+        path = compute()
+        if path:
+            self.route_cache.put(kind, start_pos, end_pos, path, blocked)
+        return path
+
+    def get_path(self, start_pos, end_pos, max_dist=5000, max_iter=0, offline=False, jps=None):
         """
         A* Global com suporte a diagonais.
         Retorna lista [(x,y,z), (x,y,z)...] do início ao fim.
+
+        jps=True usa Jump Point Search (ver _get_path_jps); None segue self.use_jps.
         """
         self._ensure_transitions_loaded()
         sx, sy, sz = start_pos
@@ -179,12 +503,25 @@ class GlobalMap:
                 if found: break
             if not found: return None
 
+        # Componentes diferentes: o A* esgotaria a região inteira sem achar rota
+        if self._connectivity is not None and self._connectivity.disconnected(
+                (sx, sy, sz), (ex, ey, ez)):
+            return None
+
+        if jps is None:
+            jps = self.use_jps
+        if jps:
+            blocked = frozenset() if offline else self._active_temp_blocks()
+            return self._get_path_jps(sx, sy, ex, ey, sz, max_dist, max_iter, blocked)
+
         # Definição dos movimentos: (dx, dy, custo)
         # Cardinais = 10, Diagonais = 14 (aprox raiz de 2)
+        # O 4º campo é o offset do vizinho dentro da máscara do chunk
         moves = [
-            (0, 1, 10), (0, -1, 10), (1, 0, 10), (-1, 0, 10),      # Cardinais
-            (1, 1, 35), (1, -1, 35), (-1, 1, 35), (-1, -1, 35)     # Diagonais
+            (0, 1, 10, 1), (0, -1, 10, -1), (1, 0, 10, 256), (-1, 0, 10, -256),      # Cardinais
+            (1, 1, 35, 257), (1, -1, 35, 255), (-1, 1, 35, -255), (-1, -1, 35, -257) # Diagonais
         ]
+        blocked = frozenset() if offline else self._active_temp_blocks()
 
         open_list = []
         # Heap armazena: (F-Score, H-Score, x, y)
@@ -208,11 +545,19 @@ class GlobalMap:
             if current_cost > max_dist * 10: # Ajuste do limite pelo custo base
                 continue
 
-            for dx, dy, move_cost in moves:
+            # Vizinhos no interior do chunk: leitura direta na máscara pré-computada
+            rx, ry = cx & 255, cy & 255
+            interior = 0 < rx < 255 and 0 < ry < 255
+            if interior:
+                mask = self._get_walk_mask(cx >> 8, cy >> 8, sz)
+                base = (rx << 8) | ry
+
+            for dx, dy, move_cost, offset in moves:
                 nx, ny = cx + dx, cy + dy
-                
+                value = mask[base + offset] if interior else self._walk_value(nx, ny, sz)
+
                 # Verifica se o tile destino é andável
-                if _walkable(nx, ny, sz):
+                if value == WALK_OPEN and not (blocked and (nx, ny, sz) in blocked):
 
                     # CUSTO EXTRA: Se for diagonal, verificar se não está "cortando parede" (opcional mas recomendado)
                     # No Tibia, você não pode andar diagonal se os dois cardinais adjacentes forem bloqueados.
@@ -245,72 +590,349 @@ class GlobalMap:
         path.reverse()
         return path
 
-    def get_path_with_fallback(self, start_pos, end_pos, max_offset=2):
+    def _get_path_jps(self, sx, sy, ex, ey, z, max_dist=5000, max_iter=0, blocked=frozenset()):
+        """
+        Jump Point Search same-floor com o modelo de custo do A* 3D
+        (COST_CARDINAL/COST_DIAGONAL + regra de corner-cutting).
+
+        Como a diagonal exige os dois cardinais livres e COST_DIAGONAL > 2 *
+        COST_CARDINAL, toda diagonal é trocada por dois cardinais mais baratos:
+        as rotas ótimas são 4-conexas. Usamos então JPS 4-conexo com ordem
+        canônica "horizontal antes de vertical": movimento vertical só vira
+        horizontal quando forçado por obstáculo. Só os jump points entram no
+        heap; a rota é expandida de volta para passos tile a tile.
+        """
+        masks = {}
+
+        def _open(x, y):
+            key = (x >> 8, y >> 8)
+            mask = masks.get(key)
+            if mask is None:
+                mask = masks[key] = self._get_walk_mask(key[0], key[1], z)
+            if mask[((x & 255) << 8) | (y & 255)] != WALK_OPEN:
+                return False
+            return not (blocked and (x, y, z) in blocked)
+
+        def _forced_vertical(x, y, dy):
+            # Vizinho horizontal forçado: livre, mas o tile "atrás" dele está bloqueado
+            return ((_open(x + 1, y) and not _open(x + 1, y - dy)) or
+                    (_open(x - 1, y) and not _open(x - 1, y - dy)))
+
+        def _jump_vertical(x, y, dy):
+            rx = x & 255
+            fast_column = not blocked and 0 < rx < 255
+            while True:
+                y += dy
+                ry = y & 255
+                if fast_column and 0 < ry < 255:
+                    # Interior do chunk: varre a coluna direto na máscara
+                    key = (x >> 8, y >> 8)
+                    mask = masks.get(key)
+                    if mask is None:
+                        mask = masks[key] = self._get_walk_mask(key[0], key[1], z)
+                    i = (rx << 8) | ry
+                    goal_i = ((ex & 255) << 8) | (ey & 255) if (ex >> 8, ey >> 8) == key and ex == x else -1
+                    while 0 < ry < 255:
+                        if mask[i] != WALK_OPEN:
+                            return None
+                        if i == goal_i:
+                            return x, y
+                        if ((mask[i + 256] == WALK_OPEN and mask[i + 256 - dy] != WALK_OPEN) or
+                                (mask[i - 256] == WALK_OPEN and mask[i - 256 - dy] != WALK_OPEN)):
+                            return x, y
+                        i += dy
+                        ry += dy
+                        y += dy
+                    y -= dy  # Próximo tile cai na borda do chunk: volta ao passo genérico
+                    continue
+                if not _open(x, y):
+                    return None
+                if (x == ex and y == ey) or _forced_vertical(x, y, dy):
+                    return x, y
+
+        def _jump_horizontal(x, y, dx):
+            while True:
+                x += dx
+                if not _open(x, y):
+                    return None
+                if x == ex and y == ey:
+                    return x, y
+                # Vizinhos verticais são naturais: para se algum deles leva a um jump point
+                if _jump_vertical(x, y, 1) or _jump_vertical(x, y, -1):
+                    return x, y
+
+        def _successors(x, y, dx, dy):
+            if dx == 0 and dy == 0:
+                directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+            elif dx != 0:
+                directions = ((dx, 0), (0, 1), (0, -1))
+            else:
+                directions = [(0, dy)]
+                for hx in (1, -1):
+                    if _open(x + hx, y) and not _open(x + hx, y - dy):
+                        directions.append((hx, 0))
+            for ddx, ddy in directions:
+                point = _jump_horizontal(x, y, ddx) if ddx else _jump_vertical(x, y, ddy)
+                if point:
+                    yield point, ddx, ddy
+
+        start = (sx, sy)
+        goal = (ex, ey)
+        g_score = {start: 0}
+        came_from = {}
+        h_start = (abs(ex - sx) + abs(ey - sy)) * COST_CARDINAL
+        open_list = [(h_start, h_start, sx, sy, 0, 0)]
+        max_cost = max_dist * 10
+
+        iterations = 0
+        while open_list:
+            if max_iter and iterations >= max_iter:
+                break
+            iterations += 1
+            _, _, cx, cy, dx, dy = heapq.heappop(open_list)
+            if (cx, cy) == goal:
+                break
+            current_g = g_score[(cx, cy)]
+            if current_g > max_cost:
+                continue
+
+            for (nx, ny), ndx, ndy in _successors(cx, cy, dx, dy):
+                new_g = current_g + (abs(nx - cx) + abs(ny - cy)) * COST_CARDINAL
+                if new_g < g_score.get((nx, ny), float('inf')):
+                    g_score[(nx, ny)] = new_g
+                    came_from[(nx, ny)] = (cx, cy)
+                    h = (abs(ex - nx) + abs(ey - ny)) * COST_CARDINAL
+                    heapq.heappush(open_list, (new_g + h, h, nx, ny, ndx, ndy))
+
+        if goal not in came_from:
+            return None
+
+        # Expande jump points em passos tile a tile
+        jump_points = [goal]
+        while jump_points[-1] != start:
+            jump_points.append(came_from[jump_points[-1]])
+        jump_points.reverse()
+
+        path = []
+        for (ax, ay), (bx, by) in zip(jump_points, jump_points[1:]):
+            step_x = (bx > ax) - (bx < ax)
+            step_y = (by > ay) - (by < ay)
+            x, y = ax, ay
+            while (x, y) != (bx, by):
+                x += step_x
+                y += step_y
+                path.append((x, y, z))
+        return path
+
+    def get_path_to_goals(self, start_pos, goals, max_dist=5000, max_iter=0, offline=False,
+                          budget=None):
         """
-        Tenta calcular caminho para o destino.
-        Se falhar, tenta tiles adjacentes (fallback inteligente).
+        A* same-floor com vários destinos aceitáveis numa única busca.
+
+        Args:
+            goals: {(x, y, z): penalidade} - custo extra (escala do A*, cardinal = 10)
+                   somado à rota que termina naquele destino
+            budget: SearchBudget (core/route_planner.py) - interrompe a busca quando
+                    o tempo acaba ou ela é cancelada
+
+        Returns:
+            (path, destino escolhido) - destino alcançável de menor custo total
+            (rota + penalidade) - ou (None, None)
+        """
+        self._ensure_transitions_loaded()
+        sx, sy, sz = start_pos
+        _walkable = self.is_walkable_offline if offline else self.is_walkable
+
+        # Destinos em outra componente conexa nunca seriam alcançados
+        start_label = self._connectivity.floor_label(sx, sy, sz) if self._connectivity else 0
+        targets = {}
+        for (gx, gy, gz), penalty in goals.items():
+            if gz == sz and (gx, gy) != (sx, sy) and _walkable(gx, gy, gz):
+                if start_label and self._connectivity.floor_label(gx, gy, gz) not in (0, start_label):
+                    continue
+                targets[(gx, gy)] = penalty
+        if not targets:
+            return None, None
+
+        # Heurística exata para o conjunto: min(Manhattan * 10 + penalidade). Fora da
+        # caixa dos destinos, a parte da distância "até a caixa" é igual para todos,
+        # então o mínimo do resto é pré-calculado por quadrante (fora nos dois eixos)
+        # e por linha/coluna da caixa (fora em um eixo). Dentro da caixa, destino a destino.
+        target_items = tuple((gx, gy, penalty) for (gx, gy), penalty in targets.items())
+        tx0 = min(gx for gx, _, _ in target_items)
+        tx1 = max(gx for gx, _, _ in target_items)
+        ty0 = min(gy for _, gy, _ in target_items)
+        ty1 = max(gy for _, gy, _ in target_items)
+
+        def _to_edge_x(gx, qx):
+            return (gx - tx0) if qx == 0 else (tx1 - gx)
+
+        def _to_edge_y(gy, qy):
+            return (gy - ty0) if qy == 0 else (ty1 - gy)
+
+        corner = {(qx, qy): min(penalty + (_to_edge_x(gx, qx) + _to_edge_y(gy, qy)) * 10
+                                for gx, gy, penalty in target_items)
+                  for qx in (0, 1) for qy in (0, 1)}
+        column = {}     # (x, qy) -> mínimo, calculado sob demanda
+        row = {}        # (y, qx) -> mínimo, calculado sob demanda
+
+        corner_00, corner_01 = corner[(0, 0)], corner[(0, 1)]
+        corner_10, corner_11 = corner[(1, 0)], corner[(1, 1)]
+
+        def _heuristic(nx, ny):
+            if nx < tx0:
+                dx, qx = tx0 - nx, 0
+            elif nx > tx1:
+                dx, qx = nx - tx1, 1
+            else:
+                dx = -1
+            if ny < ty0:
+                dy, qy = ty0 - ny, 0
+            elif ny > ty1:
+                dy, qy = ny - ty1, 1
+            else:
+                dy = -1
+            if dx >= 0:
+                if dy >= 0:
+                    return (dx + dy) * 10 + corner[(qx, qy)]
+                rest = row.get((ny, qx))
+                if rest is None:
+                    rest = row[(ny, qx)] = min(penalty + (_to_edge_x(gx, qx) + abs(gy - ny)) * 10
+                                               for gx, gy, penalty in target_items)
+                return dx * 10 + rest
+            if dy >= 0:
+                rest = column.get((nx, qy))
+                if rest is None:
+                    rest = column[(nx, qy)] = min(penalty + (abs(gx - nx) + _to_edge_y(gy, qy)) * 10
+                                                  for gx, gy, penalty in target_items)
+                return dy * 10 + rest
+            return min((abs(gx - nx) + abs(gy - ny)) * 10 + penalty for gx, gy, penalty in target_items)
+
+        moves = (
+            (0, 1, 10, 1), (0, -1, 10, -1), (1, 0, 10, 256), (-1, 0, 10, -256),      # Cardinais
+            (1, 1, 35, 257), (1, -1, 35, 255), (-1, 1, 35, -255), (-1, -1, 35, -257) # Diagonais
+        )
+        blocked = frozenset() if offline else self._active_temp_blocks()
+
+        # Heap: (F-Score, H-Score, x, y). Ao expandir um destino entra uma entrada
+        # final (custo + penalidade, H = -1); a primeira a sair é o destino mais barato.
+        open_list = [(0, 0, sx, sy)]
+        came_from = {}
+        cost_so_far = {(sx, sy): 0}
+        goal = None
+
+        iterations = 0
+        while open_list:
+            if max_iter and iterations >= max_iter:
+                break
+            if budget is not None and iterations % BUDGET_CHECK_INTERVAL == 0 and budget.exhausted():
+                break
+            iterations += 1
+            _, h_entry, cx, cy = heapq.heappop(open_list)
+
+            if h_entry < 0:
+                goal = (cx, cy)
+                break
+
+            current_cost = cost_so_far[(cx, cy)]
+            penalty = targets.get((cx, cy))
+            if penalty is not None:
+                heapq.heappush(open_list, (current_cost + penalty, -1, cx, cy))
+
+            if current_cost > max_dist * 10:
+                continue
+
+            rx, ry = cx & 255, cy & 255
+            interior = 0 < rx < 255 and 0 < ry < 255
+            if interior:
+                mask = self._get_walk_mask(cx >> 8, cy >> 8, sz)
+                base = (rx << 8) | ry
+
+            for dx, dy, move_cost, offset in moves:
+                nx, ny = cx + dx, cy + dy
+                value = mask[base + offset] if interior else self._walk_value(nx, ny, sz)
+                if value != WALK_OPEN or (blocked and (nx, ny, sz) in blocked):
+                    continue
+                new_cost = current_cost + move_cost
+                if (nx, ny) not in cost_so_far or new_cost < cost_so_far[(nx, ny)]:
+                    cost_so_far[(nx, ny)] = new_cost
+                    # Caso comum (fora da caixa nos dois eixos) inline; resto via _heuristic
+                    if nx < tx0 and ny < ty0:
+                        h_cost = (tx0 - nx + ty0 - ny) * 10 + corner_00
+                    elif nx > tx1 and ny > ty1:
+                        h_cost = (nx - tx1 + ny - ty1) * 10 + corner_11
+                    elif nx < tx0 and ny > ty1:
+                        h_cost = (tx0 - nx + ny - ty1) * 10 + corner_01
+                    elif nx > tx1 and ny < ty0:
+                        h_cost = (nx - tx1 + ty0 - ny) * 10 + corner_10
+                    else:
+                        h_cost = _heuristic(nx, ny)
+                    heapq.heappush(open_list, (new_cost + h_cost, h_cost, nx, ny))
+                    came_from[(nx, ny)] = (cx, cy)
+
+        if goal is None:
+            return None, None
+
+        path = []
+        curr = goal
+        while curr != (sx, sy):
+            path.append((curr[0], curr[1], sz))
+            curr = came_from[curr]
+        path.reverse()
+        return path, (goal[0], goal[1], sz)
+
+    def get_path_with_fallback(self, start_pos, end_pos, max_offset=2, cached=False, budget=None):
+        """
+        Calcula caminho para o destino ou, se ele não tiver rota, para um tile
+        próximo (raio max_offset). Uma única busca com todos os tiles como destinos
+        (get_path_to_goals): cada sqm de distância ao waypoint custa
+        FALLBACK_OFFSET_PENALTY, então o waypoint exato é preferido.
 
         Args:
             start_pos: (x, y, z)
             end_pos: (x, y, z) - waypoint desejado
             max_offset: Raio de busca de tiles adjacentes (padrão: 2)
+            cached: Consulta/alimenta o route_cache
+            budget: SearchBudget (ver get_path_to_goals)
 
         Returns:
             Lista de (x, y, z) ou None se nenhum caminho for achado
         """
+        if cached:
+            return self._cached_route(("fallback", max_offset), tuple(start_pos), tuple(end_pos),
+                                      lambda: self.get_path_with_fallback(start_pos, end_pos, max_offset,
+                                                                          budget=budget))
         self._ensure_transitions_loaded()
         from config import DEBUG_GLOBAL_MAP
 
         ex, ey, ez = end_pos
 
-        # Tentativa 1: Rota direta para o waypoint
-        path = self.get_path(start_pos, end_pos)
-        if path:
-            if DEBUG_GLOBAL_MAP:
-                print(f"[GlobalMap] [OK] Rota direta encontrada para waypoint {end_pos}")
-            return path
+        # Waypoint em parede: get_path trocaria por um vizinho, então o raio mínimo é 1
+        radius = max_offset if self.is_walkable(ex, ey, ez) else max(max_offset, 1)
+        goals = {}
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                goals[(ex + dx, ey + dy, ez)] = (abs(dx) + abs(dy)) * FALLBACK_OFFSET_PENALTY
 
-        # Tentativa 2: Buscar tile adjacente walkable
-        if DEBUG_GLOBAL_MAP:
-            print(f"[GlobalMap] 🔍 Rota direta falhou. Buscando tiles adjacentes...")
-
-        # Busca em espiral: tiles mais próximos primeiro
-        candidates = []
-        for dist in range(1, max_offset + 1):
-            for dx in range(-dist, dist + 1):
-                for dy in range(-dist, dist + 1):
-                    if abs(dx) == dist or abs(dy) == dist:  # Apenas borda do quadrado
-                        nx, ny = ex + dx, ey + dy
-                        candidates.append((nx, ny, ez, abs(dx) + abs(dy), dx, dy))
-
-        # Ordena por distância Manhattan (tiles mais próximos primeiro)
-        candidates.sort(key=lambda c: c[3])
-
-        # Tenta cada candidato
-        for nx, ny, nz, dist, dx, dy in candidates:
-            # Verifica se tile é walkable no mapa global
-            if not self.is_walkable(nx, ny, nz):
-                continue
-
-            # Tenta calcular rota ate esse tile vizinho
-            neighbor_end = (nx, ny, nz)
-            path = self.get_path(start_pos, neighbor_end)
+        path, goal = self.get_path_to_goals(start_pos, goals, budget=budget)
 
-            if path:
-                if DEBUG_GLOBAL_MAP:
-                    print(f"[GlobalMap] [OK] Rota alternativa encontrada!")
-                    print(f"[GlobalMap]   Waypoint original: ({ex}, {ey}, {ez})")
-                    print(f"[GlobalMap]   Tile alternativo: ({nx}, {ny}, {nz}) [offset: ({dx:+d}, {dy:+d})]")
-                    print(f"[GlobalMap]   Distância ao waypoint: {dist} sqm")
-                return path
+        if not path:
+            if DEBUG_GLOBAL_MAP:
+                print(f"[GlobalMap] [X] FALHA COMPLETA: Nem waypoint nem tiles adjacentes (raio {max_offset}) têm rota")
+            #self.diagnose_path_failure(start_pos, end_pos)
+            return None
 
-        # Nenhum tile adjacente funcionou
         if DEBUG_GLOBAL_MAP:
-            print(f"[GlobalMap] [X] FALHA COMPLETA: Nem waypoint nem tiles adjacentes (raio {max_offset}) têm rota")
-
-        #self.diagnose_path_failure(start_pos, end_pos)
-
-        return None
+            gx, gy, _ = goal
+            dx, dy = gx - ex, gy - ey
+            if dx == 0 and dy == 0:
+                print(f"[GlobalMap] [OK] Rota direta encontrada para waypoint {end_pos}")
+            else:
+                print(f"[GlobalMap] [OK] Rota alternativa encontrada!")
+                print(f"[GlobalMap]   Waypoint original: ({ex}, {ey}, {ez})")
+                print(f"[GlobalMap]   Tile alternativo: ({gx}, {gy}, {ez}) [offset: ({dx:+d}, {dy:+d})]")
+                print(f"[GlobalMap]   Distância ao waypoint: {abs(dx) + abs(dy)} sqm")
+        return path
     
     # ── A* 3D Multi-Nível ──────────────────────────────────────────
 
@@ -323,17 +945,56 @@ class GlobalMap:
         h_z = dz * LEVEL_PENALTY
         return h_2d + h_z
 
-    def _get_neighbors_3d(self, x, y, z, _walkable=None):
-        if _walkable is None:
-            _walkable = self.is_walkable
+    def _get_neighbors_3d(self, x, y, z, _walkable=None, _blocked=None):
+        if _walkable is not None:
+            return self._get_neighbors_3d_fn(x, y, z, _walkable)
+        if _blocked is None:
+            _blocked = self._active_temp_blocks()
+
+        neighbors = []
+        rx, ry = x & 255, y & 255
+        if 0 < rx < 255 and 0 < ry < 255:
+            # Interior do chunk: todos os 8 vizinhos estão na mesma máscara
+            mask = self._get_walk_mask(x >> 8, y >> 8, z)
+            base = (rx << 8) | ry
+            for dx, dy, cost, offset in _MOVES_3D:
+                if not mask[base + offset]:
+                    continue
+                # Diagonal: checar corner-cutting
+                if dx != 0 and dy != 0:
+                    if not mask[base + dx * 256] or not mask[base + dy]:
+                        continue
+                    if _blocked and ((x + dx, y, z) in _blocked or (x, y + dy, z) in _blocked):
+                        continue
+                nx, ny = x + dx, y + dy
+                if _blocked and (nx, ny, z) in _blocked:
+                    continue
+                neighbors.append(((nx, ny, z), cost))
+        else:
+            # Borda do chunk: vizinhos podem cair em outras máscaras
+            def _open(tx, ty):
+                return self._walk_value(tx, ty, z) != WALK_BLOCKED and not (_blocked and (tx, ty, z) in _blocked)
+
+            for dx, dy, cost, _ in _MOVES_3D:
+                nx, ny = x + dx, y + dy
+                if not _open(nx, ny):
+                    continue
+                if dx != 0 and dy != 0:
+                    if not _open(x + dx, y) or not _open(x, y + dy):
+                        continue
+                neighbors.append(((nx, ny, z), cost))
+
+        # Transições de andar
+        for z_to in self._transition_lookup.get((x, y, z), []):
+            neighbors.append(((x, y, z_to), COST_TRANSITION))
+
+        return neighbors
+
+    def _get_neighbors_3d_fn(self, x, y, z, _walkable):
+        """Vizinhos 3D usando um predicado de walkability arbitrário."""
         neighbors = []
         # 8 direções no mesmo andar
-        for dx, dy, cost in (
-            (0, 1, COST_CARDINAL), (0, -1, COST_CARDINAL),
-            (1, 0, COST_CARDINAL), (-1, 0, COST_CARDINAL),
-            (1, 1, COST_DIAGONAL), (1, -1, COST_DIAGONAL),
-            (-1, 1, COST_DIAGONAL), (-1, -1, COST_DIAGONAL),
-        ):
+        for dx, dy, cost, _ in _MOVES_3D:
             nx, ny = x + dx, y + dy
             if not _walkable(nx, ny, z, ignore_transitions=True):
                 continue
@@ -349,7 +1010,19 @@ class GlobalMap:
 
         return neighbors
 
-    def get_path_multilevel(self, start_pos, end_pos, max_iter=150000, debug=False, offline=False):
+    def get_path_multilevel(self, start_pos, end_pos, max_iter=150000, debug=False, offline=False,
+                            cached=False, budget=None):
+        """
+        A* 3D (atravessa andares pelas transições).
+
+        budget: SearchBudget (core/route_planner.py). Quando o tempo acaba ou a busca
+        é cancelada, retorna None e guarda em budget.partial a rota até o nó mais
+        próximo do destino alcançado (o mesmo vale ao estourar max_iter).
+        """
+        if cached and not offline and not debug:
+            return self._cached_route("multilevel", tuple(start_pos), tuple(end_pos),
+                                      lambda: self.get_path_multilevel(start_pos, end_pos, max_iter,
+                                                                       budget=budget))
         self._ensure_transitions_loaded()
         sx, sy, sz = start_pos
         ex, ey, ez = end_pos
@@ -383,6 +1056,21 @@ class GlobalMap:
         goal = (ex, ey, ez)
         start = (sx, sy, sz)
 
+        # Componentes diferentes mesmo contando as transições: não existe rota
+        if self._connectivity is not None and self._connectivity.disconnected(
+                start, goal, same_floor=False):
+            _dbg("Origem e destino em componentes desconectadas - abortando")
+            return None
+
+        blocked = frozenset() if offline else self._active_temp_blocks()
+
+        # Rotas longas ou entre andares: busca abstrata + refinamento local
+        if self._hpa is not None and not debug:
+            if sz != ez or max(abs(ex - sx), abs(ey - sy)) > HPA_MIN_DISTANCE:
+                path = self._hpa.find_path(start, goal, blocked, budget=budget)
+                if path:
+                    return path
+
         # Checar transições disponíveis nos andares envolvidos
         if debug:
             floors_needed = set(range(min(sz, ez), max(sz, ez) + 1))
@@ -393,9 +1081,15 @@ class GlobalMap:
                     for t in self._transitions_by_floor.get(fl, []):
                         _dbg(f"  ({t[0]},{t[1]}) -> z={t[2]}")
 
+        heuristic = None
+        if self._landmarks is not None:
+            heuristic = self._landmarks.heuristic(start, goal, self._heuristic_3d)
+        if heuristic is None:
+            heuristic = lambda pos: self._heuristic_3d(pos, goal)
+
         g_score = {start: 0}
         came_from = {}
-        h_start = self._heuristic_3d(start, goal)
+        h_start = heuristic(start)
         open_list = [(h_start, h_start, sx, sy, sz)]
 
         iterations = 0
@@ -405,6 +1099,9 @@ class GlobalMap:
         closest_node = start
 
         while open_list and iterations < max_iter:
+            if budget is not None and iterations % BUDGET_CHECK_INTERVAL == 0 and budget.exhausted():
+                _dbg(f"Budget esgotado ({budget.reason}) apos {iterations} iteracoes")
+                break
             iterations += 1
             _, _, cx, cy, cz = heapq.heappop(open_list)
             current = (cx, cy, cz)
@@ -431,7 +1128,7 @@ class GlobalMap:
             if current_g is None:
                 continue
 
-            for neighbor, move_cost in self._get_neighbors_3d(cx, cy, cz, _walkable=_walkable):
+            for neighbor, move_cost in self._get_neighbors_3d(cx, cy, cz, _blocked=blocked):
                 if debug and neighbor[2] != cz:
                     transitions_used += 1
                     if transitions_used <= 20:
@@ -440,7 +1137,7 @@ class GlobalMap:
                 if new_g < g_score.get(neighbor, float('inf')):
                     g_score[neighbor] = new_g
                     came_from[neighbor] = current
-                    h = self._heuristic_3d(neighbor, goal)
+                    h = heuristic(neighbor)
                     heapq.heappush(open_list, (new_g + h, h, neighbor[0], neighbor[1], neighbor[2]))
 
             if debug and iterations % 30000 == 0:
@@ -461,6 +1158,17 @@ class GlobalMap:
                 'visited_count': len(g_score),
             }
 
+        # Busca interrompida (budget ou max_iter): rota parcial até o nó mais próximo
+        # do destino alcançado. Open list vazia = destino inalcançável, sem parcial.
+        if budget is not None and open_list and closest_node != start:
+            path = []
+            node = closest_node
+            while node != start:
+                path.append(node)
+                node = came_from[node]
+            path.reverse()
+            budget.partial = path
+
         return None
 
     # ── Debug / Diagnóstico ──────────────────────────────────────
@@ -0,0 +1,481 @@
+# core/hpa_pathfinder.py
+"""
+Pathfinding hierárquico (HPA*) sobre o GlobalMap.
+
+Cada andar é dividido em clusters de CLUSTER_SIZE x CLUSTER_SIZE tiles. Os nós
+abstratos são as entradas nas bordas entre clusters vizinhos e os tiles de
+transição de andar (_transition_lookup). Para cada cluster guardamos a matriz
+de custos entre seus nós (Dijkstra restrito ao cluster, mesmo modelo de custo
+do A* 3D: cardinal 10, diagonal 30, sem corner-cutting).
+
+Uma rota longa vira: busca A* no grafo abstrato + refinamento local cluster a
+cluster. O grafo é gerado offline (utils/generate_hpa_graph.py) e salvo em
+disco; clusters ausentes do arquivo são calculados sob demanda, poucos por
+busca (cada um custa um Dijkstra por entrada). O arquivo guarda o fingerprint
+dos .map usados: clusters que dependem de chunks regravados depois da geração
+são descartados no load (drop_chunks) e recalculados como os ausentes.
+"""
+import array
+import copy
+import heapq
+import os
+import struct
+
+from core.chunk_store import pack_fingerprints, unpack_fingerprints
+from core.global_map import COST_CARDINAL, COST_DIAGONAL, COST_TRANSITION, BUDGET_CHECK_INTERVAL
+
+CLUSTER_SIZE = 32
+HPA_MAGIC = b"MBHPA\x00\x00\x00"
+HPA_VERSION = 2
+
+_UNREACHABLE = 0xFFFFFFFF
+_HEADER = struct.Struct("<8sIIII")    # magic, versão, cluster size, assinatura, nº clusters
+_RECORD = struct.Struct("<HHBH")      # kx, ky, z, nº nós
+
+# Segmentos de borda maiores que isso ganham duas entradas (uma em cada ponta)
+_SINGLE_ENTRANCE_MAX = 5
+
+# Clusters fora do grafo que uma busca pode calcular antes de desistir (o A* 3D assume)
+MAX_NEW_CLUSTERS = 4
+
+
+class HierarchicalPathfinder:
+    """Grafo abstrato de clusters + busca hierárquica (HPA*)."""
+
+    def __init__(self, global_map, cluster_size=CLUSTER_SIZE):
+        if 256 % cluster_size != 0:
+            raise ValueError("cluster_size deve dividir 256 (tamanho do chunk)")
+        self.global_map = global_map
+        self.cluster_size = cluster_size
+        # (kx, ky, z) -> (nós [(x, y)], {(x, y): índice}, custos array('I') n*n)
+        self._clusters = {}
+        self.fingerprints = {}  # .map usados na geração do arquivo carregado
+        self._transition_index = None  # (kx, ky, z) -> {(x, y)} (origens e destinos de transições)
+        self.stats = {"built": 0, "loaded": 0}
+        self._build_budget = None  # Máx. clusters novos por busca (None = ilimitado)
+        self._search_budget = None  # SearchBudget da busca em andamento
+
+    def fork(self, global_map):
+        """Cópia ligada a um GlobalMap.fork(): compartilha os clusters, estado de busca próprio."""
+        clone = copy.copy(self)
+        clone.global_map = global_map
+        clone.stats = {"built": 0, "loaded": self.stats["loaded"]}
+        clone._build_budget = None
+        clone._search_budget = None
+        return clone
+
+    # ── Assinatura / persistência ──────────────────────────────────
+
+    def signature(self):
+        """Assinatura dos dados que influenciam o grafo (cores, transições, archways)."""
+        return self.global_map.signature()
+
+    def save(self, path, fingerprints):
+        """Grava todos os clusters calculados (fingerprints: ChunkStore.fingerprints())."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(HPA_MAGIC, HPA_VERSION, self.cluster_size,
+                                 self.signature(), len(self._clusters)))
+            f.write(pack_fingerprints(fingerprints))
+            for (kx, ky, z), (nodes, _, costs) in self._clusters.items():
+                f.write(_RECORD.pack(kx, ky, z, len(nodes)))
+                coords = array.array("H")
+                for x, y in nodes:
+                    coords.append(x)
+                    coords.append(y)
+                f.write(coords.tobytes())
+                f.write(costs.tobytes())
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Carrega clusters do disco. Retorna False se o arquivo não bate com o mapa atual."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        if len(data) < _HEADER.size:
+            return False
+        magic, version, cluster_size, signature, count = _HEADER.unpack_from(data, 0)
+        if (magic != HPA_MAGIC or version != HPA_VERSION
+                or cluster_size != self.cluster_size or signature != self.signature()):
+            return False
+
+        self.fingerprints, offset = unpack_fingerprints(data, _HEADER.size)
+        for _ in range(count):
+            kx, ky, z, n = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            coords = array.array("H")
+            coords.frombytes(data[offset:offset + n * 4])
+            offset += n * 4
+            costs = array.array("I")
+            costs.frombytes(data[offset:offset + n * n * 4])
+            offset += n * n * 4
+            nodes = [(coords[i * 2], coords[i * 2 + 1]) for i in range(n)]
+            self._clusters[(kx, ky, z)] = (nodes, {xy: i for i, xy in enumerate(nodes)}, costs)
+        self.stats["loaded"] = count
+        return True
+
+    def drop_chunks(self, changed):
+        """
+        Descarta os clusters que dependem de chunks alterados: os do chunk e os
+        encostados nele pelos chunks vizinhos (as entradas de borda olham os
+        dois lados). Retorna quantos clusters saíram.
+        """
+        per_chunk = 256 // self.cluster_size
+        dropped = 0
+        for cx, cy, z in changed:
+            for kx in range(cx * per_chunk - 1, (cx + 1) * per_chunk + 1):
+                for ky in range(cy * per_chunk - 1, (cy + 1) * per_chunk + 1):
+                    if self._clusters.pop((kx, ky, z), None) is not None:
+                        dropped += 1
+        self.stats["loaded"] -= dropped
+        return dropped
+
+    # ── Construção de clusters ─────────────────────────────────────
+
+    def _cluster_of(self, x, y, z):
+        return (x // self.cluster_size, y // self.cluster_size, z)
+
+    def _cluster_grid(self, kx, ky, z):
+        """Valores WALK_* do cluster como bytes (index local = lx * C + ly)."""
+        c = self.cluster_size
+        x0, y0 = kx * c, ky * c
+        mask = self.global_map._get_walk_mask(x0 >> 8, y0 >> 8, z)
+        ry0 = y0 & 255
+        rows = []
+        for lx in range(c):
+            base = ((x0 + lx) & 255) << 8
+            rows.append(bytes(mask[base + ry0:base + ry0 + c]))
+        return b"".join(rows)
+
+    def _build_transition_index(self):
+        gm = self.global_map
+        gm._ensure_transitions_loaded()
+        index = {}
+        for (x, y, z), z_tos in gm._transition_lookup.items():
+            index.setdefault(self._cluster_of(x, y, z), set()).add((x, y))
+            for z_to in z_tos:
+                index.setdefault(self._cluster_of(x, y, z_to), set()).add((x, y))
+        return index
+
+    def _border_entrances(self, fixed, start, vertical, z):
+        """
+        Entradas numa borda entre dois clusters.
+        vertical=True: borda entre x=fixed e x=fixed+1, varrendo y em [start, start+C).
+        Retorna a lista de coordenadas variáveis (y ou x) escolhidas.
+        """
+        walk = self.global_map._walk_value
+        result = []
+        seg_start = None
+        for i in range(self.cluster_size + 1):
+            if i < self.cluster_size:
+                v = start + i
+                if vertical:
+                    open_ = walk(fixed, v, z) and walk(fixed + 1, v, z)
+                else:
+                    open_ = walk(v, fixed, z) and walk(v, fixed + 1, z)
+            else:
+                open_ = False
+            if open_ and seg_start is None:
+                seg_start = start + i
+            elif not open_ and seg_start is not None:
+                seg_end = start + i - 1
+                if seg_end - seg_start + 1 <= _SINGLE_ENTRANCE_MAX:
+                    result.append((seg_start + seg_end) // 2)
+                else:
+                    result.append(seg_start)
+                    result.append(seg_end)
+                seg_start = None
+        return result
+
+    def _cluster_nodes(self, kx, ky, z):
+        """Nós abstratos do cluster: entradas nas 4 bordas + tiles de transição."""
+        c = self.cluster_size
+        x0, y0 = kx * c, ky * c
+        x1, y1 = x0 + c - 1, y0 + c - 1
+        nodes = set()
+        # Leste (x1 | x1+1) e oeste (x0-1 | x0)
+        for y in self._border_entrances(x1, y0, True, z):
+            nodes.add((x1, y))
+        for y in self._border_entrances(x0 - 1, y0, True, z):
+            nodes.add((x0, y))
+        # Sul (y1 | y1+1) e norte (y0-1 | y0)
+        for x in self._border_entrances(y1, x0, False, z):
+            nodes.add((x, y1))
+        for x in self._border_entrances(y0 - 1, x0, False, z):
+            nodes.add((x, y0))
+
+        if self._transition_index is None:
+            self._transition_index = self._build_transition_index()
+        nodes.update(self._transition_index.get((kx, ky, z), ()))
+        return sorted(nodes)
+
+    def _build_cluster(self, kx, ky, z):
+        c = self.cluster_size
+        x0, y0 = kx * c, ky * c
+        grid = self._cluster_grid(kx, ky, z)
+        nodes = [xy for xy in self._cluster_nodes(kx, ky, z)
+                 if grid[(xy[0] - x0) * c + (xy[1] - y0)]]
+        index = {xy: i for i, xy in enumerate(nodes)}
+        n = len(nodes)
+        costs = array.array("I", [_UNREACHABLE]) * (n * n)
+        for i, (x, y) in enumerate(nodes):
+            costs[i * n + i] = 0
+            dist, _ = _grid_dijkstra(grid, c, (x - x0) * c + (y - y0))
+            for j in range(i + 1, n):
+                jx, jy = nodes[j]
+                d = dist[(jx - x0) * c + (jy - y0)]
+                costs[i * n + j] = d
+                costs[j * n + i] = d
+        return nodes, index, costs
+
+    def ensure_cluster(self, kx, ky, z):
+        cluster = self._clusters.get((kx, ky, z))
+        if cluster is None:
+            if self._build_budget is not None:
+                if self._build_budget <= 0:
+                    raise _BuildBudgetExceeded()
+                self._build_budget -= 1
+            if self._search_budget is not None and self._search_budget.exhausted():
+                raise _BuildBudgetExceeded()
+            cluster = self._build_cluster(kx, ky, z)
+            self._clusters[(kx, ky, z)] = cluster
+            self.stats["built"] += 1
+        return cluster
+
+    def build_chunk(self, chunk_x, chunk_y, z):
+        """Calcula todos os clusters de um chunk .map (uso offline)."""
+        per_chunk = 256 // self.cluster_size
+        for i in range(per_chunk):
+            for j in range(per_chunk):
+                self.ensure_cluster(chunk_x * per_chunk + i, chunk_y * per_chunk + j, z)
+
+    # ── Busca ──────────────────────────────────────────────────────
+
+    def _local_costs(self, pos, blocked):
+        """Custos de pos até cada nó do seu cluster (e parentes locais)."""
+        x, y, z = pos
+        kx, ky, _ = self._cluster_of(x, y, z)
+        c = self.cluster_size
+        x0, y0 = kx * c, ky * c
+        grid = self._cluster_grid(kx, ky, z)
+        dist, _ = _grid_dijkstra(grid, c, (x - x0) * c + (y - y0),
+                                 _local_blocked(blocked, x0, y0, z, c))
+        nodes, _, _ = self.ensure_cluster(kx, ky, z)
+        result = {}
+        for nx, ny in nodes:
+            d = dist[(nx - x0) * c + (ny - y0)]
+            if d != _UNREACHABLE:
+                result[(nx, ny, z)] = d
+        return result, dist
+
+    def _abstract_neighbors(self, node):
+        x, y, z = node
+        kx, ky, _ = self._cluster_of(x, y, z)
+        nodes, index, costs = self.ensure_cluster(kx, ky, z)
+        i = index.get((x, y))
+        if i is not None:
+            n = len(nodes)
+            row = i * n
+            for j in range(n):
+                cost = costs[row + j]
+                if j != i and cost != _UNREACHABLE:
+                    yield (nodes[j][0], nodes[j][1], z), cost
+
+        # Entradas: parceiro do outro lado da borda
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = x + dx, y + dy
+            nkey = self._cluster_of(nx, ny, z)
+            if nkey == (kx, ky, z):
+                continue
+            _, nindex, _ = self.ensure_cluster(*nkey)
+            if (nx, ny) in nindex:
+                yield (nx, ny, z), COST_CARDINAL
+
+        # Transições de andar
+        for z_to in self.global_map._transition_lookup.get((x, y, z), ()):
+            yield (x, y, z_to), COST_TRANSITION
+
+    def find_path(self, start_pos, end_pos, blocked=frozenset(), max_expansions=200000,
+                  max_new_clusters=MAX_NEW_CLUSTERS, budget=None):
+        """
+        Rota hierárquica de start_pos até end_pos.
+        Retorna lista [(x, y, z), ...] (sem o start, com o goal), no mesmo formato
+        do get_path_multilevel, ou None se não houver rota (ou se a busca precisar
+        calcular mais de max_new_clusters clusters fora do grafo pré-computado).
+
+        budget: SearchBudget (core/route_planner.py) - consultado a cada
+        BUDGET_CHECK_INTERVAL expansões e antes de calcular cada cluster novo;
+        esgotado, a busca retorna None.
+        """
+        self._build_budget = max_new_clusters
+        self._search_budget = budget
+        try:
+            return self._find_path(start_pos, end_pos, blocked, max_expansions, budget)
+        except _BuildBudgetExceeded:
+            return None
+        finally:
+            self._build_budget = None
+            self._search_budget = None
+
+    def _find_path(self, start_pos, end_pos, blocked, max_expansions, budget=None):
+        gm = self.global_map
+        gm._ensure_transitions_loaded()
+        start = tuple(start_pos)
+        goal = tuple(end_pos)
+        if start == goal:
+            return []
+        if not gm._walk_value(*start) or not gm._walk_value(*goal) or goal in blocked:
+            return None
+
+        start_edges, _ = self._local_costs(start, blocked)
+        goal_edges, goal_dist = self._local_costs(goal, blocked)
+        # Start e goal no mesmo cluster: aresta direta
+        if self._cluster_of(*start) == self._cluster_of(*goal):
+            c = self.cluster_size
+            kx, ky, _ = self._cluster_of(*goal)
+            d = goal_dist[(start[0] - kx * c) * c + (start[1] - ky * c)]
+            if d != _UNREACHABLE:
+                start_edges[goal] = d
+
+        heuristic = gm._heuristic_3d
+        g_score = {start: 0}
+        came_from = {}
+        open_list = [(heuristic(start, goal), start)]
+        expansions = 0
+        found = False
+
+        while open_list and expansions < max_expansions:
+            f, current = heapq.heappop(open_list)
+            if current == goal:
+                found = True
+                break
+            current_g = g_score[current]
+            if f - heuristic(current, goal) > current_g:
+                continue  # Entrada obsoleta no heap
+            if budget is not None and expansions % BUDGET_CHECK_INTERVAL == 0 and budget.exhausted():
+                return None
+            expansions += 1
+
+            edges = list(self._abstract_neighbors(current)) if current != start else []
+            if current == start:
+                edges.extend(start_edges.items())
+            if current in goal_edges:
+                edges.append((goal, goal_edges[current]))
+
+            for neighbor, cost in edges:
+                # Custos do grafo ignoram bloqueios temporários: nó bloqueado não entra
+                if blocked and neighbor in blocked:
+                    continue
+                new_g = current_g + cost
+                if new_g < g_score.get(neighbor, _UNREACHABLE):
+                    g_score[neighbor] = new_g
+                    came_from[neighbor] = current
+                    heapq.heappush(open_list, (new_g + heuristic(neighbor, goal), neighbor))
+
+        if not found:
+            return None
+
+        abstract = [goal]
+        while abstract[-1] != start:
+            abstract.append(came_from[abstract[-1]])
+        abstract.reverse()
+        return self._refine(abstract, blocked)
+
+    def _refine(self, abstract, blocked):
+        """Expande a rota abstrata em passos tile a tile."""
+        path = []
+        for a, b in zip(abstract, abstract[1:]):
+            if a[2] != b[2] or self._cluster_of(*a) != self._cluster_of(*b):
+                # Transição de andar ou travessia de borda (tiles adjacentes)
+                if b in blocked:
+                    return None
+                path.append(b)
+                continue
+            segment = self._cluster_path(a, b, blocked)
+            if segment is None:
+                return None
+            path.extend(segment)
+        return path
+
+    def _cluster_path(self, a, b, blocked):
+        """Menor caminho a -> b restrito ao cluster (sem a, com b)."""
+        x, y, z = a
+        kx, ky, _ = self._cluster_of(x, y, z)
+        c = self.cluster_size
+        x0, y0 = kx * c, ky * c
+        grid = self._cluster_grid(kx, ky, z)
+        target = (b[0] - x0) * c + (b[1] - y0)
+        dist, parent = _grid_dijkstra(grid, c, (x - x0) * c + (y - y0),
+                                      _local_blocked(blocked, x0, y0, z, c), target)
+        if dist[target] == _UNREACHABLE:
+            return None
+        segment = []
+        idx = target
+        source = (x - x0) * c + (y - y0)
+        while idx != source:
+            segment.append((x0 + idx // c, y0 + idx % c, z))
+            idx = parent[idx]
+        segment.reverse()
+        return segment
+
+
+class _BuildBudgetExceeded(Exception):
+    """Busca precisou de mais clusters novos do que o permitido."""
+
+
+def _local_blocked(blocked, x0, y0, z, c):
+    """Converte bloqueios temporários absolutos em índices locais do cluster."""
+    if not blocked:
+        return None
+    local = set()
+    for bx, by, bz in blocked:
+        if bz == z and x0 <= bx < x0 + c and y0 <= by < y0 + c:
+            local.add((bx - x0) * c + (by - y0))
+    return local or None
+
+
+def _grid_dijkstra(grid, c, source, blocked=None, target=None):
+    """
+    Dijkstra 8-direções num grid c x c (index = lx * c + ly), com a mesma regra
+    de corner-cutting do GlobalMap._get_neighbors_3d.
+    Retorna (dist, parent) como listas indexadas pelo índice local
+    (_UNREACHABLE / -1 onde não alcançado).
+    """
+    size = c * c
+    dist = [_UNREACHABLE] * size
+    parent = [-1] * size
+    dist[source] = 0
+    heap = [(0, source)]
+    moves = ((0, 1, COST_CARDINAL, 1), (0, -1, COST_CARDINAL, -1),
+             (1, 0, COST_CARDINAL, c), (-1, 0, COST_CARDINAL, -c),
+             (1, 1, COST_DIAGONAL, c + 1), (1, -1, COST_DIAGONAL, c - 1),
+             (-1, 1, COST_DIAGONAL, -c + 1), (-1, -1, COST_DIAGONAL, -c - 1))
+    while heap:
+        d, idx = heapq.heappop(heap)
+        if d > dist[idx]:
+            continue
+        if idx == target:
+            break
+        lx, ly = divmod(idx, c)
+        for dx, dy, cost, offset in moves:
+            if not (0 <= lx + dx < c and 0 <= ly + dy < c):
+                continue
+            nidx = idx + offset
+            if not grid[nidx] or (blocked and nidx in blocked):
+                continue
+            if dx and dy:
+                side_a = idx + dx * c
+                side_b = idx + dy
+                if not grid[side_a] or not grid[side_b]:
+                    continue
+                if blocked and (side_a in blocked or side_b in blocked):
+                    continue
+            nd = d + cost
+            if nd < dist[nidx]:
+                dist[nidx] = nd
+                parent[nidx] = idx
+                heapq.heappush(heap, (nd, nidx))
+    return dist, parent
@@ -0,0 +1,323 @@
+# core/landmarks.py
+"""
+Heurística ALT (A*, Landmarks e desigualdade triangular) para o A* 3D do GlobalMap.
+
+Para cada landmark L guardamos as distâncias exatas (mesmo grafo do
+get_path_multilevel: cardinal 10, diagonal 30 sem corner-cutting, transições
+20) de L até cada tile e de cada tile até L. Pela desigualdade triangular:
+
+    d(v, g) >= d(L, g) - d(L, v)        d(v, g) >= d(v, L) - d(g, L)
+
+o que "enxerga" desvios até uma escada distante que a octile não vê.
+
+Guardar a distância por tile seria grande demais, então cada chunk é dividido
+em blocos de ALT_BLOCK x ALT_BLOCK tiles e salvamos o mínimo e o máximo de cada
+direção por bloco (em passos cardinais, uint16). Usando o mínimo do lado que
+soma e o máximo do lado que subtrai, o limite continua admissível.
+
+Gerado offline (utils/generate_landmarks.py). Na busca só os ACTIVE_LANDMARKS
+com o melhor limite na origem são avaliados. Um atalho novo em qualquer chunk
+encurta distâncias em qualquer lugar e o limite deixa de ser admissível: com
+algum .map alterado desde a geração (fingerprints) a tabela inteira é recusada.
+"""
+import array
+import heapq
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+from core.chunk_store import pack_fingerprints, unpack_fingerprints
+from core.global_map import COST_CARDINAL, COST_DIAGONAL, COST_TRANSITION, WALK_BLOCKED
+
+ALT_MAGIC = b"MBALT\x00\x00\x00"
+ALT_VERSION = 2
+
+ALT_BLOCK_SHIFT = 3
+ALT_BLOCK = 1 << ALT_BLOCK_SHIFT               # 8x8 tiles por bloco
+BLOCKS_PER_SIDE = 256 >> ALT_BLOCK_SHIFT
+BLOCKS_PER_CHUNK = BLOCKS_PER_SIDE * BLOCKS_PER_SIDE
+ACTIVE_LANDMARKS = 4                           # Landmarks avaliados por busca
+
+# Distância desconhecida/infinita (bloco não alcançado ou com tiles não alcançados)
+ALT_INF = 0xFFFF
+
+_HEADER = struct.Struct("<8sIIII")    # magic, versão, assinatura, nº landmarks, nº registros
+_LANDMARK = struct.Struct("<HHB")     # x, y, z
+_RECORD = struct.Struct("<HHBHI")     # cx, cy, z, landmark, tamanho comprimido
+
+# Registro de um (chunk, landmark): 4 planos de BLOCKS_PER_CHUNK uint16
+_FROM_LO, _FROM_HI, _TO_LO, _TO_HI = (i * BLOCKS_PER_CHUNK for i in range(4))
+
+# Vizinhos no mesmo andar: (dx, dy, custo, offset na máscara); index = rel_x * 256 + rel_y
+_MOVES = tuple((dx, dy, cost, dx * 256 + dy) for dx, dy, cost in (
+    (0, 1, COST_CARDINAL), (0, -1, COST_CARDINAL),
+    (1, 0, COST_CARDINAL), (-1, 0, COST_CARDINAL),
+    (1, 1, COST_DIAGONAL), (1, -1, COST_DIAGONAL),
+    (-1, 1, COST_DIAGONAL), (-1, -1, COST_DIAGONAL),
+))
+
+
+def _block_index(x, y):
+    return (((x & 255) >> ALT_BLOCK_SHIFT) * BLOCKS_PER_SIDE) + ((y & 255) >> ALT_BLOCK_SHIFT)
+
+
+# ── Construção (offline) ──────────────────────────────────────────────
+
+def landmark_blocks(global_map, source, reverse=False):
+    """
+    Dijkstra a partir do landmark no grafo do A* 3D (sem temp blocks).
+    reverse=True calcula a distância de cada tile ATÉ o landmark.
+
+    Returns:
+        {(cx, cy, z): (lo, hi)} - array('H') por bloco em passos cardinais.
+        hi = ALT_INF quando algum tile walkable do bloco não foi alcançado.
+    """
+    global_map._ensure_transitions_loaded()
+    walk_mask = global_map._get_walk_mask
+    if reverse:
+        transitions = {}
+        for (x, y, z_from), targets in global_map._transition_lookup.items():
+            for z_to in targets:
+                transitions.setdefault((x, y, z_to), []).append(z_from)
+    else:
+        transitions = global_map._transition_lookup
+
+    dist = {}        # (cx, cy, z) -> array('I') por tile
+    masks = {}
+    unreached = 0xFFFFFFFF
+
+    def _chunk(key):
+        arr = dist.get(key)
+        if arr is None:
+            arr = dist[key] = array.array("I", [unreached]) * 65536
+            masks[key] = walk_mask(*key)
+        return arr
+
+    sx, sy, sz = source
+    _chunk((sx >> 8, sy >> 8, sz))[((sx & 255) << 8) | (sy & 255)] = 0
+    heap = [(0, sx, sy, sz)]
+
+    while heap:
+        d, x, y, z = heapq.heappop(heap)
+        key = (x >> 8, y >> 8, z)
+        arr = dist[key]
+        idx = ((x & 255) << 8) | (y & 255)
+        if d > arr[idx]:
+            continue
+        mask = masks[key]
+
+        # Mesmo andar. Ida: o vizinho precisa ser walkable. Volta: o tile atual
+        # precisa ser walkable (ninguém entra num tile bloqueado), o vizinho não.
+        if not reverse or mask[idx] != WALK_BLOCKED:
+            rx, ry = x & 255, y & 255
+            interior = 0 < rx < 255 and 0 < ry < 255
+            for dx, dy, cost, offset in _MOVES:
+                nx, ny = x + dx, y + dy
+                if interior:
+                    target = mask[idx + offset]
+                    corners = dx == 0 or dy == 0 or (mask[idx + dx * 256] and mask[idx + dy])
+                else:
+                    target = global_map._walk_value(nx, ny, z)
+                    corners = dx == 0 or dy == 0 or (global_map._walk_value(nx, y, z)
+                                                     and global_map._walk_value(x, ny, z))
+                if not corners or (not reverse and target == WALK_BLOCKED):
+                    continue
+                nd = d + cost
+                nkey = (nx >> 8, ny >> 8, z)
+                narr = arr if nkey == key else _chunk(nkey)
+                nidx = ((nx & 255) << 8) | (ny & 255)
+                if nd < narr[nidx]:
+                    narr[nidx] = nd
+                    heapq.heappush(heap, (nd, nx, ny, z))
+
+        for nz in transitions.get((x, y, z), ()):
+            nd = d + COST_TRANSITION
+            narr = _chunk((x >> 8, y >> 8, nz))
+            if nd < narr[idx]:
+                narr[idx] = nd
+                heapq.heappush(heap, (nd, x, y, nz))
+
+    blocks = {}
+    for key, arr in dist.items():
+        mask = masks[key]
+        lo = array.array("H", [ALT_INF]) * BLOCKS_PER_CHUNK
+        hi = array.array("H", [0]) * BLOCKS_PER_CHUNK
+        for idx in range(65536):
+            d = arr[idx]
+            b = ((idx >> (8 + ALT_BLOCK_SHIFT)) * BLOCKS_PER_SIDE) + ((idx & 255) >> ALT_BLOCK_SHIFT)
+            if d == unreached:
+                if mask[idx] != WALK_BLOCKED:
+                    hi[b] = ALT_INF
+                continue
+            # Passos cardinais: lo arredonda para baixo, hi para cima
+            steps = d // COST_CARDINAL
+            if steps < lo[b]:
+                lo[b] = min(steps, ALT_INF - 1)
+            if hi[b] != ALT_INF:
+                up = -(-d // COST_CARDINAL)
+                if up > hi[b]:
+                    hi[b] = up if up < ALT_INF else ALT_INF
+        for b in range(BLOCKS_PER_CHUNK):
+            if lo[b] == ALT_INF:
+                hi[b] = ALT_INF
+        blocks[key] = (lo, hi)
+    return blocks
+
+
+def pack_record(from_blocks, to_blocks):
+    """Junta as duas direções de um (chunk, landmark) no registro comprimido."""
+    empty = array.array("H", [ALT_INF]) * BLOCKS_PER_CHUNK
+    from_lo, from_hi = from_blocks or (empty, empty)
+    to_lo, to_hi = to_blocks or (empty, empty)
+    return zlib.compress((from_lo + from_hi + to_lo + to_hi).tobytes(), 6)
+
+
+# ── Consulta (runtime) ────────────────────────────────────────────────
+
+class LandmarkTable:
+    """Distâncias por bloco até/desde os landmarks, descomprimidas sob demanda (LRU)."""
+
+    def __init__(self, landmarks, records, max_decoded=256, fingerprints=None):
+        self.landmarks = landmarks     # [(x, y, z)]
+        self._records = records        # (cx, cy, z) -> {landmark: zlib bytes}
+        self._decoded = OrderedDict()  # (cx, cy, z, landmark) -> array('H') (LRU)
+        self._max_decoded = max_decoded
+        self.fingerprints = fingerprints or {}  # Chunks .map usados na geração
+
+    def fork(self):
+        """Cópia para outra thread (mesmos registros, LRU de blocos descomprimidos próprio)."""
+        return LandmarkTable(self.landmarks, self._records, self._max_decoded, self.fingerprints)
+
+    def _blocks(self, key, landmark):
+        dkey = key + (landmark,)
+        blocks = self._decoded.get(dkey)
+        if blocks is not None:
+            self._decoded.move_to_end(dkey)
+            return blocks
+        compressed = self._records.get(key, {}).get(landmark)
+        if compressed is None:
+            return None
+        blocks = array.array("H")
+        blocks.frombytes(zlib.decompress(compressed))
+        self._decoded[dkey] = blocks
+        while len(self._decoded) > self._max_decoded:
+            self._decoded.popitem(last=False)
+        return blocks
+
+    def _bound(self, v_blocks, vb, g_blocks, gb):
+        """Limite inferior (passos cardinais) de d(v, g) por um landmark, ou 0."""
+        bound = 0
+        v_hi = v_blocks[_FROM_HI + vb]
+        g_lo = g_blocks[_FROM_LO + gb]
+        if v_hi != ALT_INF and g_lo != ALT_INF:
+            bound = g_lo - v_hi
+        v_lo = v_blocks[_TO_LO + vb]
+        g_hi = g_blocks[_TO_HI + gb]
+        if v_lo != ALT_INF and g_hi != ALT_INF and v_lo - g_hi > bound:
+            bound = v_lo - g_hi
+        return bound
+
+    def heuristic(self, start, goal, base, active=ACTIVE_LANDMARKS):
+        """
+        Heurística h(pos) = max(base(pos, goal), limite ALT) para uma busca
+        start -> goal. Retorna None se nenhum landmark ajuda nessa busca.
+        """
+        gkey = (goal[0] >> 8, goal[1] >> 8, goal[2])
+        skey = (start[0] >> 8, start[1] >> 8, start[2])
+        gb = _block_index(goal[0], goal[1])
+        sb = _block_index(start[0], start[1])
+
+        # Landmarks com o maior limite na origem
+        ranked = []
+        for landmark in self._records.get(gkey, ()):
+            g_blocks = self._blocks(gkey, landmark)
+            s_blocks = self._blocks(skey, landmark)
+            if s_blocks is None:
+                continue
+            bound = self._bound(s_blocks, sb, g_blocks, gb)
+            if bound > 0:
+                ranked.append((bound, landmark, g_blocks))
+        if not ranked:
+            return None
+        ranked.sort(reverse=True)
+        # (landmark, d(L, g) mín., d(g, L) máx.)
+        selected = tuple((landmark, g_blocks[_FROM_LO + gb], g_blocks[_TO_HI + gb])
+                         for _, landmark, g_blocks in ranked[:active])
+
+        chunk_blocks = {}   # (cx, cy, z) -> [array por landmark selecionado] (só nesta busca)
+
+        def _h(pos):
+            best = base(pos, goal)
+            x, y, z = pos
+            key = (x >> 8, y >> 8, z)
+            per_landmark = chunk_blocks.get(key)
+            if per_landmark is None:
+                per_landmark = chunk_blocks[key] = [self._blocks(key, landmark)
+                                                    for landmark, _, _ in selected]
+            b = (((x & 255) >> ALT_BLOCK_SHIFT) * BLOCKS_PER_SIDE) + ((y & 255) >> ALT_BLOCK_SHIFT)
+            for blocks, (_, g_from_lo, g_to_hi) in zip(per_landmark, selected):
+                if blocks is None:
+                    continue
+                v_hi = blocks[_FROM_HI + b]
+                if v_hi != ALT_INF and g_from_lo != ALT_INF:
+                    bound = (g_from_lo - v_hi) * COST_CARDINAL
+                    if bound > best:
+                        best = bound
+                v_lo = blocks[_TO_LO + b]
+                if v_lo != ALT_INF and g_to_hi != ALT_INF:
+                    bound = (v_lo - g_to_hi) * COST_CARDINAL
+                    if bound > best:
+                        best = bound
+            return best
+
+        return _h
+
+    # ── Persistência ───────────────────────────────────────────────
+
+    def save(self, path, signature, fingerprints):
+        """fingerprints: ChunkStore.fingerprints() dos .map usados na geração."""
+        tmp_path = path + ".tmp"
+        count = sum(len(per_landmark) for per_landmark in self._records.values())
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(ALT_MAGIC, ALT_VERSION, signature, len(self.landmarks), count))
+            f.write(pack_fingerprints(fingerprints))
+            for x, y, z in self.landmarks:
+                f.write(_LANDMARK.pack(x, y, z))
+            for (cx, cy, z), per_landmark in self._records.items():
+                for landmark, compressed in per_landmark.items():
+                    f.write(_RECORD.pack(cx, cy, z, landmark, len(compressed)))
+                    f.write(compressed)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """Carrega a tabela. Retorna None se o arquivo não existe ou não bate com o mapa."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, file_signature, n_landmarks, count = _HEADER.unpack_from(data, 0)
+        if magic != ALT_MAGIC or version != ALT_VERSION or file_signature != signature:
+            return None
+
+        offset = _HEADER.size
+        try:
+            fingerprints, offset = unpack_fingerprints(data, offset)
+            landmarks = []
+            for _ in range(n_landmarks):
+                landmarks.append(_LANDMARK.unpack_from(data, offset))
+                offset += _LANDMARK.size
+            records = {}
+            for _ in range(count):
+                cx, cy, z, landmark, size = _RECORD.unpack_from(data, offset)
+                offset += _RECORD.size
+                records.setdefault((cx, cy, z), {})[landmark] = data[offset:offset + size]
+                offset += size
+        except struct.error:
+            return None
+        return cls(landmarks, records, fingerprints=fingerprints)
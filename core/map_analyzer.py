@@ -1,13 +1,131 @@
 # core/map_analyzer.py
-from database.tiles_config import BLOCKING_IDS, AVOID_IDS, MOVE_IDS, STACK_IDS, DAMAGE_IDS, POISON_IDS, get_special_type
+from array import array
+
+from database.tiles_config import (
+    BLOCKING_IDS, MOVE_IDS, STACK_IDS,
+    TILE_PROPS, SPECIAL_TYPES, PROP_BLOCKING, PROP_AVOID, PROP_DAMAGE, PROP_POISON,
+    PROP_SPECIAL_MASK, PROP_SPECIAL_SHIFT, PROP_HEIGHT_MASK, PROP_HEIGHT_SHIFT, PROP_SPEED_SHIFT,
+)
 from config import DEBUG_PATHFINDING, DEBUG_OBSTACLE_CLEARING, DEBUG_STACK_CLEARING, PLAYER_AVOIDANCE_MULTIPLIER
 
+# Flags que alteram a classificação do tile (itens sem nenhuma delas são chão comum)
+_CLASSIFY_MASK = PROP_BLOCKING | PROP_AVOID | PROP_DAMAGE | PROP_POISON | PROP_SPECIAL_MASK
+_HEIGHT_2 = 2 << PROP_HEIGHT_SHIFT
+
+# Resultados de get_tile_properties sem debug_reason são compartilhados entre chamadas:
+# SOMENTE LEITURA para os consumidores.
+_BLOCK_PROPS = {'walkable': False, 'type': 'BLOCK', 'cost': 999}
+_shared_props = {}  # (walkable, type, cost, special_id) -> dict
+
+
+def _props(walkable, tile_type, cost, special_id):
+    key = (walkable, tile_type, cost, special_id)
+    result = _shared_props.get(key)
+    if result is None:
+        result = {'walkable': walkable, 'type': tile_type, 'cost': cost, 'special_id': special_id}
+        _shared_props[key] = result
+    return result
+
+
+GRID_RADIUS = 7  # Mesmo range confiável de MemoryMap.get_tile_visible
+GRID_SIZE = 2 * GRID_RADIUS + 1
+
+
+class LocalCostGrid:
+    """
+    Classificação imutável dos tiles visíveis (15x15 ao redor do player) de um
+    snapshot do MemoryMap. Índice: (rel_y + GRID_RADIUS) * GRID_SIZE + (rel_x + GRID_RADIUS).
+
+    props:    dict compartilhado de get_tile_properties por tile (somente leitura)
+    walkable: 1 se andável
+    cost:     custo extra do tile (props['cost'])
+    speed:    ground speed do tile (get_ground_speed)
+    """
+    __slots__ = ('key', 'props', 'walkable', 'cost', 'speed')
+
+    def __init__(self, key, props, speed):
+        self.key = key
+        self.props = tuple(props)
+        self.walkable = bytes(1 if p['walkable'] else 0 for p in self.props)
+        self.cost = array('I', (p['cost'] for p in self.props))
+        self.speed = array('H', speed)
+
+    @staticmethod
+    def index(rel_x, rel_y):
+        """Índice do tile no grid, ou -1 fora do range."""
+        if -GRID_RADIUS <= rel_x <= GRID_RADIUS and -GRID_RADIUS <= rel_y <= GRID_RADIUS:
+            return (rel_y + GRID_RADIUS) * GRID_SIZE + rel_x + GRID_RADIUS
+        return -1
+
+    def get(self, rel_x, rel_y):
+        i = self.index(rel_x, rel_y)
+        return self.props[i] if i >= 0 else _BLOCK_PROPS
+
+    def ground_speed(self, rel_x, rel_y):
+        i = self.index(rel_x, rel_y)
+        return self.speed[i] if i >= 0 else 150
+
+    def with_avoidance(self, key, avoidance, my_abs_pos):
+        """Cópia com a penalidade de player avoidance aplicada aos tiles andáveis."""
+        props = list(self.props)
+        my_x, my_y = my_abs_pos
+        for (abs_x, abs_y), multiplier in avoidance.items():
+            i = self.index(abs_x - my_x, abs_y - my_y)
+            if i < 0:
+                continue
+            p = props[i]
+            # Tiles bloqueados e escadas (AVOID_SPECIAL) retornam antes da penalidade
+            if p['walkable']:
+                props[i] = _props(True, p['type'], int(p['cost'] * multiplier), p['special_id'])
+        return LocalCostGrid(key, props, self.speed)
+
+
 class MapAnalyzer:
     def __init__(self, memory_map):
         self.mm = memory_map
         # Sistema de player avoidance - penaliza tiles próximos de players
         self._player_avoidance = {}  # {(abs_x, abs_y): multiplier}
         self._my_abs_pos = None      # Posição absoluta do player para conversão rel -> abs
+        self._avoidance_version = 0
+        self._avoidance_grid = None  # Grid com avoidance aplicado (por analyzer)
+
+    # =========================================================================
+    # GRID DE CUSTOS - Classificação única por snapshot do MemoryMap
+    # =========================================================================
+
+    def get_cost_grid(self):
+        """
+        LocalCostGrid do snapshot atual do MemoryMap (com player avoidance aplicado).
+
+        O grid base fica no próprio MemoryMap (memory_map.cost_grid), então todos os
+        analyzers do mesmo mapa compartilham a classificação: cada geração de
+        read_full_map é classificada uma única vez.
+        """
+        mm = self.mm
+        key = (mm.generation, mm.is_calibrated, mm.center_index)
+        grid = mm.cost_grid
+        if grid is None or grid.key != key:
+            grid = self._build_cost_grid(key)
+            mm.cost_grid = grid
+
+        if not (self._player_avoidance and self._my_abs_pos):
+            return grid
+
+        avoid_key = (key, self._avoidance_version)
+        avoid_grid = self._avoidance_grid
+        if avoid_grid is None or avoid_grid.key != avoid_key:
+            avoid_grid = grid.with_avoidance(avoid_key, self._player_avoidance, self._my_abs_pos)
+            self._avoidance_grid = avoid_grid
+        return avoid_grid
+
+    def _build_cost_grid(self, key):
+        props = []
+        speed = []
+        for rel_y in range(-GRID_RADIUS, GRID_RADIUS + 1):
+            for rel_x in range(-GRID_RADIUS, GRID_RADIUS + 1):
+                props.append(self._classify_tile(rel_x, rel_y, avoidance=False))
+                speed.append(self._read_ground_speed(rel_x, rel_y))
+        return LocalCostGrid(key, props, speed)
 
     def get_tile_properties(self, rel_x, rel_y, debug_reason=False):
         """
@@ -16,132 +134,144 @@ class MapAnalyzer:
         Args:
             rel_x, rel_y: Posição relativa ao player
             debug_reason: Se True, retorna também o motivo de bloqueio
+
+        Sem debug_reason o resultado vem do grid do snapshot (dict compartilhado, não modificar).
         """
+        if debug_reason:
+            return self._classify_tile(rel_x, rel_y, debug_reason=True)
+        return self.get_cost_grid().get(rel_x, rel_y)
+
+    def _classify_tile(self, rel_x, rel_y, debug_reason=False, avoidance=True):
         tile = self.mm.get_tile_visible(rel_x, rel_y)
 
         # 1. VALIDAÇÃO DE EXISTÊNCIA (O "VAZIO")
         if not tile or not tile.items:
-            result = {'walkable': False, 'type': 'BLOCK', 'cost': 999}
             if debug_reason:
+                result = self._make_block()
                 result['block_reason'] = 'TILE_VAZIO' if not tile else 'SEM_ITENS'
                 result['items'] = []
-            return result
-
-        properties = {
-            'walkable': True,
-            'type': 'GROUND',
-            'cost': 1,
-            'special_id': None
-        }
+                return result
+            return _BLOCK_PROPS
 
-        if debug_reason:
-            properties['items'] = list(tile.items)  # Cópia da lista de IDs
+        items = tile.items
+        table = TILE_PROPS
+        flags = 0
+        height_sum = 0
+        for item_id in items:
+            p = table[item_id]
+            flags |= p
+            height_sum += p & PROP_HEIGHT_MASK
 
         # 1.5 VERIFICAÇÃO DE HEIGHT (Stack items - parcels, boxes)
         # Um tile com height >= 2 é bloqueado, EXCETO se o player também tem height
         # Fórmula: walkable = (tile_height - player_height) <= 1
-        tile_height = 0
-        for item_id in tile.items:
-            if item_id in STACK_IDS:
-                tile_height += 1
-
-        if tile_height >= 2:
+        if height_sum >= _HEIGHT_2:
+            tile_height = height_sum >> PROP_HEIGHT_SHIFT
             player_height = self.get_tile_height(0, 0)  # Height do tile do player
             height_diff = tile_height - player_height
             if height_diff > 1:
                 # Bloqueado por altura excessiva
-                result = self._make_block()
                 if debug_reason:
+                    result = self._make_block()
                     result['block_reason'] = 'HEIGHT_DIFF'
                     result['height_diff'] = height_diff
                     result['player_height'] = player_height
                     result['tile_height'] = tile_height
-                    result['items'] = list(tile.items)
-                return result
+                    result['items'] = list(items)
+                    return result
+                return _BLOCK_PROPS
 
-        # Varre a pilha de itens do tile (Do chão até o topo)
-        for item_id in tile.items:
+        tile_type = 'GROUND'
+        cost = 1
+        special_id = None
+        debug_info = {} if debug_reason else None
 
-            # 2. VERIFICAÇÃO DE BLOQUEIO ABSOLUTO (Paredes, Pedras, Players)
-            if item_id in BLOCKING_IDS:
-                if item_id == 99 and rel_x == 0 and rel_y == 0:
+        # Varre a pilha de itens do tile (Do chão até o topo)
+        # Pilhas só de chão comum (caso mais frequente) pulam a varredura
+        if flags & _CLASSIFY_MASK:
+            for item_id in items:
+                p = table[item_id]
+                if not p & _CLASSIFY_MASK:
                     continue
-                result = self._make_block()
-                if debug_reason:
-                    result['block_reason'] = 'BLOCKING_ID'
-                    result['blocking_item_id'] = item_id
-                    result['items'] = list(tile.items)
-                return result
 
-            # 3. VERIFICAÇÃO DE "AVOID" (Fields, Lava, Buracos)
-            if item_id in AVOID_IDS:
-                special_type = get_special_type(item_id)
-
-                if special_type:
-                    # CASO CRÍTICO: É um buraco/escada (Avoid + Special)
-                    # Ação: Marcamos como NÃO ANDÁVEL para o A* não traçar rota por cima,
-                    # mas definimos o 'type' correto para que o scan_for_floor_change encontre.
-                    
-                    properties['walkable'] = False  # <--- O SEGREDO: A* vê como parede
-                    properties['type'] = special_type # <--- O SEGREDO: Scanner vê como escada
-                    properties['special_id'] = item_id
-                    properties['cost'] = 1000 # Custo proibitivo
-                    
+                # 2. VERIFICAÇÃO DE BLOQUEIO ABSOLUTO (Paredes, Pedras, Players)
+                if p & PROP_BLOCKING:
+                    if item_id == 99 and rel_x == 0 and rel_y == 0:
+                        continue
                     if debug_reason:
-                        properties['block_reason'] = 'AVOID_SPECIAL' # Para debug saber que é escada
-                        properties['blocking_item_id'] = item_id
-                        properties['items'] = list(tile.items)
-                    
-                    # Retornamos imediatamente. 
-                    # Assim ele não é tratado como 'GROUND' nas próximas linhas.
-                    return properties
-                else:
-                    result = self._make_block()
+                        result = self._make_block()
+                        result['block_reason'] = 'BLOCKING_ID'
+                        result['blocking_item_id'] = item_id
+                        result['items'] = list(items)
+                        return result
+                    return _BLOCK_PROPS
+
+                # 3. VERIFICAÇÃO DE "AVOID" (Fields, Lava, Buracos)
+                if p & PROP_AVOID:
+                    special_type = SPECIAL_TYPES[(p & PROP_SPECIAL_MASK) >> PROP_SPECIAL_SHIFT]
+
+                    if special_type:
+                        # CASO CRÍTICO: É um buraco/escada (Avoid + Special)
+                        # Ação: Marcamos como NÃO ANDÁVEL para o A* não traçar rota por cima,
+                        # mas definimos o 'type' correto para que o scan_for_floor_change encontre.
+                        # Custo proibitivo; retornamos imediatamente (não é tratado como 'GROUND').
+                        if debug_reason:
+                            result = {'walkable': False, 'type': special_type,
+                                      'cost': 1000, 'special_id': item_id}
+                            result.update(debug_info)
+                            result['block_reason'] = 'AVOID_SPECIAL'  # Para debug saber que é escada
+                            result['blocking_item_id'] = item_id
+                            result['items'] = list(items)
+                            return result
+                        return _props(False, special_type, 1000, item_id)
+
                     if debug_reason:
+                        result = self._make_block()
                         result['block_reason'] = 'AVOID_ID'
                         result['blocking_item_id'] = item_id
-                        result['items'] = list(tile.items)
-                    return result
-
-            # 3.5 VERIFICAÇÃO DE DANO (Fire, Energy, Lava)
-            # Estes tiles são WALKABLE mas com custo MUITO ALTO para evitar
-            # Só passa por cima se for o ÚNICO caminho possível
-            if item_id in DAMAGE_IDS:
-                properties['walkable'] = True
-                properties['type'] = 'DAMAGE'
-                properties['cost'] = 500  # Custo muito alto - quase último recurso
-                if debug_reason:
-                    properties['damage_item_id'] = item_id
-                continue
+                        result['items'] = list(items)
+                        return result
+                    return _BLOCK_PROPS
+
+                # 3.5 VERIFICAÇÃO DE DANO (Fire, Energy, Lava)
+                # Estes tiles são WALKABLE mas com custo MUITO ALTO para evitar
+                # Só passa por cima se for o ÚNICO caminho possível
+                if p & PROP_DAMAGE:
+                    tile_type = 'DAMAGE'
+                    cost = 500  # Custo muito alto - quase último recurso
+                    if debug_reason:
+                        debug_info['damage_item_id'] = item_id
+                    continue
 
-            # 3.6 VERIFICAÇÃO DE POISON (menos perigoso que fire)
-            # Custo menor - bot pode passar se economizar bastante caminho
-            if item_id in POISON_IDS:
-                properties['walkable'] = True
-                properties['type'] = 'POISON'
-                properties['cost'] = 200  # Custo médio - menos perigoso que fire
-                if debug_reason:
-                    properties['poison_item_id'] = item_id
-                continue
+                # 3.6 VERIFICAÇÃO DE POISON (menos perigoso que fire)
+                # Custo menor - bot pode passar se economizar bastante caminho
+                if p & PROP_POISON:
+                    tile_type = 'POISON'
+                    cost = 200  # Custo médio - menos perigoso que fire
+                    if debug_reason:
+                        debug_info['poison_item_id'] = item_id
+                    continue
 
-            # 4. ITENS ESPECIAIS (Escadas, Buracos de Acesso, Corda)
-            special = get_special_type(item_id)
-            if special:
-                properties['type'] = special
-                properties['special_id'] = item_id
-                properties['cost'] = 20
-                continue
+                # 4. ITENS ESPECIAIS (Escadas, Buracos de Acesso, Corda)
+                tile_type = SPECIAL_TYPES[(p & PROP_SPECIAL_MASK) >> PROP_SPECIAL_SHIFT]
+                special_id = item_id
+                cost = 20
 
         # 5. PENALIDADE DE PLAYER AVOIDANCE
         # Aplica custo extra em tiles próximos de players (para desviar)
-        if self._player_avoidance and self._my_abs_pos:
+        if avoidance and self._player_avoidance and self._my_abs_pos:
             abs_x = self._my_abs_pos[0] + rel_x
             abs_y = self._my_abs_pos[1] + rel_y
             if (abs_x, abs_y) in self._player_avoidance:
                 multiplier = self._player_avoidance[(abs_x, abs_y)]
-                properties['cost'] = int(properties['cost'] * multiplier)
+                cost = int(cost * multiplier)
 
-        return properties
+        if debug_reason:
+            properties = {'walkable': True, 'type': tile_type, 'cost': cost, 'special_id': special_id,
+                          'items': list(items)}
+            properties.update(debug_info)
+            return properties
+        return _props(True, tile_type, cost, special_id)
     
     def _make_block(self):
         return {'walkable': False, 'type': 'BLOCK', 'cost': 999}
@@ -156,6 +286,7 @@ class MapAnalyzer:
         Deve ser chamado antes de usar player avoidance.
         """
         self._my_abs_pos = (my_x, my_y)
+        self._avoidance_version += 1
 
     def set_player_avoidance(self, player_abs_x, player_abs_y, multiplier=None):
         """
@@ -174,10 +305,12 @@ class MapAnalyzer:
         for dx in [-1, 0, 1]:
             for dy in [-1, 0, 1]:
                 self._player_avoidance[(player_abs_x + dx, player_abs_y + dy)] = multiplier
+        self._avoidance_version += 1
 
     def clear_player_avoidance(self):
         """Limpa penalidades de player."""
         self._player_avoidance = {}
+        self._avoidance_version += 1
 
     def get_tile_height(self, rel_x, rel_y):
         """
@@ -191,11 +324,11 @@ class MapAnalyzer:
         if not tile or not tile.items:
             return 0
 
-        height = 0
+        table = TILE_PROPS
+        height_sum = 0
         for item_id in tile.items:
-            if item_id in STACK_IDS:
-                height += 1
-        return height
+            height_sum += table[item_id] & PROP_HEIGHT_MASK
+        return height_sum >> PROP_HEIGHT_SHIFT
 
     def get_item_stackpos(self, rel_x, rel_y, item_id):
         """
@@ -259,17 +392,16 @@ class MapAnalyzer:
         Returns:
             int: Ground speed do tile (1-200). Fallback para 150 (grass) se não encontrado.
         """
-        from database.tiles_config import get_ground_speed as get_speed_from_id
+        return self.get_cost_grid().ground_speed(rel_x, rel_y)
 
+    def _read_ground_speed(self, rel_x, rel_y):
         tile = self.mm.get_tile_visible(rel_x, rel_y)
 
         if not tile or not tile.items:
             return 150  # Fallback padrão (grass)
 
         # O ground é sempre o primeiro item da pilha
-        ground_id = tile.items[0]
-
-        return get_speed_from_id(ground_id)
+        return TILE_PROPS[tile.items[0]] >> PROP_SPEED_SHIFT
 
     def get_obstacle_type(self, rel_x, rel_y):
         """
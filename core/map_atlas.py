@@ -0,0 +1,173 @@
+# core/map_atlas.py
+"""
+Atlas do mundo: todos os chunks .map, as máscaras de walkability, as transições
+de andar e os overrides (archways) empacotados em um único arquivo binário.
+
+Gerado por utils/generate_atlas.py e aberto via mmap pelo GlobalMap como backend
+alternativo ao diretório de mapas (sem open()/stat por chunk no cold start).
+
+O cliente continua regravando os .map depois da geração: o atlas guarda o
+fingerprint de cada arquivo usado, e o GlobalMap manda os chunks que mudaram
+para o ChunkStore (use_live_chunks) até o atlas ser gerado de novo.
+
+Layout (little-endian):
+    header        magic, versão, nº chunks, nº transições, nº overrides
+    fingerprints  .map usados na geração (core/chunk_store.py)
+    walk table    256 bytes (cor -> walkable) usados para gerar as máscaras
+    chunk table   (cx, cy, z, offset cores, offset máscara) por chunk
+    transições    (x, y, z_from, z_to)
+    overrides     (x, y, z)
+    dados         blocos de 64 KB (cores e máscaras), alinhados em 4 KB
+"""
+import mmap
+import os
+import struct
+
+from core.chunk_store import CHUNK_SIZE, pack_fingerprints, unpack_fingerprints
+
+ATLAS_MAGIC = b"MBATLAS\x00"
+ATLAS_VERSION = 2
+
+_HEADER = struct.Struct("<8sIIII")
+_CHUNK_ENTRY = struct.Struct("<HHB3xQQ")
+_TRANSITION = struct.Struct("<HHBB")
+_OVERRIDE = struct.Struct("<HHB")
+_ALIGN = 4096
+
+
+class MapAtlas:
+    """Leitor do atlas (mmap somente leitura). Mesma interface get() do ChunkStore."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+
+        magic, version, n_chunks, n_trans, n_over = _HEADER.unpack_from(self._mm, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"Atlas inválido ou de versão incompatível: {path}")
+
+        self.fingerprints, offset = unpack_fingerprints(self._mm, _HEADER.size)
+        self._live = None           # ChunkStore para os chunks em _stale
+        self._stale = frozenset()   # Chunks alterados desde a geração
+        self.walk_table = bytes(self._view[offset:offset + 256])
+        offset += 256
+
+        self._colors = {}  # (cx, cy, z) -> offset
+        self._masks = {}   # (cx, cy, z) -> offset
+        for cx, cy, z, color_off, mask_off in _CHUNK_ENTRY.iter_unpack(
+                self._view[offset:offset + n_chunks * _CHUNK_ENTRY.size]):
+            if color_off:
+                self._colors[(cx, cy, z)] = color_off
+            if mask_off:
+                self._masks[(cx, cy, z)] = mask_off
+        offset += n_chunks * _CHUNK_ENTRY.size
+
+        self.transitions = list(_TRANSITION.iter_unpack(
+            self._view[offset:offset + n_trans * _TRANSITION.size]))
+        offset += n_trans * _TRANSITION.size
+
+        self.overrides = set(_OVERRIDE.iter_unpack(
+            self._view[offset:offset + n_over * _OVERRIDE.size]))
+
+    def use_live_chunks(self, store, changed):
+        """
+        Chunks criados, removidos ou regravados desde a geração
+        (ChunkStore.changed_chunks) passam a ser lidos do ChunkStore, e as
+        máscaras deles deixam de vir do atlas.
+        """
+        self._live = store
+        self._stale = frozenset(changed)
+
+    def __contains__(self, key):
+        if key in self._stale:
+            return key in self._live
+        return key in self._colors
+
+    def __len__(self):
+        return len(self.keys())
+
+    def keys(self):
+        if not self._stale:
+            return list(self._colors)
+        return ([key for key in self._colors if key not in self._stale]
+                + [key for key in self._stale if key in self._live])
+
+    def get(self, chunk_x, chunk_y, z):
+        """Cores do chunk (memoryview somente leitura; bytes se vier do ChunkStore) ou None."""
+        key = (chunk_x, chunk_y, z)
+        if key in self._stale:
+            return self._live.get(chunk_x, chunk_y, z)
+        offset = self._colors.get(key)
+        if offset is None:
+            return None
+        return self._view[offset:offset + CHUNK_SIZE]
+
+    def get_mask(self, chunk_x, chunk_y, z):
+        """Máscara de walkability pré-computada (valores WALK_*) ou None."""
+        key = (chunk_x, chunk_y, z)
+        if key in self._stale:
+            return None
+        offset = self._masks.get(key)
+        if offset is None:
+            return None
+        return self._view[offset:offset + CHUNK_SIZE]
+
+
+def _padding(pos):
+    return (-pos) % _ALIGN
+
+
+def write_atlas(path, chunks, walk_table, transitions, overrides, fingerprints):
+    """
+    Grava o atlas.
+
+    Args:
+        chunks: lista de ((cx, cy, z), cores ou None, máscara ou None)
+        walk_table: 256 bytes (cor -> walkable) usados nas máscaras
+        transitions: lista de (x, y, z_from, z_to)
+        overrides: lista de (x, y, z)
+        fingerprints: ChunkStore.fingerprints() dos .map usados
+    """
+    if len(walk_table) != 256:
+        raise ValueError("walk_table deve ter 256 bytes")
+
+    fingerprint_block = pack_fingerprints(fingerprints)
+    table_size = (_HEADER.size + len(fingerprint_block) + 256 + len(chunks) * _CHUNK_ENTRY.size
+                  + len(transitions) * _TRANSITION.size + len(overrides) * _OVERRIDE.size)
+    data_start = table_size + _padding(table_size)
+
+    # Calcula offsets dos blocos de dados
+    entries = []
+    offset = data_start
+    for (cx, cy, z), colors, mask in chunks:
+        color_off = mask_off = 0
+        if colors is not None:
+            color_off, offset = offset, offset + CHUNK_SIZE
+        if mask is not None:
+            mask_off, offset = offset, offset + CHUNK_SIZE
+        entries.append((cx, cy, z, color_off, mask_off))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(chunks), len(transitions), len(overrides)))
+        f.write(fingerprint_block)
+        f.write(bytes(walk_table))
+        for entry in entries:
+            f.write(_CHUNK_ENTRY.pack(*entry))
+        for t in transitions:
+            f.write(_TRANSITION.pack(*t))
+        for o in overrides:
+            f.write(_OVERRIDE.pack(*o))
+        f.write(bytes(data_start - table_size))
+
+        for _, colors, mask in chunks:
+            for block in (colors, mask):
+                if block is None:
+                    continue
+                block = bytes(block[:CHUNK_SIZE])
+                f.write(block)
+                if len(block) < CHUNK_SIZE:
+                    f.write(bytes(CHUNK_SIZE - len(block)))
+    os.replace(tmp_path, path)
@@ -1,7 +1,23 @@
 import struct
+import sys
 import time
 from config import *
 
+_ROW_TILES = 18  # Tiles por linha do bloco de mapa (comparação em duas etapas)
+
+# Layout fixo do bloco: count (u32) + até 10 itens de 12 bytes [id(u32), data1(u32), data2(u32)]
+# por tile. O bloco é decodificado como colunas (memoryview.cast) em vez de struct por item:
+#   words[i * TILE_WORDS]                     -> count do tile i
+#   words[i * TILE_WORDS + 1 + 3 * j (+1/+2)] -> id bruto / data1 / data2 do item j
+#   halves[i * TILE_HALVES + 2 + 6 * j]       -> id real do item j (16 bits baixos)
+TILE_WORDS = TILE_SIZE // 4
+TILE_HALVES = TILE_SIZE // 2
+MAX_TILE_ITEMS = 10
+_ITEM_WORDS = 3
+_ITEM_HALVES = 6
+_NATIVE_LE = sys.byteorder == 'little'  # cast() usa a ordem nativa; o bloco é little-endian
+_ITEM = struct.Struct('<III')
+
 class MemoryTile:
     """Representa um único quadrado (Tile) lido da memória."""
     def __init__(self, item_ids, items_debug=None):
@@ -32,6 +48,14 @@ class MemoryMap:
         self.last_update = 0
         self.is_calibrated = False  # Flag para validar se calibração foi bem-sucedida
 
+        # Parsing incremental: só re-decodifica tiles cujos bytes mudaram
+        self.generation = 0         # Incrementa a cada leitura com algum tile alterado
+        self.changed_indices = []   # Índices re-decodificados na última leitura
+        self._raw = None            # Buffer da leitura anterior
+        self._player_id = None
+        self._player_tiles = set()  # Índices com a criatura do player
+        self.cost_grid = None       # LocalCostGrid da geração atual (MapAnalyzer.get_cost_grid)
+
     def read_full_map(self, player_id):
         # Reseta flag de calibração antes de cada leitura
         self.is_calibrated = False
@@ -39,61 +63,175 @@ class MemoryMap:
         try:
             map_start_addr = self.pm.read_int(self.base_addr + MAP_POINTER_ADDR)
             raw_data = self.pm.read_bytes(map_start_addr, MAP_DATA_SIZE)
-            self._parse_map_data(raw_data, player_id)
-            self.last_update = time.time()
+        except Exception as e:
+            print(f"[MemoryMap] Erro ao ler mapa: {e}")
+            return False
+        return self.load_map_data(raw_data, player_id)
 
-            # Só marca como calibrado se encontrou o player no mapa
-            if self.center_index != -1:
-                self.is_calibrated = True
-                return True
-            else:
-                print(f"[MemoryMap] ⚠️ Calibração falhou: Player ID {player_id} não encontrado no mapa")
-                return False
+    @property
+    def raw_data(self):
+        """Bloco bruto da última leitura (None antes da primeira)."""
+        return self._raw
 
+    def load_map_data(self, raw_data, player_id):
+        """
+        Decodifica um bloco de mapa já lido (ex: GameSnapshot.map_raw) sem
+        acessar o processo. Mesmo retorno de read_full_map.
+        """
+        self.is_calibrated = False
+        try:
+            self._parse_map_data(raw_data, player_id)
+            self.last_update = time.time()
         except Exception as e:
             print(f"[MemoryMap] Erro ao ler mapa: {e}")
             return False
 
+        # Só marca como calibrado se encontrou o player no mapa
+        if self.center_index != -1:
+            self.is_calibrated = True
+            return True
+        print(f"[MemoryMap] ⚠️ Calibração falhou: Player ID {player_id} não encontrado no mapa")
+        return False
+
     def _parse_map_data(self, raw_data, player_id):
+        prev = self._raw
+        full = prev is None or player_id != self._player_id or len(prev) != len(raw_data)
+        if full:
+            changed = list(range(TOTAL_TILES))
+        elif prev == raw_data:
+            changed = []
+        else:
+            changed = self._diff_tiles(prev, raw_data)
+
+        self._raw = raw_data
+        self._player_id = player_id
+        if changed:
+            self._decode_tiles(raw_data, changed, player_id, full)
+
+        self.changed_indices = changed
+        if changed:
+            self.generation += 1
+
+        # Mesmo critério do parse completo: último tile (maior índice) com o player
         self.center_index = -1
-
+        if self._player_tiles:
+            self.center_index = max(self._player_tiles)
+            self._calibrate_center(self.center_index)
+
+    @staticmethod
+    def _diff_tiles(prev, raw_data):
+        """Índices dos tiles com bytes diferentes (compara por linha, depois por tile)."""
+        changed = []
+        row_size = _ROW_TILES * TILE_SIZE
+        for row_start in range(0, TOTAL_TILES, _ROW_TILES):
+            offset = row_start * TILE_SIZE
+            if prev[offset:offset + row_size] == raw_data[offset:offset + row_size]:
+                continue
+            for i in range(row_start, min(row_start + _ROW_TILES, TOTAL_TILES)):
+                offset = i * TILE_SIZE
+                if prev[offset:offset + TILE_SIZE] != raw_data[offset:offset + TILE_SIZE]:
+                    changed.append(i)
+        return changed
+
+    @staticmethod
+    def find_player_tiles(raw_data, player_id):
+        """
+        Índices dos tiles com a criatura do player (real_id == 99 e data1 == player_id).
+        Uma única busca no buffer em vez do loop tile x item.
+        """
+        found = set()
+        if not 0 <= player_id <= 0xFFFFFFFF:
+            return found
+        needle = struct.pack('<I', player_id)
+        pos = raw_data.find(needle)
+        while pos != -1:
+            # data1 fica 4 bytes depois do id do item: valida alinhamento, slot e id 99
+            index, offset = divmod(pos, TILE_SIZE)
+            slot, rem = divmod(offset - 8, 12)
+            if offset >= 8 and not rem and index < TOTAL_TILES and index not in found:
+                tile_offset = index * TILE_SIZE
+                count = struct.unpack_from('<I', raw_data, tile_offset)[0]
+                if slot < min(count, MAX_TILE_ITEMS) and \
+                        struct.unpack_from('<H', raw_data, pos - 4)[0] == 99:
+                    found.add(index)
+            pos = raw_data.find(needle, pos + 1)
+        return found
+
+    def _decode_tiles(self, raw_data, indices, player_id, full):
         # === MEMORY OPTIMIZATION: Só armazena debug info se DEBUG_MEMORY_MAP=True ===
         # Economia de ~800 KB quando desativado
         store_debug = DEBUG_MEMORY_MAP
 
-        for i in range(TOTAL_TILES):
-            offset = i * TILE_SIZE
-            count = struct.unpack_from('<I', raw_data, offset)[0]
-
-            if count > 10: count = 10
-
-            items = []
-            items_debug = [] if store_debug else None  # DEBUG: armazena info completa
-            player_found_in_tile = False
-
-            for j in range(count):
-                item_offset = offset + 4 + (j * 12)
-
-                # Lê 12 bytes: ID(4), Data1(4), Data2(4)
-                # O ID real são apenas os primeiros 2 bytes (u16)
-                raw_id_block, data1, data2 = struct.unpack_from('<III', raw_data, item_offset)
-
-                # CORREÇÃO: Limpa o ID aplicando máscara de 16 bits
-                real_id = raw_id_block & 0xFFFF
-
-                items.append(real_id)
-                if store_debug:
-                    items_debug.append((real_id, data1, data2, raw_id_block))
-
+        if not _NATIVE_LE:
+            for i in indices:
+                self._decode_tile_struct(raw_data, i, player_id, store_debug)
+            return
+
+        view = memoryview(raw_data)
+        words = view[:TOTAL_TILES * TILE_SIZE].cast('I')
+        halves = view[:TOTAL_TILES * TILE_SIZE].cast('H')
+        tiles = self.tiles
+        player_tiles = self._player_tiles
+
+        if full:
+            counts = words[::TILE_WORDS].tolist()
+            player_tiles.clear()
+            player_tiles.update(self.find_player_tiles(raw_data, player_id))
+        else:
+            counts = None
+
+        for i in indices:
+            count = counts[i] if full else words[i * TILE_WORDS]
+            if count > MAX_TILE_ITEMS: count = MAX_TILE_ITEMS
+
+            h = i * TILE_HALVES + 2
+            items = halves[h:h + count * _ITEM_HALVES:_ITEM_HALVES].tolist()
+            items_debug = None
+            if store_debug:
+                w = i * TILE_WORDS + 1
+                raw_ids = words[w:w + count * _ITEM_WORDS:_ITEM_WORDS].tolist()
+                data1 = words[w + 1:w + 1 + count * _ITEM_WORDS:_ITEM_WORDS].tolist()
+                data2 = words[w + 2:w + 2 + count * _ITEM_WORDS:_ITEM_WORDS].tolist()
+                items_debug = list(zip(items, data1, data2, raw_ids))
+
+            # Tile novo (não muta o antigo: consumidores podem estar segurando o snapshot anterior)
+            tiles[i] = MemoryTile(items, items_debug)
+
+            if not full:
                 # ID 99 (0x63) é o padrão para criaturas
-                if real_id == 99 and data1 == player_id:
-                    player_found_in_tile = True
-
-            self.tiles[i] = MemoryTile(items, items_debug)
-
-            if player_found_in_tile:
-                self.center_index = i
-                self._calibrate_center(i)
+                found = False
+                if 99 in items:
+                    w = i * TILE_WORDS + 2
+                    data1 = words[w:w + count * _ITEM_WORDS:_ITEM_WORDS].tolist()
+                    found = any(real_id == 99 and d1 == player_id for real_id, d1 in zip(items, data1))
+                if found:
+                    player_tiles.add(i)
+                else:
+                    player_tiles.discard(i)
+
+    def _decode_tile_struct(self, raw_data, i, player_id, store_debug):
+        """Decodificação item a item (hosts big-endian, onde cast() não serve)."""
+        offset = i * TILE_SIZE
+        count = struct.unpack_from('<I', raw_data, offset)[0]
+        if count > MAX_TILE_ITEMS: count = MAX_TILE_ITEMS
+
+        items = []
+        items_debug = [] if store_debug else None
+        player_found_in_tile = False
+        for j in range(count):
+            raw_id_block, data1, data2 = _ITEM.unpack_from(raw_data, offset + 4 + j * 12)
+            real_id = raw_id_block & 0xFFFF
+            items.append(real_id)
+            if store_debug:
+                items_debug.append((real_id, data1, data2, raw_id_block))
+            if real_id == 99 and data1 == player_id:
+                player_found_in_tile = True
+
+        self.tiles[i] = MemoryTile(items, items_debug)
+        if player_found_in_tile:
+            self._player_tiles.add(i)
+        else:
+            self._player_tiles.discard(i)
 
     def _calibrate_center(self, index):
         z = index // (18 * 14)
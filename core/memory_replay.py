@@ -0,0 +1,261 @@
+# core/memory_replay.py
+"""
+Gravação e replay das leituras de memória do cliente.
+
+MemoryRecorder envolve o Pymem e grava cada leitura (read_bytes/read_int/...)
+com timestamp. Só o que muda é gravado: a mesma leitura (endereço, tamanho)
+com os mesmos bytes da anterior não entra no arquivo. ReplayMemory serve as
+mesmas chamadas a partir da gravação, no tempo real ou acelerado, então
+GameState, BattleListScanner, MemoryMap e scan_containers rodam sem o cliente
+(ex: utils/replay_benchmark.py em Linux).
+
+Arquivo:
+
+    header   magic, versão, base_addr, timestamp de início
+    zlib     registros (t desde o início, endereço, tamanho) + bytes lidos
+
+O stream zlib é sincronizado a cada flush_interval segundos, então uma
+gravação interrompida (cliente fechou, os._exit) continua legível até o
+último flush.
+"""
+import bisect
+import itertools
+import struct
+import threading
+import time
+import zlib
+
+REPLAY_MAGIC = b"MBREPLAY"
+REPLAY_VERSION = 1
+
+_HEADER = struct.Struct("<8sIQd")   # magic, versão, base_addr, início (epoch)
+_RECORD = struct.Struct("<dQI")     # t (s desde o início), endereço, tamanho
+
+_PAGE_SHIFT = 12                    # Índice de cobertura por página de 4 KB
+
+_INT = struct.Struct("<i")
+_UINT = struct.Struct("<I")
+_SHORT = struct.Struct("<h")
+_USHORT = struct.Struct("<H")
+_FLOAT = struct.Struct("<f")
+_DOUBLE = struct.Struct("<d")
+_LONGLONG = struct.Struct("<q")
+_ULONGLONG = struct.Struct("<Q")
+
+
+class ReplayReadError(Exception):
+    """Leitura de um endereço que não está na gravação."""
+
+
+class _TypedReads:
+    """read_int/read_float/read_string/... do Pymem em cima de read_bytes."""
+
+    def read_bytes(self, address, length):
+        raise NotImplementedError
+
+    def read_int(self, address):
+        return _INT.unpack(self.read_bytes(address, 4))[0]
+
+    def read_uint(self, address):
+        return _UINT.unpack(self.read_bytes(address, 4))[0]
+
+    def read_short(self, address):
+        return _SHORT.unpack(self.read_bytes(address, 2))[0]
+
+    def read_ushort(self, address):
+        return _USHORT.unpack(self.read_bytes(address, 2))[0]
+
+    def read_float(self, address):
+        return _FLOAT.unpack(self.read_bytes(address, 4))[0]
+
+    def read_double(self, address):
+        return _DOUBLE.unpack(self.read_bytes(address, 8))[0]
+
+    def read_longlong(self, address):
+        return _LONGLONG.unpack(self.read_bytes(address, 8))[0]
+
+    def read_ulonglong(self, address):
+        return _ULONGLONG.unpack(self.read_bytes(address, 8))[0]
+
+    def read_bool(self, address):
+        return self.read_bytes(address, 1) != b"\x00"
+
+    def read_string(self, address, byte=50, encoding="UTF-8"):
+        buff = self.read_bytes(address, byte)
+        i = buff.find(b"\x00")
+        if i != -1:
+            buff = buff[:i]
+        return buff.decode(encoding)
+
+
+# ── Gravação ──────────────────────────────────────────────────────────
+
+class MemoryRecorder(_TypedReads):
+    """
+    Proxy do Pymem que grava as leituras. Escritas e demais atributos
+    (process_id, process_handle, write_int, ...) vão direto para o Pymem.
+    """
+
+    def __init__(self, pm, path, base_addr=0, flush_interval=5.0):
+        self._pm = pm
+        self._lock = threading.Lock()
+        self._start = time.time()
+        self._last = {}          # (endereço, tamanho) -> bytes da última gravação
+        self._flush_interval = flush_interval
+        self._last_flush = self._start
+        self._compressor = zlib.compressobj(6)
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, base_addr, self._start))
+        self.path = path
+        self.records = 0
+        self.reads = 0
+
+    def __getattr__(self, name):
+        return getattr(self._pm, name)
+
+    def read_bytes(self, address, length):
+        data = self._pm.read_bytes(address, length)
+        with self._lock:
+            now = time.time()  # Dentro do lock: registros em ordem de tempo
+            self.reads += 1
+            if self._file is None:
+                return data
+            key = (address, length)
+            if self._last.get(key) != data:
+                self._last[key] = data
+                self.records += 1
+                chunk = self._compressor.compress(_RECORD.pack(now - self._start, address, length) + data)
+                if chunk:
+                    self._file.write(chunk)
+            if now - self._last_flush >= self._flush_interval:
+                self._last_flush = now
+                self._file.write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+                self._file.flush()
+        return data
+
+    def stop_recording(self):
+        """Finaliza o arquivo. O proxy continua repassando leituras ao Pymem."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(self._compressor.flush())
+            self._file.close()
+            self._file = None
+        print(f"[MemoryRecorder] Gravação salva em {self.path} "
+              f"({self.records} registros de {self.reads} leituras)")
+
+
+# ── Replay ────────────────────────────────────────────────────────────
+
+def load_recording(path):
+    """
+    Lê uma gravação. Registros incompletos no fim (gravação interrompida)
+    são ignorados.
+
+    Returns:
+        (base_addr, início, [(t, endereço, bytes), ...] em ordem de t)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Gravação inválida: {path}")
+    magic, version, base_addr, started = _HEADER.unpack_from(data, 0)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"Gravação inválida ou de outra versão: {path}")
+
+    stream = zlib.decompressobj().decompress(data[_HEADER.size:])
+    records = []
+    offset = 0
+    while offset + _RECORD.size <= len(stream):
+        t, address, length = _RECORD.unpack_from(stream, offset)
+        end = offset + _RECORD.size + length
+        if end > len(stream):
+            break
+        records.append((t, address, stream[offset + _RECORD.size:end]))
+        offset = end
+    return base_addr, started, records
+
+
+class ReplayMemory(_TypedReads):
+    """
+    Substituto do Pymem que responde com os bytes gravados no instante atual
+    do replay: now() = tempo de parede desde o início x speed (ou o instante
+    fixado por seek() quando speed=0).
+
+    Cada leitura devolve o último registro (até o instante atual) da mesma
+    leitura (endereço, tamanho); se ela nunca foi gravada, o registro mais
+    recente que cobre o intervalo. Escritas são descartadas.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.base_addr, self.started, records = load_recording(path)
+        self.base_address = self.base_addr
+        self.process_id = 0
+        self.process_handle = None
+        self.duration = records[-1][0] if records else 0.0
+        self.speed = speed
+        self.reads = 0
+        self.writes = 0
+
+        # (endereço, tamanho) -> ([t, ...], [bytes, ...])
+        self._exact = {}
+        # página -> ([t, ...], [(endereço, bytes), ...]) dos registros que tocam a página
+        self._pages = {}
+        for t, address, data in records:
+            times, values = self._exact.setdefault((address, len(data)), ([], []))
+            times.append(t)
+            values.append(data)
+            for page in range(address >> _PAGE_SHIFT, ((address + max(len(data), 1) - 1) >> _PAGE_SHIFT) + 1):
+                times, values = self._pages.setdefault(page, ([], []))
+                times.append(t)
+                values.append((address, data))
+        self.seek(0.0)
+
+    # ── Relógio ────────────────────────────────────────────────────
+
+    def now(self):
+        """Instante atual do replay (segundos desde o início da gravação)."""
+        return self._offset + (time.time() - self._wall_start) * self.speed
+
+    def seek(self, t):
+        self._offset = t
+        self._wall_start = time.time()
+
+    def finished(self):
+        return self.now() >= self.duration
+
+    # ── Leitura ────────────────────────────────────────────────────
+
+    def read_bytes(self, address, length):
+        self.reads += 1
+        now = self.now()
+        exact = self._exact.get((address, length))
+        if exact is not None:
+            times, values = exact
+            return values[max(0, bisect.bisect_right(times, now) - 1)]
+
+        entry = self._pages.get(address >> _PAGE_SHIFT)
+        if entry is not None:
+            times, values = entry
+            # Mais recente até now que cobre [address, address + length); antes
+            # do primeiro registro vale o mais antigo
+            i = bisect.bisect_right(times, now)
+            for idx in itertools.chain(range(i - 1, -1, -1), range(i, len(times))):
+                start, data = values[idx]
+                if start <= address and address + length <= start + len(data):
+                    return data[address - start:address - start + length]
+        raise ReplayReadError(f"Leitura nao gravada: 0x{address:X} (+{length})")
+
+    # ── Escrita (descartada) ───────────────────────────────────────
+
+    def write_bytes(self, address, value, length):
+        self.writes += 1
+
+    def write_int(self, address, value):
+        self.writes += 1
+
+    def write_uint(self, address, value):
+        self.writes += 1
+
+    def write_float(self, address, value):
+        self.writes += 1
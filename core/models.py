@@ -4,7 +4,7 @@ Classes de modelo para objetos comuns do bot.
 Centraliza tipos de dados usados em múltiplos módulos.
 """
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Any
 from database.creature_outfits import is_humanoid_creature
 
 
@@ -488,3 +488,34 @@ class Player:
     def is_mana_below(self, threshold: float) -> bool:
         """Check if mana is below custom threshold percent."""
         return self.mana_percent < threshold
+
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    """
+    Estado do jogo publicado pelo game_state a cada tick (imutável).
+
+    version sobe a cada tick publicado. t2_version / t3_version são a versão
+    do tick em que os dados de T2 (battlelist, mapa) e T3 (containers,
+    equipamento) foram lidos; ticks intermediários repetem os mesmos objetos.
+    Consumidores não devem modificar player, creatures ou containers.
+    """
+    version: int
+    timestamp: float
+    player: Player
+    target_id: int
+    # T2: battlelist + mapa
+    t2_version: int
+    t2_timestamp: float
+    creatures: Tuple[Creature, ...]
+    players: Tuple[Creature, ...]
+    map_raw: Optional[bytes]           # Bloco do mapa (MemoryMap.load_map_data)
+    map_player_id: int
+    map_position: Optional[Position]   # Posição do player quando o mapa foi lido
+    map_tiles: Dict[Tuple[int, int, int], Any]
+    # T3: inventário
+    t3_version: int
+    t3_timestamp: float
+    containers: Tuple[Any, ...]
+    left_hand_id: int
+    right_hand_id: int
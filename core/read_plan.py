@@ -0,0 +1,126 @@
+# core/read_plan.py
+"""
+Planos de leitura: vários campos da memória do cliente em poucos read_bytes.
+
+Cada pm.read_int é um ReadProcessMemory. O GameState lia HP, mana, cap,
+level, skills e slots um por um, e o scan_containers fazia duas leituras por
+item em 16 containers. Um ReadPlan recebe os campos (offset + tipo struct),
+junta os vizinhos em spans contíguos e lê cada span com um único read_bytes;
+os valores saem de um struct.Struct pré-compilado por span.
+
+    plan = ReadPlan()
+    plan.add("hp", OFFSET_PLAYER_HP)
+    plan.add("cap", OFFSET_PLAYER_CAP, "f")
+    plan.add("ids", OFFSET_X, "i", count=8, stride=12)   # valor = lista
+    values = plan.read(pm, base_addr)                     # {"hp": ..., "cap": ..., "ids": [...]}
+
+Offsets são relativos ao base_addr passado em read(). Campos separados por
+até max_gap bytes entram no mesmo span (ler bytes a mais é mais barato que
+outra syscall).
+"""
+import struct
+
+DEFAULT_MAX_GAP = 64  # Bytes entre campos para ainda juntar no mesmo span
+
+
+class _Span:
+    """Trecho contíguo lido com um read_bytes e decodificado com um Struct."""
+
+    __slots__ = ("offset", "size", "layout", "scalars", "arrays")
+
+    def __init__(self, offset, elements):
+        # elements: [(offset, fmt, name, index), ...] em ordem de offset
+        self.offset = offset
+        codes = ["<"]
+        cursor = offset
+        scalars = []
+        arrays = {}
+        for value_index, (elem_offset, fmt, name, index) in enumerate(elements):
+            if elem_offset > cursor:
+                codes.append(f"{elem_offset - cursor}x")
+            codes.append(fmt)
+            cursor = elem_offset + struct.calcsize("<" + fmt)
+            if index is None:
+                scalars.append((name, value_index))
+            else:
+                arrays.setdefault(name, []).append((index, value_index))
+        self.size = cursor - offset
+        self.layout = struct.Struct("".join(codes))
+        self.scalars = scalars
+        # Índices dos elementos de cada array, na ordem do array
+        self.arrays = {name: [value_index for _, value_index in sorted(items)]
+                       for name, items in arrays.items()}
+
+
+class ReadPlan:
+    """Conjunto de campos lidos juntos (ex: vitals do tick T1 do GameState)."""
+
+    def __init__(self, max_gap=DEFAULT_MAX_GAP):
+        self.max_gap = max_gap
+        self._fields = {}   # nome -> (offset, fmt, count, stride)
+        self._spans = None
+
+    def add(self, name, offset, fmt="i", count=1, stride=None):
+        """
+        Registra um campo. fmt é um código do struct sem byte order
+        ("i", "I", "f", "h", "32s", ...). Com count > 1 o campo é um array de
+        count elementos a cada stride bytes e o valor lido é uma lista.
+        """
+        if name in self._fields:
+            raise ValueError(f"Campo duplicado no ReadPlan: {name!r}")
+        struct.calcsize("<" + fmt)  # Valida o formato já no registro
+        if count > 1 and stride is None:
+            stride = struct.calcsize("<" + fmt)
+        self._fields[name] = (offset, fmt, count, stride)
+        self._spans = None
+        return self
+
+    @property
+    def spans(self):
+        """[(offset, tamanho), ...] dos read_bytes que read() faz."""
+        return [(span.offset, span.size) for span in self._compile()]
+
+    def _compile(self):
+        if self._spans is not None:
+            return self._spans
+
+        elements = []
+        for name, (offset, fmt, count, stride) in self._fields.items():
+            if count > 1:
+                elements.extend((offset + i * stride, fmt, name, i) for i in range(count))
+            else:
+                elements.append((offset, fmt, name, None))
+        elements.sort(key=lambda elem: elem[0])
+
+        spans = []
+        group = []
+        group_end = None
+        for elem in elements:
+            elem_offset, fmt = elem[0], elem[1]
+            if group_end is not None and elem_offset < group_end:
+                raise ValueError(f"Campos sobrepostos no ReadPlan: {group[-1][2]!r} e {elem[2]!r}")
+            if group and elem_offset - group_end > self.max_gap:
+                spans.append(_Span(group[0][0], group))
+                group = []
+            group.append(elem)
+            group_end = elem_offset + struct.calcsize("<" + fmt)
+        if group:
+            spans.append(_Span(group[0][0], group))
+
+        self._spans = spans
+        return spans
+
+    def read(self, pm, base_addr):
+        """
+        Lê todos os campos (um read_bytes por span). Erros de leitura
+        propagam, como nas chamadas pm.read_int que o plano substitui.
+        """
+        result = {}
+        for span in self._compile():
+            values = span.layout.unpack(pm.read_bytes(base_addr + span.offset, span.size))
+            for name, value_index in span.scalars:
+                result[name] = values[value_index]
+            for name, indices in span.arrays.items():
+                # Array com stride grande pode atravessar mais de um span
+                result.setdefault(name, []).extend(values[i] for i in indices)
+        return result
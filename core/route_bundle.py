@@ -0,0 +1,110 @@
+# core/route_bundle.py
+"""
+Bundle de rotas pré-computadas de um script do cavebot.
+
+Arquivo sidecar ao lado do script (cavebot_scripts/<nome>.routes) com a rota
+de cada trecho waypoint -> próximo waypoint (inclusive o trecho que fecha o
+ciclo), gerado por utils/generate_route_bundle.py. O GlobalMap fixa os trechos
+no route_cache (load_route_bundle), então a caminhada normal não roda A* global.
+
+Layout (little-endian):
+    header   magic, versão, assinatura do mapa, assinatura dos waypoints, nº trechos
+    trecho   tipo, início (x, y, z), destino (x, y, z), nº tiles
+             + x/y (uint16) e z (uint8) de cada tile
+"""
+import array
+import os
+import struct
+import zlib
+
+ROUTES_MAGIC = b"MBROUTES"
+ROUTES_VERSION = 1
+ROUTE_BUNDLE_EXT = ".routes"
+
+# Tipo do trecho -> kind usado pelo route_cache (ver Cavebot._navigate_hybrid)
+KIND_SAME_FLOOR = 0
+KIND_MULTILEVEL = 1
+BUNDLE_KINDS = {
+    KIND_SAME_FLOOR: ("fallback", 2),
+    KIND_MULTILEVEL: "multilevel",
+}
+
+_HEADER = struct.Struct("<8sIIII")
+_LEG = struct.Struct("<BHHBHHBI")
+
+
+def bundle_path(script_path):
+    """Caminho do bundle de um script (.json -> .routes)."""
+    return os.path.splitext(str(script_path))[0] + ROUTE_BUNDLE_EXT
+
+
+def waypoint_legs(waypoints):
+    """Pares (início, destino) de cada trecho do script, fechando o ciclo."""
+    coords = [(int(wp['x']), int(wp['y']), int(wp['z'])) for wp in waypoints]
+    if len(coords) < 2:
+        return []
+    return [(coords[i], coords[(i + 1) % len(coords)]) for i in range(len(coords))]
+
+
+def waypoints_signature(waypoints):
+    """Assinatura das coordenadas dos waypoints (ações não influenciam as rotas)."""
+    coords = [(int(wp['x']), int(wp['y']), int(wp['z'])) for wp in waypoints]
+    return zlib.crc32(repr(coords).encode())
+
+
+def write_bundle(path, map_signature, wp_signature, legs):
+    """
+    Grava o bundle.
+
+    Args:
+        legs: lista de (tipo, início, destino, path) com path = [(x, y, z), ...]
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(ROUTES_MAGIC, ROUTES_VERSION, map_signature, wp_signature, len(legs)))
+        for kind, (sx, sy, sz), (ex, ey, ez), tiles in legs:
+            f.write(_LEG.pack(kind, sx, sy, sz, ex, ey, ez, len(tiles)))
+            xy = array.array("H")
+            zs = array.array("B")
+            for x, y, z in tiles:
+                xy.append(x)
+                xy.append(y)
+                zs.append(z)
+            f.write(xy.tobytes())
+            f.write(zs.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_bundle(path):
+    """Retorna (assinatura do mapa, assinatura dos waypoints, trechos) ou None."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, map_sig, wp_sig, count = _HEADER.unpack_from(data, 0)
+    if magic != ROUTES_MAGIC or version != ROUTES_VERSION:
+        return None
+
+    legs = []
+    offset = _HEADER.size
+    try:
+        for _ in range(count):
+            kind, sx, sy, sz, ex, ey, ez, n = _LEG.unpack_from(data, offset)
+            offset += _LEG.size
+            xy = array.array("H")
+            xy.frombytes(data[offset:offset + n * 4])
+            offset += n * 4
+            zs = array.array("B")
+            zs.frombytes(data[offset:offset + n])
+            offset += n
+            if kind not in BUNDLE_KINDS or len(xy) != n * 2 or len(zs) != n:
+                return None
+            tiles = [(xy[i * 2], xy[i * 2 + 1], zs[i]) for i in range(n)]
+            legs.append((kind, (sx, sy, sz), (ex, ey, ez), tiles))
+    except struct.error:
+        return None
+    return map_sig, wp_sig, legs
@@ -0,0 +1,196 @@
+# core/route_cache.py
+"""
+Cache de rotas globais do cavebot.
+
+Scripts em loop percorrem os mesmos trechos repetidamente; em vez de resolver
+o mesmo (região de início, waypoint) centenas de vezes por sessão, guardamos
+as rotas por (tipo, início quantizado, destino) e reaproveitamos sufixos
+quando o player já está em cima de uma rota cacheada.
+
+Invalidação:
+- add_temp_block em um tile de uma rota cacheada remove a rota;
+- quando um bloqueio temporário expira, rotas calculadas enquanto ele estava
+  ativo são removidas (podem existir caminhos melhores agora).
+
+Rotas fixadas (pin) vêm do bundle pré-computado do script (core/route_bundle.py):
+não saem por LRU e também atendem consultas que partem perto do início do trecho,
+emendando o player no primeiro tile com um passo conferido ou uma rota local curta.
+"""
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ("path", "index", "blocked", "pinned")
+
+    def __init__(self, path, blocked, pinned=False):
+        self.path = path
+        self.index = {}  # tile -> primeira posição na rota
+        for i, tile in enumerate(path):
+            self.index.setdefault(tile, i)
+        self.blocked = blocked  # Bloqueios temporários ativos quando a rota foi calculada
+        self.pinned = pinned
+
+
+class RouteCache:
+    """LRU de rotas globais com reaproveitamento de sufixo e estatísticas."""
+
+    def __init__(self, max_entries=64, quantum=4, pin_radius=3):
+        self.max_entries = max_entries
+        self.quantum = quantum
+        self.pin_radius = pin_radius
+        self._entries = OrderedDict()  # (tipo, qx, qy, z, destino) -> _Entry
+        self._pinned = 0
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key(self, kind, start, end):
+        sx, sy, sz = start
+        return (kind, sx // self.quantum, sy // self.quantum, sz, tuple(end))
+
+    def get(self, kind, start, end, can_step=None, local_route=None):
+        """
+        Rota cacheada a partir de start (nova lista) ou None.
+
+        can_step(a, b): True se dá para andar do tile a para o vizinho b. Rota da
+        mesma chave que não passa por start só é usada se start é vizinho do
+        primeiro tile e can_step confirma o passo (a chave agrupa starts de um
+        bloco quantum x quantum, que podem estar do outro lado de uma parede).
+
+        local_route(a, b): rota curta no mesmo andar de a até b (sem a) ou None.
+        Trecho fixado que começa a até pin_radius tiles do player é emendado com
+        ela quando o primeiro tile não está a um passo conferido.
+        """
+        start = tuple(start)
+        end = tuple(end)
+        key = self._key(kind, start, end)
+        entry = self._entries.get(key)
+        if entry is not None:
+            idx = entry.index.get(start)
+            if idx is not None:
+                # Já estamos sobre a rota: devolve só o que falta
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.path[idx + 1:]
+            fx, fy, fz = entry.path[0]
+            if (can_step is not None and fz == start[2]
+                    and max(abs(fx - start[0]), abs(fy - start[1])) == 1
+                    and can_step(start, entry.path[0])):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry.path)
+
+        # Sufixo: player em cima de alguma rota para o mesmo destino
+        for other_key, entry in reversed(self._entries.items()):
+            if other_key[4] != end:
+                continue
+            if other_key[0] != kind and not entry.pinned:
+                continue
+            idx = entry.index.get(start)
+            if idx is None or idx + 1 >= len(entry.path):
+                continue
+            suffix = entry.path[idx + 1:]
+            # Trecho fixado de outro tipo (ex: multifloor depois de trocar de andar)
+            # só serve se o que falta não muda de andar
+            if other_key[0] != kind and any(t[2] != start[2] for t in suffix):
+                continue
+            self._entries.move_to_end(other_key)
+            self.suffix_hits += 1
+            return suffix
+
+        # Trecho fixado saindo de perto do player (chegou no waypoint com folga)
+        sx, sy, sz = start
+        radius = self.pin_radius
+        for other_key, entry in self._entries.items():
+            if not entry.pinned or other_key[0] != kind or other_key[4] != end:
+                continue
+            path = entry.path
+            px, py, pz = path[0]
+            if pz != sz or abs(px - sx) > radius or abs(py - sy) > radius:
+                continue
+            if (can_step is not None and max(abs(px - sx), abs(py - sy)) == 1
+                    and can_step(start, path[0])):
+                self.hits += 1
+                return list(path)
+            if local_route is not None:
+                # Pode haver parede entre o player e o trecho: emenda por uma rota local
+                prefix = local_route(start, path[0])
+                if prefix:
+                    self.hits += 1
+                    return prefix + path[1:]
+
+        self.misses += 1
+        return None
+
+    def put(self, kind, start, end, path, blocked=frozenset(), pinned=False):
+        if not path:
+            return
+        key = self._key(kind, tuple(start), tuple(end))
+        old = self._entries.get(key)
+        if old is not None and old.pinned:
+            if not pinned:
+                return  # Não sobrescreve trecho do bundle
+            self._pinned -= 1
+        self._entries[key] = _Entry(list(path), frozenset(blocked), pinned)
+        self._entries.move_to_end(key)
+        if pinned:
+            self._pinned += 1
+        self._evict()
+
+    def pin(self, kind, start, end, path):
+        """Fixa uma rota pré-computada (não sai por LRU, só por invalidação)."""
+        self.put(kind, start, end, path, pinned=True)
+
+    def unpin_all(self):
+        """Remove todas as rotas fixadas (ex: outro script carregado)."""
+        keys = [k for k, e in self._entries.items() if e.pinned]
+        for k in keys:
+            del self._entries[k]
+        self._pinned = 0
+
+    def _evict(self):
+        excess = len(self._entries) - self._pinned - self.max_entries
+        if excess <= 0:
+            return
+        stale = []
+        for k, e in self._entries.items():
+            if not e.pinned:
+                stale.append(k)
+                if len(stale) == excess:
+                    break
+        for k in stale:
+            del self._entries[k]
+
+    def invalidate_tile(self, tile):
+        """Remove rotas que passam pelo tile (ex: tile bloqueado por player)."""
+        tile = tuple(tile)
+        stale = [k for k, e in self._entries.items() if tile in e.index]
+        self._drop(stale)
+
+    def invalidate_expired_block(self, tile):
+        """Remove rotas calculadas enquanto o tile estava bloqueado."""
+        tile = tuple(tile)
+        stale = [k for k, e in self._entries.items() if tile in e.blocked]
+        self._drop(stale)
+
+    def _drop(self, keys):
+        for k in keys:
+            if self._entries.pop(k).pinned:
+                self._pinned -= 1
+        self.invalidations += len(keys)
+
+    def clear(self):
+        self._drop(list(self._entries))
+
+    def stats(self):
+        lookups = self.hits + self.suffix_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "pinned": self._pinned,
+            "hits": self.hits,
+            "suffix_hits": self.suffix_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.suffix_hits) / lookups if lookups else 0.0,
+        }
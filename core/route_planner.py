@@ -0,0 +1,243 @@
+# core/route_planner.py
+"""
+Planejamento de rotas globais fora da thread do cavebot.
+
+O _navigate_hybrid calculava get_path_multilevel/get_path_with_fallback na
+própria thread do cavebot: numa rota longa o personagem ficava parado e o bot
+não reagia a combate nem a alarmes. O RoutePlanner roda as mesmas buscas num
+pool de workers e devolve futures; enquanto a rota não sai, o cavebot segue
+com a rota antiga ou com o walker local.
+
+- Cada worker usa um GlobalMap.fork() (caches e route_cache próprios, dados
+  do mapa compartilhados); os bloqueios temporários vão junto com o pedido.
+- Cada pedido tem um budget de tempo; ao estourar (ou ao ser cancelado porque
+  o destino/andar mudou) o A* 3D devolve a melhor rota parcial: até o nó mais
+  próximo do destino que ele alcançou.
+- O resultado é copiado para o route_cache do GlobalMap principal na thread
+  que consome a future (collect), então o cache continua single-thread.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+ROUTE_KIND_MULTILEVEL = "multilevel"
+ROUTE_KIND_FALLBACK = ("fallback", 2)
+
+
+class SearchBudget:
+    """Limite de tempo + cancelamento de uma busca (consultado pelo A* a cada N iterações)."""
+
+    def __init__(self, seconds=None, cancel_event=None):
+        self.deadline = time.time() + seconds if seconds else None
+        self.cancel_event = cancel_event
+        self.reason = None     # "deadline" | "cancelled" depois de esgotado
+        self.partial = None    # Melhor rota parcial do último A* 3D interrompido
+
+    def exhausted(self):
+        if self.reason is not None:
+            return True
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.reason = "cancelled"
+        elif self.deadline is not None and time.time() >= self.deadline:
+            self.reason = "deadline"
+        return self.reason is not None
+
+
+class PlannedRoute:
+    """
+    Rotas calculadas para um pedido, na ordem em que o _navigate_hybrid as consulta.
+
+    multilevel:          A* 3D quando origem e destino estão em andares diferentes
+    same_floor:          get_path_with_fallback (max_offset=2)
+    fallback_multilevel: A* 3D quando o same-floor falhou (desvio por outro andar)
+    partial:             melhor rota parcial se o budget acabou antes de achar rota
+    """
+
+    def __init__(self, start, goal, multifloor, blocked=frozenset()):
+        self.start = start
+        self.goal = goal
+        self.multifloor = multifloor
+        self.blocked = blocked
+        self.multilevel = None
+        self.same_floor = None
+        self.fallback_multilevel = None
+        self.partial = None
+        self.interrupted = None   # None | "deadline" | "cancelled"
+        self.from_cache = False   # Tudo veio do route_cache (nada para guardar)
+        self.elapsed = 0.0
+
+    def _same_floor_start(self):
+        return (self.start[0], self.start[1], self.goal[2])
+
+
+def _crossing_prefix(path, z):
+    """Nº de tiles no andar z antes da primeira mudança de andar (None se não muda)."""
+    for i, tile in enumerate(path):
+        if tile[2] != z:
+            return i
+    return None
+
+
+def plan_route(global_map, start, goal, multifloor=True, budget=None, cache_only=False):
+    """
+    Calcula as rotas de um trecho com as mesmas chamadas (e a mesma ordem) do
+    _navigate_hybrid. Só calcula o same-floor quando a rota multifloor não
+    resolve sozinha (sem rota, ou a transição está colada no player).
+
+    cache_only=True só consulta o route_cache (sem A*) e retorna None se
+    alguma rota necessária não estiver lá.
+    """
+    start_time = time.time()
+    route = PlannedRoute(start, goal, multifloor)
+    missing = []
+
+    def _compute(kind, a, b, search):
+        if cache_only:
+            path = global_map.route_cache.get(kind, a, b, can_step=global_map.can_step,
+                                              local_route=global_map.local_route)
+            if path is None:
+                missing.append(kind)
+            return path
+        if budget is not None and budget.exhausted():
+            return None
+        return search()
+
+    def _multilevel():
+        return _compute(ROUTE_KIND_MULTILEVEL, start, goal, lambda: global_map.get_path_multilevel(
+            start, goal, cached=True, budget=budget))
+
+    sz = start[2]
+    need_same_floor = True
+    if multifloor and sz != goal[2]:
+        route.multilevel = _multilevel()
+        if route.multilevel:
+            prefix = _crossing_prefix(route.multilevel, sz)
+            need_same_floor = prefix is not None and prefix <= 2
+
+    if need_same_floor:
+        same_start = route._same_floor_start()
+        route.same_floor = _compute(ROUTE_KIND_FALLBACK, same_start, goal, lambda: global_map.get_path_with_fallback(
+            same_start, goal, max_offset=2, cached=True, budget=budget))
+
+        if not route.same_floor and multifloor:
+            # Mesmo pedido do primeiro A* 3D: reaproveita o resultado
+            if sz != goal[2]:
+                route.fallback_multilevel = route.multilevel
+            else:
+                route.fallback_multilevel = _multilevel()
+
+    if cache_only:
+        if missing:
+            return None
+        route.from_cache = True
+    if budget is not None:
+        route.interrupted = budget.reason
+        if not (route.multilevel or route.same_floor or route.fallback_multilevel):
+            route.partial = budget.partial
+    route.elapsed = time.time() - start_time
+    return route
+
+
+class RoutePlanner:
+    """Pool de workers que calculam PlannedRoute em background (futures)."""
+
+    def __init__(self, global_map, workers=1, budget_seconds=3.0):
+        self.global_map = global_map
+        self.budget_seconds = budget_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="RoutePlanner")
+        # Um GlobalMap.fork() por worker (criados aqui, na thread dona do mapa)
+        self._maps = queue.SimpleQueue()
+        for _ in range(workers):
+            self._maps.put(global_map.fork())
+        self.stats = {"submitted": 0, "cache_hits": 0, "completed": 0,
+                      "partial": 0, "cancelled": 0}
+
+    def submit(self, start, goal, multifloor=True, budget_seconds=None):
+        """
+        Agenda o cálculo da rota start -> goal. Retorna uma Future de PlannedRoute
+        com os atributos start, goal e cancel_event. Rotas que já estão no
+        route_cache voltam como future concluída, sem passar pelo worker.
+        """
+        start, goal = tuple(start), tuple(goal)
+        self.stats["submitted"] += 1
+        cancel_event = threading.Event()
+
+        cached = plan_route(self.global_map, start, goal, multifloor, cache_only=True)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            future = Future()
+            future.set_result(cached)
+        else:
+            blocks = dict(self.global_map.temporary_obstacles)
+            seconds = self.budget_seconds if budget_seconds is None else budget_seconds
+            future = self._executor.submit(self._run, start, goal, multifloor, blocks,
+                                           seconds, cancel_event)
+        future.start = start
+        future.goal = goal
+        future.cancel_event = cancel_event
+        return future
+
+    def cancel(self, future):
+        """Cancela um pedido (fila ou em andamento). O resultado parcial é descartado."""
+        if future is None:
+            return
+        future.cancel_event.set()
+        future.cancel()
+        self.stats["cancelled"] += 1
+
+    def collect(self, future):
+        """
+        Resultado de uma future concluída (None se foi cancelada ou falhou).
+        Chamar na thread dona do GlobalMap: copia as rotas completas para o route_cache.
+        """
+        if future.cancelled() or future.cancel_event.is_set():
+            return None
+        try:
+            route = future.result()
+        except Exception as e:
+            print(f"[RoutePlanner] Erro calculando rota {future.start} -> {future.goal}: {e}")
+            return None
+
+        self.stats["completed"] += 1
+        if route.partial:
+            self.stats["partial"] += 1
+        if route.from_cache:
+            return route
+
+        # Bloqueios criados depois do pedido: rotas que passam por eles não entram no cache
+        new_blocks = self.global_map.temporary_obstacles.keys() - route.blocked
+
+        def _put(kind, start, path):
+            if path and not any(tile in new_blocks for tile in path):
+                self.global_map.route_cache.put(kind, start, route.goal, path, route.blocked)
+
+        _put(ROUTE_KIND_MULTILEVEL, route.start, route.multilevel or route.fallback_multilevel)
+        _put(ROUTE_KIND_FALLBACK, route._same_floor_start(), route.same_floor)
+        return route
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ── Worker ────────────────────────────────────────────────────
+
+    def _run(self, start, goal, multifloor, blocks, seconds, cancel_event):
+        budget = SearchBudget(seconds, cancel_event)
+        gmap = self._maps.get()
+        try:
+            self._sync_temp_blocks(gmap, blocks)
+            route = plan_route(gmap, start, goal, multifloor, budget=budget)
+            route.blocked = frozenset(gmap._active_temp_blocks())
+            return route
+        finally:
+            self._maps.put(gmap)
+
+    @staticmethod
+    def _sync_temp_blocks(gmap, blocks):
+        """Aplica no fork os bloqueios temporários do pedido (invalidando o route_cache dele)."""
+        current = gmap.temporary_obstacles
+        for tile in blocks.keys() - current.keys():
+            gmap.route_cache.invalidate_tile(tile)
+        for tile in current.keys() - blocks.keys():
+            gmap.route_cache.invalidate_expired_block(tile)
+        gmap.temporary_obstacles = blocks
@@ -0,0 +1,101 @@
+# core/spawn_index.py
+"""
+Índice espacial dos spawns (grade de buckets por andar).
+
+O world-spawn.xml tem milhares de spawns; o auto-explore só se interessa pelos
+que estão perto do player. Com a grade, consultas por raio e por vizinho mais
+próximo olham só as células ao redor, em vez de varrer a lista inteira.
+"""
+
+SPAWN_CELL_SIZE = 32  # Lado da célula da grade (sqm)
+
+
+class SpawnIndex:
+    """Buckets (z, cell_x, cell_y) -> spawns, na ordem original da lista."""
+
+    def __init__(self, spawns, cell_size=SPAWN_CELL_SIZE):
+        self.cell_size = cell_size
+        self._buckets = {}   # (z, cell_x, cell_y) -> [(ordem, spawn), ...]
+        self._extent = {}    # z -> [min_cx, max_cx, min_cy, max_cy]
+        self._count = 0
+        for spawn in spawns:
+            self.add(spawn)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, spawn):
+        cx, cy = spawn.cx // self.cell_size, spawn.cy // self.cell_size
+        self._buckets.setdefault((spawn.cz, cx, cy), []).append((self._count, spawn))
+        self._count += 1
+        extent = self._extent.get(spawn.cz)
+        if extent is None:
+            self._extent[spawn.cz] = [cx, cx, cy, cy]
+        else:
+            extent[0] = min(extent[0], cx)
+            extent[1] = max(extent[1], cx)
+            extent[2] = min(extent[2], cy)
+            extent[3] = max(extent[3], cy)
+
+    def _floors(self, z, max_floors):
+        if max_floors is None:
+            return sorted(self._extent, key=lambda fz: abs(fz - z))
+        return [fz for fz in range(z - max_floors, z + max_floors + 1) if fz in self._extent]
+
+    def within(self, x, y, z, radius, max_floors=0):
+        """Spawns a até radius (Manhattan) de (x, y) e até max_floors andares de z, na ordem original."""
+        size = self.cell_size
+        found = []
+        for fz in self._floors(z, max_floors):
+            for cx in range((x - radius) // size, (x + radius) // size + 1):
+                for cy in range((y - radius) // size, (y + radius) // size + 1):
+                    for entry in self._buckets.get((fz, cx, cy), ()):
+                        spawn = entry[1]
+                        if abs(spawn.cx - x) + abs(spawn.cy - y) <= radius:
+                            found.append(entry)
+        found.sort(key=lambda entry: entry[0])
+        return [spawn for _, spawn in found]
+
+    def nearest(self, x, y, z, floor_weight=20, max_floors=None, predicate=None):
+        """
+        Spawn com a menor distância Manhattan + floor_weight * |dz| (empate: o
+        primeiro na ordem original) entre os que passam no predicate, ou None.
+
+        Percorre as células em anéis ao redor de (x, y) e para quando o anel
+        seguinte já não pode ter nada mais perto que o melhor encontrado.
+        """
+        size = self.cell_size
+        best = None   # (distância, ordem, spawn)
+        pcx, pcy = x // size, y // size
+        for fz in self._floors(z, max_floors):
+            floor_cost = floor_weight * abs(fz - z)
+            if best is not None and floor_cost > best[0]:
+                continue
+            min_cx, max_cx, min_cy, max_cy = self._extent[fz]
+            max_ring = max(abs(pcx - min_cx), abs(pcx - max_cx), abs(pcy - min_cy), abs(pcy - max_cy))
+            for ring in range(max_ring + 1):
+                # Tiles de um anel ficam a pelo menos (ring - 1) células de (x, y)
+                if best is not None and floor_cost + max(0, ring - 1) * size > best[0]:
+                    break
+                for cx, cy in _ring_cells(pcx, pcy, ring):
+                    for order, spawn in self._buckets.get((fz, cx, cy), ()):
+                        dist = abs(spawn.cx - x) + abs(spawn.cy - y) + floor_cost
+                        if best is not None and (dist, order) >= best[:2]:
+                            continue
+                        if predicate is not None and not predicate(spawn):
+                            continue
+                        best = (dist, order, spawn)
+        return best[2] if best else None
+
+
+def _ring_cells(cx, cy, ring):
+    """Células na borda do quadrado de raio ring (Chebyshev) ao redor de (cx, cy)."""
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
@@ -17,6 +17,9 @@ class SpawnArea:
         self.last_visited = 0  # timestamp
         self.is_reachable = None  # None=não testado, True/False após validação
 
+        # nearest_walkable_target memoizado: (global_map, temp_blocks_version, válido até, target)
+        self._walkable_target = None
+
     def distance_to(self, px, py):
         """Distância Manhattan do ponto (px, py) à BORDA mais próxima da área."""
         nearest_x = max(self.cx - self.radius, min(px, self.cx + self.radius))
@@ -30,7 +33,28 @@ class SpawnArea:
                 and abs(py - self.cy) <= self.radius)
 
     def nearest_walkable_target(self, global_map):
-        """Retorna (x, y, z) walkable mais próximo do centro, ou None."""
+        """
+        Retorna (x, y, z) walkable mais próximo do centro, ou None.
+
+        Memoizado: o mapa é estático, então o resultado só muda quando um
+        bloqueio temporário é criado/removido (temp_blocks_version) ou quando
+        expira um bloqueio dentro da área consultada.
+        """
+        cached = self._walkable_target
+        if (cached is not None and cached[0] is global_map
+                and cached[1] == global_map.temp_blocks_version and time.time() < cached[2]):
+            return cached[3]
+
+        version = global_map.temp_blocks_version
+        target = self._find_walkable_target(global_map)
+        valid_until = float('inf')
+        for (x, y, z), until in global_map.temporary_obstacles.items():
+            if z == self.cz and abs(x - self.cx) <= self.radius and abs(y - self.cy) <= self.radius:
+                valid_until = min(valid_until, until)
+        self._walkable_target = (global_map, version, valid_until, target)
+        return target
+
+    def _find_walkable_target(self, global_map):
         if global_map.is_walkable(self.cx, self.cy, self.cz):
             return (self.cx, self.cy, self.cz)
 
@@ -1,5 +1,6 @@
 import time
 from config import DEBUG_AUTO_EXPLORE
+from core.spawn_index import SpawnIndex
 
 
 def _make_key(spawn):
@@ -25,6 +26,9 @@ class SpawnSelector:
         self.search_radius = search_radius
         self.max_floors = max_floors
         self.active_spawns = []
+        self._index = SpawnIndex(spawns)           # Todos os spawns do XML
+        self._active_index = SpawnIndex([])        # Só os ativos (initialize)
+        self._active_keys = set()
         self._initialized = False
         self._last_z = None
 
@@ -42,11 +46,7 @@ class SpawnSelector:
         self._last_z = pz
         self._initialized = True
 
-        for s in self.all_spawns:
-            if abs(s.cz - pz) > self.max_floors:
-                continue
-            if abs(s.cx - px) + abs(s.cy - py) > self.search_radius:
-                continue
+        for s in self._index.within(px, py, pz, self.search_radius, self.max_floors):
             if self.target_monsters:
                 if not s.monster_names().intersection(self.target_monsters):
                     continue
@@ -54,6 +54,8 @@ class SpawnSelector:
             if not target:
                 continue
             self.active_spawns.append(s)
+        self._active_index = SpawnIndex(self.active_spawns)
+        self._active_keys = {_make_key(s) for s in self.active_spawns}
 
         # Determinar spawn mais próximo do player como ponto de partida no grafo
         self._current_spawn_key = self._find_nearest_spawn_key(px, py, pz)
@@ -122,9 +124,7 @@ class SpawnSelector:
                     print(f"[SpawnSelector] GRAPH: Sem vizinhos, usando fallback")
                 return self._select_fallback(px, py, pz, now, visible_players, (px, py, pz))
 
-        # Construir set de keys ativos para filtrar
-        active_keys = {_make_key(s) for s in self.active_spawns}
-
+        active_keys = self._active_keys
         candidates = []
         if DEBUG_AUTO_EXPLORE:
             print(f"[SpawnSelector] GRAPH: Avaliando vizinhos:")
@@ -330,26 +330,12 @@ class SpawnSelector:
 
     def _find_nearest_spawn_key(self, px, py, pz):
         """Encontra o spawn mais próximo do player (Manhattan) entre os ativos."""
-        best_key = None
-        best_dist = float('inf')
-        for s in self.active_spawns:
-            dist = abs(s.cx - px) + abs(s.cy - py) + abs(s.cz - pz) * 20
-            if dist < best_dist:
-                best_dist = dist
-                best_key = _make_key(s)
-        return best_key
+        spawn = self._active_index.nearest(px, py, pz, floor_weight=20)
+        return _make_key(spawn) if spawn else None
 
     def _find_nearest_spawn_key_with_edges(self, px, py, pz):
         """Encontra o spawn ativo mais próximo que tem edges no grafo."""
         edges = self.spawn_graph if self.spawn_graph else {}
-        best_key = None
-        best_dist = float('inf')
-        for s in self.active_spawns:
-            key = _make_key(s)
-            if key not in edges or not edges[key]:
-                continue
-            dist = abs(s.cx - px) + abs(s.cy - py) + abs(s.cz - pz) * 20
-            if dist < best_dist:
-                best_dist = dist
-                best_key = key
-        return best_key
+        spawn = self._active_index.nearest(px, py, pz, floor_weight=20,
+                                           predicate=lambda s: bool(edges.get(_make_key(s))))
+        return _make_key(spawn) if spawn else None
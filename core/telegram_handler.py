@@ -17,6 +17,7 @@ from typing import Optional, Callable
 
 from database.tiles_config import BLOCKING_IDS, GROUND_SPEEDS
 from core.battlelist import BattleListScanner
+from core.memory_map import MemoryMap
 
 
 class TelegramHandler:
@@ -564,6 +565,22 @@ class TelegramHandler:
         # Qualquer outra coisa = item no chão
         return "📦"
 
+    def _snapshot_map(self):
+        """
+        MemoryMap local decodificado do último snapshot do game_state. O
+        memory_map do game_state é da thread de polling e não é lido aqui.
+
+        Returns:
+            (memory_map, snapshot); memory_map é None se não houver mapa calibrado
+        """
+        snapshot = self.game_state.get_snapshot() if self.game_state else None
+        if snapshot is None or snapshot.map_raw is None:
+            return None, snapshot
+        memory_map = MemoryMap(self.pm, self.base_addr)
+        if not memory_map.load_map_data(snapshot.map_raw, snapshot.map_player_id):
+            return None, snapshot
+        return memory_map, snapshot
+
     def _render_map_emoji(self) -> str:
         """
         Renderiza mapa do campo de visão usando emojis (15x15 tiles).
@@ -580,26 +597,17 @@ class TelegramHandler:
         Returns:
             String com mapa formatado com emojis
         """
-        if not self.game_state or not self.game_state.memory_map:
+        if not self.game_state:
             return "❌ Mapa não disponível"
 
-        memory_map = self.game_state.memory_map
-
-        # ===== CORREÇÃO: Força calibração do mapa =====
-        # O game_state.memory_map não é calibrado automaticamente
-        # Precisamos chamar read_full_map(player_id) antes de usar
-        player_state = self.game_state.get_player_state()
-        player_id = player_state.char_id
-
-        if not memory_map.read_full_map(player_id):
+        # Mapa, posição e battlelist do mesmo tick do game_state (sem ler o processo)
+        memory_map, snapshot = self._snapshot_map()
+        if memory_map is None:
             return "❌ Falha ao calibrar mapa"
-        # ================================================
-
-        player_pos = self.game_state.get_player_position()
 
-        # Scan fresh do battlelist para dados em tempo real
-        scanner = BattleListScanner(self.pm, self.base_addr)
-        all_entities = scanner.scan_all()
+        player_id = snapshot.map_player_id
+        player_pos = snapshot.map_position
+        all_entities = snapshot.creatures + snapshot.players
 
         # Separa creatures e players (filtra: mesmo Z + vivos + visíveis)
         creatures = [c for c in all_entities if not c.is_player and c.position.z == player_pos.z and c.is_visible and c.hp_percent > 0]
@@ -667,10 +675,10 @@ class TelegramHandler:
         Returns:
             Número de creatures/players detectados no mapa
         """
-        if not self.game_state or not self.game_state.memory_map:
+        memory_map, _ = self._snapshot_map()
+        if memory_map is None:
             return 0
 
-        memory_map = self.game_state.memory_map
         count = 0
         RANGE = 7
 
@@ -695,9 +703,12 @@ class TelegramHandler:
         if not self.game_state or not self.pm:
             return ""
 
-        # Scan fresh do battlelist para dados em tempo real
-        scanner = BattleListScanner(self.pm, self.base_addr)
-        all_entities = scanner.scan_all()
+        # Battlelist do último snapshot do game_state; scan direto se ainda não houver
+        snapshot = self.game_state.get_snapshot()
+        if snapshot is not None:
+            all_entities = snapshot.creatures + snapshot.players
+        else:
+            all_entities = BattleListScanner(self.pm, self.base_addr).scan_all()
 
         # Obtém player_id e posição para filtros
         player_state = self.game_state.get_player_state()
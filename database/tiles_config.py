@@ -516,4 +516,53 @@ def get_ground_speed(tile_id):
     if tile_id is None:
         return 150  # Fallback padrão (grass)
 
-    return GROUND_SPEEDS.get(tile_id, 150)
\ No newline at end of file
+    return GROUND_SPEEDS.get(tile_id, 150)
+
+# ==============================================================================
+# TILE_PROPS - Tabela densa de propriedades por item ID (16 bits)
+# Uma entrada uint32 por ID, montada uma vez a partir dos conjuntos acima.
+# Usada pelo MapAnalyzer para classificar tiles com leituras de array em vez
+# de vários testes de pertinência em sets por item.
+#   bits 0-5   flags (PROP_*)
+#   bits 8-10  tipo especial (índice em SPECIAL_TYPES, 0 = nenhum)
+#   bits 12-15 contribuição de height (STACK_IDS = 1)
+#   bits 16-23 ground speed (fallback 150)
+# ==============================================================================
+import array as _array
+
+PROP_BLOCKING = 1 << 0
+PROP_AVOID = 1 << 1
+PROP_DAMAGE = 1 << 2
+PROP_POISON = 1 << 3
+PROP_STACK = 1 << 4
+PROP_MOVE = 1 << 5
+
+PROP_SPECIAL_SHIFT = 8
+PROP_SPECIAL_MASK = 0x7 << PROP_SPECIAL_SHIFT
+PROP_HEIGHT_SHIFT = 12
+PROP_HEIGHT_MASK = 0xF << PROP_HEIGHT_SHIFT
+PROP_SPEED_SHIFT = 16
+
+# Mesma ordem de FLOOR_CHANGE (get_special_type retorna o primeiro tipo que contém o ID)
+SPECIAL_TYPES = (None,) + tuple(FLOOR_CHANGE)
+
+
+def _build_tile_props():
+    props = _array.array('I', [150 << PROP_SPEED_SHIFT]) * 65536
+    for item_id, speed in GROUND_SPEEDS.items():
+        props[item_id] = speed << PROP_SPEED_SHIFT
+    for ids, flag in ((BLOCKING_IDS, PROP_BLOCKING), (AVOID_IDS, PROP_AVOID),
+                      (DAMAGE_IDS, PROP_DAMAGE), (POISON_IDS, PROP_POISON),
+                      (MOVE_IDS, PROP_MOVE)):
+        for item_id in ids:
+            props[item_id] |= flag
+    for item_id in STACK_IDS:
+        props[item_id] |= PROP_STACK | (1 << PROP_HEIGHT_SHIFT)
+    for code, type_name in enumerate(SPECIAL_TYPES[1:], 1):
+        for item_id in FLOOR_CHANGE[type_name]:
+            if not props[item_id] & PROP_SPECIAL_MASK:
+                props[item_id] |= code << PROP_SPECIAL_SHIFT
+    return props
+
+
+TILE_PROPS = _build_tile_props()
@@ -110,6 +110,7 @@ from core.bot_state import state
 from core.action_scheduler import init_scheduler, get_scheduler, stop_scheduler
 from core.game_state import game_state, init_game_state, shutdown_game_state
 from core.overlay_renderer import renderer as overlay_renderer
+from core.route_bundle import bundle_path
 
 # Sistema de Logging Centralizado
 from core.logger import (
@@ -1375,7 +1376,8 @@ def load_waypoints_file():
             if isinstance(loaded_data, list):
                 current_waypoints_ui = loaded_data
                 if cavebot_instance:
-                    cavebot_instance.load_waypoints(current_waypoints_ui)
+                    cavebot_instance.load_waypoints(current_waypoints_ui,
+                                                    routes_file=bundle_path(filename))
                 _set_waypoint_name_field(name)
                 refresh_cavebot_scripts_combo(selected=name)
                 update_waypoint_display()
@@ -1592,6 +1594,10 @@ def connection_watchdog():
                     else:
                         pm = pymem.Pymem(PROCESS_NAME)
                     base_addr = pymem.process.module_from_name(pm.process_handle, PROCESS_NAME).lpBaseOfDll
+                    if MEMORY_RECORDING_FILE:
+                        from core.memory_replay import MemoryRecorder
+                        pm = MemoryRecorder(pm, MEMORY_RECORDING_FILE, base_addr)
+                        log(f"⏺️ Gravando leituras de memória em {MEMORY_RECORDING_FILE}")
                     state.set_process_alive()  # Marca processo como vivo
                     log(f"✅ Processo do Tibia detectado (PID: {pm.process_id}).")
 
@@ -1737,6 +1743,8 @@ def connection_watchdog():
                         cooldown=DISCONNECT_NOTIFICATION_COOLDOWN
                     )
 
+                if hasattr(pm, "stop_recording"):
+                    pm.stop_recording()
                 pm = None
                 state.set_process_dead()  # Sinaliza para todas threads pararem leituras
                 state.is_connected = False
@@ -1789,7 +1797,12 @@ def start_cavebot_thread():
                 # 3. Atualizar Label de Status na UI (a cada ciclo)
                 if pm and label_cavebot_status and label_cavebot_status.winfo_exists():
                     try:
-                        px, py, pz = get_player_pos(pm, base_addr)
+                        snapshot = game_state.get_snapshot()
+                        if snapshot is not None:
+                            pos = snapshot.player.position
+                            px, py, pz = pos.x, pos.y, pos.z
+                        else:
+                            px, py, pz = get_player_pos(pm, base_addr)
                         #wp_list = cavebot_instance._waypoints if cavebot_instance._waypoints else []
                         #wp_idx = cavebot_instance._current_index if cavebot_instance._waypoints else -1
                         label_text = f"📍Pos: ({px}, {py}, {pz})"
@@ -33,6 +33,7 @@ from core.bot_state import state
 from core.game_state import game_state
 from core.config_utils import make_config_getter
 from core.battlelist import BattleListScanner, SpawnTracker
+from core.creature_table import CreatureDeltaFeed
 from core.models import Position
 
 # Definição de intervalos de alerta (Fallback caso não esteja no config)
@@ -170,6 +171,7 @@ def alarm_loop(pm, base_addr, check_running, config, callbacks, status_callback=
     # Spawn Tracker: detecta criaturas sumonadas por GM
     scanner = BattleListScanner(pm, base_addr)
     spawn_tracker = SpawnTracker(suspicious_range=5, floor_change_cooldown=3.0)
+    spawn_delta_feed = CreatureDeltaFeed()  # Deltas do battlelist publicados pelo game_state
 
     # Tracking de estado para reset do SpawnTracker (evita falsos positivos)
     _was_enabled_last_cycle = False
@@ -181,7 +183,9 @@ def alarm_loop(pm, base_addr, check_running, config, callbacks, status_callback=
     log_msg("🔔 Módulo de Alarme Iniciado.")
 
     while True:
-        if check_running and not check_running(): return
+        if check_running and not check_running():
+            spawn_delta_feed.close()
+            return
 
         # 1. Verifica se o Alarme Global está ativado
         enabled = get_cfg('enabled', False)
@@ -430,10 +434,12 @@ def alarm_loop(pm, base_addr, check_running, config, callbacks, status_callback=
             if visual_enabled:
                 my_x, my_y, my_z = get_player_pos(pm, base_addr)
                 # SCAN via game_state cache (20Hz) com fallback para BattleListScanner
-                all_creatures = game_state.get_creatures() + game_state.get_players()
+                snapshot = game_state.get_snapshot()
+                all_creatures = list(snapshot.creatures + snapshot.players) if snapshot else []
 
                 # Fallback: se game_state ainda não populou, usa scanner direto
                 if not all_creatures:
+                    snapshot = None
                     all_creatures = scanner.scan_all()
 
                 for creature in all_creatures:
@@ -504,7 +510,12 @@ def alarm_loop(pm, base_addr, check_running, config, callbacks, status_callback=
                     last_mana_value = None
                 _was_afk_last_cycle = current_afk
 
-                suspicious_spawns = spawn_tracker.update(all_creatures, my_x, my_y, my_z, self_id=state.char_id)
+                # Com game_state ativo o tracker consome os deltas (só criaturas novas)
+                spawn_deltas = spawn_delta_feed.drain()
+                if snapshot is not None:
+                    suspicious_spawns = spawn_tracker.update_from_deltas(spawn_deltas, snapshot, self_id=state.char_id)
+                else:
+                    suspicious_spawns = spawn_tracker.update(all_creatures, my_x, my_y, my_z, self_id=state.char_id)
 
                 # Durante pausa AFK, ignora spawns suspeitos (evita falso positivo de respawns naturais)
                 # O tracker continua atualizando, mas não dispara alarme
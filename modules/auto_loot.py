@@ -11,6 +11,7 @@ from core.map_core import get_player_pos
 from core.bot_state import state
 from core.player_core import is_player_moving
 from core.models import Item, Container
+from core.read_plan import ReadPlan
 
 # Imports condicionais do novo sistema de loot configurável
 if USE_CONFIGURABLE_LOOT_SYSTEM:
@@ -43,43 +44,63 @@ def read_container_name(pm, address):
     try: return pm.read_string(address + OFFSET_CNT_NAME, 32)
     except: return "Unknown"
 
+# Slots de item que cabem no registro de um container
+CONTAINER_SLOTS = (STEP_CONTAINER - OFFSET_CNT_ITEM_ID) // STEP_SLOT
+
+
+def _build_containers_plan(max_cnt):
+    """Todos os containers (cabeçalho + slots) num único read_bytes."""
+    plan = ReadPlan()
+    for i in range(max_cnt):
+        cnt_offset = OFFSET_CONTAINER_START + (i * STEP_CONTAINER)
+        plan.add((i, "is_open"), cnt_offset + OFFSET_CNT_IS_OPEN)
+        plan.add((i, "name"), cnt_offset + OFFSET_CNT_NAME, "32s")
+        plan.add((i, "volume"), cnt_offset + OFFSET_CNT_VOLUME)
+        plan.add((i, "has_parent"), cnt_offset + OFFSET_CNT_HAS_PARENT)  # 0=raiz, 1=filho
+        plan.add((i, "amount"), cnt_offset + OFFSET_CNT_AMOUNT)
+        plan.add((i, "item_ids"), cnt_offset + OFFSET_CNT_ITEM_ID, count=CONTAINER_SLOTS, stride=STEP_SLOT)
+        plan.add((i, "item_counts"), cnt_offset + OFFSET_CNT_ITEM_COUNT, count=CONTAINER_SLOTS, stride=STEP_SLOT)
+    return plan
+
+
+# Previne erro se MAX_CONTAINERS for lido errado
+_CONTAINERS_PLAN = _build_containers_plan(MAX_CONTAINERS if isinstance(MAX_CONTAINERS, int) else 16)
+
+
+def _decode_container_name(raw):
+    try: return raw.split(b"\x00", 1)[0].decode("utf-8")
+    except UnicodeDecodeError: return "Unknown"
+
+
 def scan_containers(pm, base_addr):
     open_containers = []
+    try:
+        values = _CONTAINERS_PLAN.read(pm, base_addr)
+    except: return open_containers
 
-    # Previne erro se MAX_CONTAINERS for lido errado
     max_cnt = MAX_CONTAINERS if isinstance(MAX_CONTAINERS, int) else 16
-
     for i in range(max_cnt):
-        cnt_addr = base_addr + OFFSET_CONTAINER_START + (i * STEP_CONTAINER)
-        try:
-            is_open = pm.read_int(cnt_addr + OFFSET_CNT_IS_OPEN)
-            if is_open == 1:
-                name = read_container_name(pm, cnt_addr)
-                amount = pm.read_int(cnt_addr + OFFSET_CNT_AMOUNT)
-                volume = pm.read_int(cnt_addr + OFFSET_CNT_VOLUME)
-                hasparent_int = pm.read_int(cnt_addr + OFFSET_CNT_HAS_PARENT)  # 0=raiz, 1=filho
-
-                items = []
-                for slot in range(amount):
-                    item_id_addr = cnt_addr + OFFSET_CNT_ITEM_ID + (slot * STEP_SLOT)
-                    item_cnt_addr = cnt_addr + OFFSET_CNT_ITEM_COUNT + (slot * STEP_SLOT)
-                    try:
-                        raw_id = int(pm.read_int(item_id_addr))
-                        raw_count = int(pm.read_int(item_cnt_addr))
-                        final_count = max(1, raw_count)
-                        if raw_id > 0: items.append(Item(raw_id, final_count, slot))
-                    except: pass
-
-                open_containers.append(Container(
-                    index=i,
-                    name=name,
-                    volume=volume,
-                    amount=amount,
-                    has_parent=(hasparent_int == 1),
-                    items=items,
-                    address=cnt_addr
-                ))
-        except: continue
+        if values[(i, "is_open")] != 1:
+            continue
+        amount = values[(i, "amount")]
+        hasparent_int = values[(i, "has_parent")]
+
+        items = []
+        item_ids = values[(i, "item_ids")]
+        item_counts = values[(i, "item_counts")]
+        for slot in range(min(max(amount, 0), CONTAINER_SLOTS)):
+            raw_id = item_ids[slot]
+            if raw_id > 0: items.append(Item(raw_id, max(1, item_counts[slot]), slot))
+
+        open_containers.append(Container(
+            index=i,
+            name=_decode_container_name(values[(i, "name")]),
+            volume=values[(i, "volume")],
+            amount=amount,
+            has_parent=(hasparent_int == 1),
+            items=items,
+            address=base_addr + OFFSET_CONTAINER_START + (i * STEP_CONTAINER)
+        ))
     return open_containers
 
 def is_player_full(pm, base_addr):
@@ -27,9 +27,11 @@ from core.inventory_core import find_item_in_containers, find_item_in_equipment
 from database.tiles_config import ROPE_ITEM_ID, SHOVEL_ITEM_ID, get_ground_speed, GROUND_SPEEDS
 from core.bot_state import state
 from core.global_map import GlobalMap
+from core.route_planner import RoutePlanner, PlannedRoute, plan_route
 from core.player_core import get_player_speed, is_player_moving, wait_until_stopped
 from core.advancement_tracker import AdvancementTracker
 from core.battlelist import BattleListScanner
+from core.game_state import game_state
 from core.models import Position
 from core.spawn_parser import parse_spawns, SpawnArea
 from core.spawn_selector import SpawnSelector
@@ -93,9 +95,30 @@ class Cavebot:
         # Floor transitions e archways são bundled no .exe
         transitions_path = _get_bundled_path("floor_transitions.json")
         archway_files = [_get_bundled_path(f"archway{i}.txt") for i in range(1, 5)]
+        # Atlas empacotado (se gerado) substitui a leitura chunk a chunk do diretório
+        atlas_path = os.path.join(effective_maps_dir, MAP_ATLAS_FILENAME)
         self.global_map = GlobalMap(effective_maps_dir, WALKABLE_COLORS,
                                     transitions_file=transitions_path,
-                                    archway_files=archway_files)
+                                    archway_files=archway_files,
+                                    atlas_file=atlas_path)
+        self.global_map.use_jps = USE_JPS_PATHFINDING
+        # HPA*: grafo de clusters pré-computado (clusters ausentes são calculados sob demanda)
+        if USE_HIERARCHICAL_PATHFINDING:
+            self.global_map.enable_hierarchical(os.path.join(effective_maps_dir, HPA_GRAPH_FILENAME))
+        # Labels de conectividade: destinos inalcançáveis falham sem rodar o A*
+        connectivity_path = os.path.join(effective_maps_dir, CONNECTIVITY_FILENAME)
+        if os.path.isfile(connectivity_path):
+            self.global_map.load_connectivity(connectivity_path)
+        # Landmarks ALT: heurística do A* 3D que enxerga desvios até escadas/buracos
+        landmarks_path = os.path.join(effective_maps_dir, LANDMARKS_FILENAME)
+        if os.path.isfile(landmarks_path):
+            self.global_map.load_landmarks(landmarks_path)
+        # Rotas globais calculadas em background (None = calcula na thread do cavebot)
+        self.route_planner = None
+        if ASYNC_ROUTE_PLANNING:
+            self.route_planner = RoutePlanner(self.global_map, workers=ROUTE_PLANNER_WORKERS,
+                                              budget_seconds=ROUTE_PLANNING_BUDGET_S)
+        self._route_future = None  # Pedido em andamento no route_planner
         self.current_global_path = [] # Lista de nós [(x,y,z), ...] da rota atual
         self.last_lookahead_idx = -1
 
@@ -107,6 +130,7 @@ class Cavebot:
 
         self.enabled = False
         self.last_action_time = 0
+        self._map_snapshot_version = 0  # t2_version do último mapa usado do game_state
 
         # Detecção de stuck
         self.stuck_counter = 0
@@ -167,10 +191,13 @@ class Cavebot:
         self._cached_spawn_target_pos = None # Cache do último alvo (auto-explore)
         self._last_closest_idx = -1          # Último índice de sincronização na rota
 
-    def load_waypoints(self, waypoints_list):
+    def load_waypoints(self, waypoints_list, routes_file=None):
         """
         Carrega lista de waypoints com validação thread-safe.
         Ex: [{'x': 32000, 'y': 32000, 'z': 7, 'action': 'walk'}, ...]
+
+        routes_file: bundle de rotas pré-computadas do script
+        (utils/generate_route_bundle.py). Sem bundle, as rotas são calculadas em tempo real.
         """
         validated = []
 
@@ -239,6 +266,14 @@ class Cavebot:
 
         print(f"[{_ts()}] [Cavebot] Carregados {len(validated)} waypoints válidos de {len(waypoints_list)} totais")
 
+        # Rotas pré-computadas entre waypoints (substitui o bundle do script anterior)
+        if routes_file and os.path.isfile(routes_file):
+            legs = self.global_map.load_route_bundle(routes_file, validated)
+            if legs:
+                print(f"[{_ts()}] [Cavebot] 🗺️ Bundle de rotas: {legs} trechos pré-computados")
+        else:
+            self.global_map.route_cache.unpin_all()
+
     def start(self):
         self.enabled = True
         state.set_cavebot_state(True)  # Notifica que Cavebot está ativo
@@ -296,6 +331,9 @@ class Cavebot:
     def stop(self):
         self.enabled = False
         state.set_cavebot_state(False)  # Notifica que Cavebot está inativo
+        if self.route_planner is not None:
+            self.route_planner.cancel(self._route_future)
+        self._route_future = None
         print(f"[{_ts()}] [Cavebot] Parado.")
 
     def run_cycle(self):
@@ -501,9 +539,14 @@ class Cavebot:
         self._precompute_done = False
 
         # 1. Atualizar Posição e Mapa
-        px, py, pz = get_player_pos(self.pm, self.base_addr)
-        player_id = state.get_player_id(self.pm, self.base_addr)
-        success = self.memory_map.read_full_map(player_id)
+        snapshot_pos = self._load_map_from_snapshot()
+        if snapshot_pos:
+            px, py, pz = snapshot_pos
+            success = True
+        else:
+            px, py, pz = get_player_pos(self.pm, self.base_addr)
+            player_id = state.get_player_id(self.pm, self.base_addr)
+            success = self.memory_map.read_full_map(player_id)
 
         # RETRY LOGIC: Se calibração falhar, tenta novamente
         if not success or not self.memory_map.is_calibrated:
@@ -1158,6 +1201,35 @@ class Cavebot:
     # WAYPOINT NAVIGATION
     # ==================================================================
 
+    def _plan_global_route(self, start, goal, reason):
+        """
+        Rotas globais de start até goal (PlannedRoute). Sem route_planner calcula
+        na hora; com ele, agenda o cálculo em background e retorna None enquanto
+        não terminar. Um pedido anterior para outro destino/andar é cancelado.
+        """
+        if self.route_planner is None:
+            print(f"[{_ts()}] [Nav] 🌍 Calculando Rota Global... Motivo: {reason}")
+            return plan_route(self.global_map, start, goal, USE_MULTIFLOOR_PATHFINDING)
+
+        future = self._route_future
+        if future is not None and (future.goal != goal or future.start[2] != start[2]):
+            print(f"[{_ts()}] [Nav] ✋ Destino/andar mudou, cancelando rota em cálculo para {future.goal}")
+            self.route_planner.cancel(future)
+            future = None
+        if future is None:
+            print(f"[{_ts()}] [Nav] 🌍 Calculando Rota Global... Motivo: {reason}")
+            future = self._route_future = self.route_planner.submit(start, goal, USE_MULTIFLOOR_PATHFINDING)
+        if not future.done():
+            return None
+
+        self._route_future = None
+        planned = self.route_planner.collect(future)
+        if planned is None:
+            return PlannedRoute(start, goal, USE_MULTIFLOOR_PATHFINDING)
+        if DEBUG_PATHFINDING and not planned.from_cache:
+            print(f"[{_ts()}] [Nav] Rota global calculada em background em {planned.elapsed:.2f}s")
+        return planned
+
     def _navigate_hybrid(self, dest_x, dest_y, dest_z, my_x, my_y):
         """
         Decide se usa rota Global ou Local e move o personagem.
@@ -1180,84 +1252,80 @@ class Cavebot:
         if need_global:
             self.current_state = self.STATE_RECALCULATING
             self.state_message = "🔄 Recalculando rota global..."
-            print(f"[{_ts()}] [Nav] 🌍 Calculando Rota Global... Motivo: {reason}")
+            _, _, my_z = get_player_pos(self.pm, self.base_addr)
+            planned = self._plan_global_route((my_x, my_y, my_z), (dest_x, dest_y, dest_z), reason)
+            if planned is None:
+                # Rota ainda em cálculo no RoutePlanner: segue com o walker local
+                self.state_message = "🔄 Calculando rota global (seguindo walker local)..."
+                need_global = False
+
+        if need_global:
             # Ao recalcular global, limpamos o cache local (só se estiver usando cache)
             if not REALTIME_PATHING_ENABLED:
                 self.local_path_cache = []
 
-            # ===== NOVO: Usar fallback inteligente =====
-            _, _, my_z = get_player_pos(self.pm, self.base_addr)
-            if USE_MULTIFLOOR_PATHFINDING and my_z != dest_z:
-                path = self.global_map.get_path_multilevel(
-                    (my_x, my_y, my_z),
-                    (dest_x, dest_y, dest_z)
-                )
-                # Se o path cruza andares, extrair apenas tiles do andar atual
-                if path and any(t[2] != my_z for t in path):
-                    # Inserir waypoints adjacentes às transições
-                    path = self._insert_transition_waypoints(path)
-                    same_floor = []
-                    for t in path:
-                        if t[2] == my_z:
-                            same_floor.append(t)
-                        else:
-                            break
-                    # Parar 2 tiles antes da transição (para scan_for_floor_change detectar)
-                    if len(same_floor) > 2:
-                        same_floor = same_floor[:-2]
-                    if same_floor:
-                        path = same_floor
-                        print(f"[{_ts()}] [Nav] 🔀 Rota multifloor detectada, usando {len(path)} tiles do andar atual")
+            path = planned.multilevel if USE_MULTIFLOOR_PATHFINDING and my_z != dest_z else None
+            # Se o path cruza andares, extrair apenas tiles do andar atual
+            if path and any(t[2] != my_z for t in path):
+                # Inserir waypoints adjacentes às transições
+                path = self._insert_transition_waypoints(path)
+                same_floor = []
+                for t in path:
+                    if t[2] == my_z:
+                        same_floor.append(t)
                     else:
-                        # Bot já está perto da transição — tentar floor change
-                        print(f"[{_ts()}] [Nav] 🔀 Bot próximo de transição de andar, tentando floor change...")
-                        next_z = next((t[2] for t in path if t[2] != my_z), None)
-                        if next_z is not None:
-                            floor_target = self.analyzer.scan_for_floor_change(
-                                next_z, my_z,
-                                player_abs_x=my_x, player_abs_y=my_y,
-                                transitions_by_floor=self.global_map._transitions_by_floor if self.global_map else None
-                            )
-                            if floor_target:
-                                fx, fy, ftype, fid = floor_target
-                                dist_obj = math.sqrt(fx**2 + fy**2)
-                                if dist_obj <= 1.5:
-                                    print(f"[{_ts()}] [Nav] 🪜 Adjacente a {ftype}, usando...")
-                                    fc_success = self._handle_special_tile(fx, fy, ftype, fid, my_x, my_y, dest_z)
-                                    self.current_global_path = []
-                                    if fc_success:
-                                        self.last_floor_change_time = time.time()
-                                    return
-                                else:
-                                    # Navegar até o tile especial
-                                    abs_x = my_x + fx
-                                    abs_y = my_y + fy
-                                    path = self.global_map.get_path(
-                                        (my_x, my_y, dest_z), (abs_x, abs_y, dest_z)
-                                    )
-                            if not floor_target or not path:
-                                path = None
-                        else:
+                        break
+                # Parar 2 tiles antes da transição (para scan_for_floor_change detectar)
+                if len(same_floor) > 2:
+                    same_floor = same_floor[:-2]
+                if same_floor:
+                    path = same_floor
+                    print(f"[{_ts()}] [Nav] 🔀 Rota multifloor detectada, usando {len(path)} tiles do andar atual")
+                else:
+                    # Bot já está perto da transição — tentar floor change
+                    print(f"[{_ts()}] [Nav] 🔀 Bot próximo de transição de andar, tentando floor change...")
+                    next_z = next((t[2] for t in path if t[2] != my_z), None)
+                    if next_z is not None:
+                        floor_target = self.analyzer.scan_for_floor_change(
+                            next_z, my_z,
+                            player_abs_x=my_x, player_abs_y=my_y,
+                            transitions_by_floor=self.global_map._transitions_by_floor if self.global_map else None
+                        )
+                        if floor_target:
+                            fx, fy, ftype, fid = floor_target
+                            dist_obj = math.sqrt(fx**2 + fy**2)
+                            if dist_obj <= 1.5:
+                                print(f"[{_ts()}] [Nav] 🪜 Adjacente a {ftype}, usando...")
+                                fc_success = self._handle_special_tile(fx, fy, ftype, fid, my_x, my_y, dest_z)
+                                self.current_global_path = []
+                                if fc_success:
+                                    self.last_floor_change_time = time.time()
+                                return
+                            else:
+                                # Navegar até o tile especial
+                                abs_x = my_x + fx
+                                abs_y = my_y + fy
+                                path = self.global_map.get_path(
+                                    (my_x, my_y, dest_z), (abs_x, abs_y, dest_z)
+                                )
+                        if not floor_target or not path:
                             path = None
-            else:
-                path = None
+                    else:
+                        path = None
 
             if not path:
-                path = self.global_map.get_path_with_fallback(
-                    (my_x, my_y, dest_z),
-                    (dest_x, dest_y, dest_z),
-                    max_offset=2
-                )
+                path = planned.same_floor
                 if path:
                     # Same-floor funcionou, limpar rota multifloor se existia
                     self._multifloor_full_path = None
 
             # Fallback: se same-floor falhou, tentar multifloor (barreira pode exigir desvio por outro andar)
+            # ou, se o budget do planner acabou, a melhor rota parcial
             if not path and USE_MULTIFLOOR_PATHFINDING:
-                ml_path = self.global_map.get_path_multilevel(
-                    (my_x, my_y, my_z),
-                    (dest_x, dest_y, dest_z)
-                )
+                ml_path = planned.fallback_multilevel or planned.partial
+                if ml_path and not planned.fallback_multilevel:
+                    print(f"[{_ts()}] [Nav] ⏱️ Rota global incompleta ({planned.interrupted or 'limite de iterações'}), "
+                          f"seguindo rota parcial ({len(ml_path)} nós)")
                 if ml_path and any(t[2] != my_z for t in ml_path):
                     # Salvar rota completa para o floor change handler usar
                     self._multifloor_full_path = ml_path
@@ -1287,6 +1355,10 @@ class Cavebot:
                 self.advancement_tracker.reset()  # Reseta tracker para dar tempo de começar a andar
                 self.last_global_path_time = time.time()  # Marca quando gerou rota para cooldown
                 print(f"[{_ts()}] [Nav] 🛤️ Rota Global Gerada: {len(path)} nós.")
+                if DEBUG_PATHFINDING:
+                    cs = self.global_map.route_cache.stats()
+                    print(f"[{_ts()}] [Nav] Route cache: {cs['hits']} hits, {cs['suffix_hits']} sufixos, "
+                          f"{cs['misses']} misses ({cs['hit_rate']:.0%}), {cs['invalidations']} invalidações")
             else:
                 print(f"[{_ts()}] [Nav] ⚠️ GlobalMap não achou rota (nem com fallback). Tentando direto.")
         
@@ -1591,6 +1663,26 @@ class Cavebot:
                     # Passa o sub-destino (lookahead) para bloquear o tile correto
                     self._handle_hard_stuck(target_local_x, target_local_y, dest_z, my_x, my_y)
 
+    def _load_map_from_snapshot(self):
+        """
+        Carrega no memory_map o mapa do último snapshot do game_state, se ele foi
+        lido depois da última ação do cavebot e ainda não foi usado (mesma
+        informação de uma leitura agora, sem reler o bloco de mapa).
+
+        Returns:
+            (px, py, pz) do player no momento da leitura, ou None para ler direto
+        """
+        snapshot = game_state.get_snapshot()
+        if (snapshot is None or snapshot.map_raw is None
+                or snapshot.t2_version == self._map_snapshot_version
+                or snapshot.t2_timestamp <= self.last_action_time):
+            return None
+        self._map_snapshot_version = snapshot.t2_version
+        if not self.memory_map.load_map_data(snapshot.map_raw, snapshot.map_player_id):
+            return None
+        pos = snapshot.map_position
+        return pos.x, pos.y, pos.z
+
     def _try_precompute_next_step(self):
         """
         Pré-calcula o próximo passo durante o tempo de espera (blocked).
@@ -1605,11 +1697,15 @@ class Cavebot:
                 return
 
             # Ler posição e mapa
-            px, py, pz = get_player_pos(self.pm, self.base_addr)
-            player_id = state.get_player_id(self.pm, self.base_addr)
-            success = self.memory_map.read_full_map(player_id)
-            if not success or not self.memory_map.is_calibrated:
-                return
+            snapshot_pos = self._load_map_from_snapshot()
+            if snapshot_pos:
+                px, py, pz = snapshot_pos
+            else:
+                px, py, pz = get_player_pos(self.pm, self.base_addr)
+                player_id = state.get_player_id(self.pm, self.base_addr)
+                success = self.memory_map.read_full_map(player_id)
+                if not success or not self.memory_map.is_calibrated:
+                    return
 
             # Auto-explore: precisa de spawn target no mesmo andar
             if self.auto_explore_enabled:
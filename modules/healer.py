@@ -227,11 +227,14 @@ class HealerModule(BaseModule):
             print(f"[healer] Empty target name for {rule.target_type}")
             return None
 
-        # For "friend" targets, scan ALL entities directly from battlelist
+        # For "friend" targets, search ALL battlelist entities (creatures + players)
         # This bypasses is_player detection which may fail in some cases
         if rule.target_type == "friend":
-            scanner = BattleListScanner(self.pm, self.base_addr)
-            entities = scanner.scan_all()
+            snapshot = game_state.get_snapshot()
+            if snapshot is not None:
+                entities = snapshot.creatures + snapshot.players
+            else:
+                entities = BattleListScanner(self.pm, self.base_addr).scan_all()
             print(f"[healer] Searching for '{target_name}' in {len(entities)} battlelist entities")
         else:
             entities = game_state.get_creatures()
@@ -26,6 +26,7 @@ from core.map_analyzer import MapAnalyzer
 from core.astar_walker import AStarWalker
 from core.creature_chaser import CreatureChaser, ChaseResult
 from core.battlelist import BattleListScanner, SpawnTracker
+from core.creature_table import CreatureDeltaFeed
 from core.models import Position
 from core.overlay_renderer import renderer as overlay_renderer
 from modules.combat_movement import CombatMover
@@ -296,9 +297,12 @@ def get_adjacent_target(rel_x, rel_y, attack_range=1):
 
 def get_bot_path_cost(walker, rel_x, rel_y, attack_range=1):
     """
-    Calcula custo real de movimento do bot via A* até tile adjacente.
+    Calcula custo real de movimento do bot até tile adjacente.
     Considera obstáculos e penalidade de diagonal (30 vs 10).
 
+    O custo vem do mapa de distâncias do walker (um Dijkstra por snapshot do mapa),
+    então ranquear várias criaturas no mesmo ciclo não repete buscas.
+
     Returns:
         Custo em unidades, ou float('inf') se sem caminho
     """
@@ -308,10 +312,7 @@ def get_bot_path_cost(walker, rel_x, rel_y, attack_range=1):
     if target_x == 0 and target_y == 0:
         return 0  # Já está adjacente
 
-    path = walker.get_full_path(target_x, target_y)
-    if not path:
-        return float('inf')
-    return sum(30 if dx != 0 and dy != 0 else 10 for dx, dy in path)
+    return walker.get_path_cost(target_x, target_y)
 
 def get_distance_cost(walker, rel_x, rel_y, attack_range=1):
     """
@@ -693,6 +694,8 @@ def trainer_loop(pm, base_addr, hwnd, monitor, check_running, config, status_cal
     # SpawnTracker INLINE - detecta spawns ANTES do ataque (previne race condition com alarm)
     # Proteção primária: trainer detecta spawn suspeito antes de decidir atacar
     trainer_spawn_tracker = SpawnTracker(suspicious_range=5, floor_change_cooldown=3.0)
+    # Deltas do battlelist publicados pelo game_state (o tracker só olha criaturas novas)
+    spawn_delta_feed = CreatureDeltaFeed()
 
     # Anti Kill-Steal Detection
     engagement_detector = EngagementDetector()
@@ -702,6 +705,7 @@ def trainer_loop(pm, base_addr, hwnd, monitor, check_running, config, status_cal
 
     while True:
         if check_running and not check_running(): 
+            spawn_delta_feed.close()
             return
 
         if not get_cfg('enabled', False): 
@@ -883,10 +887,12 @@ def trainer_loop(pm, base_addr, hwnd, monitor, check_running, config, status_cal
 
             # SCAN via game_state cache (20Hz) com fallback para BattleListScanner
             # game_state reduz syscalls: 1 thread escaneia, todos os módulos consomem
-            all_creatures = game_state.get_creatures() + game_state.get_players()
+            snapshot = game_state.get_snapshot()
+            all_creatures = list(snapshot.creatures + snapshot.players) if snapshot else []
 
             # Fallback: se game_state ainda não populou, usa scanner direto
             if not all_creatures:
+                snapshot = None
                 all_creatures = scanner.scan_all()
 
             # Atualiza overlay de debug (se XRAY_TRAINER_DEBUG ativo)
@@ -900,9 +906,17 @@ def trainer_loop(pm, base_addr, hwnd, monitor, check_running, config, status_cal
             # SPAWN PROTECTION: Detecta spawns suspeitos ANTES de decidir atacar
             # Previne race condition onde trainer ataca antes do alarm detectar GM summon
             # ==============================================================================
-            suspicious_spawns = trainer_spawn_tracker.update(
-                all_creatures, my_x, my_y, my_z, self_id=state.char_id
-            )
+            # Com game_state ativo o tracker consome os deltas (só criaturas novas);
+            # no fallback (MAS_VIS) compara o scan completo como antes
+            spawn_deltas = spawn_delta_feed.drain()
+            if snapshot is not None:
+                suspicious_spawns = trainer_spawn_tracker.update_from_deltas(
+                    spawn_deltas, snapshot, self_id=state.char_id
+                )
+            else:
+                suspicious_spawns = trainer_spawn_tracker.update(
+                    all_creatures, my_x, my_y, my_z, self_id=state.char_id
+                )
 
             # Marca spawns suspeitos na blacklist compartilhada
             # Durante pausa AFK, ignora spawns suspeitos (evita falso positivo de respawns naturais)
@@ -1061,7 +1075,7 @@ def trainer_loop(pm, base_addr, hwnd, monitor, check_running, config, status_cal
                             print(f"      ⚠️ Monstro no mesmo tile (dist=0)")
                     else:
                         # Verifica se há caminho COMPLETO até posição ADJACENTE ao alvo
-                        # (get_bot_path_cost calcula tile adjacente e usa A* full path)
+                        # (get_bot_path_cost usa o mapa de distâncias Dijkstra do snapshot via walker.get_path_cost)
                         path_cost = get_bot_path_cost(walker, rel_x, rel_y, MELEE_RANGE)
                         if path_cost == float('inf'):
                             is_reachable = False
@@ -0,0 +1,155 @@
+"""
+Teste randomizado do AStarWalker (buffers planos reutilizados) contra Dijkstra.
+
+O mesmo walker atende milhares de consultas em snapshots aleatórios (o player
+anda, o mapa muda), então as gerações de _seen/_closed e o mapa de distâncias
+são reaproveitados de um snapshot para o outro:
+- get_next_step: o passo precisa estar em um caminho de custo mínimo (variância
+  humana desligada durante o teste, senão o ótimo não é determinístico);
+- get_path_cost: igual ao Dijkstra cardinal 10 / diagonal 30 da janela;
+- get_full_path: passos vizinhos, por tiles andáveis, terminando no alvo.
+
+Como usar:
+    python test_astar_walker.py [seed] [consultas]
+    python -m pytest test_astar_walker.py
+"""
+import heapq
+import random
+import sys
+
+import core.astar_walker as astar_walker
+from core.astar_walker import AStarWalker, SEARCH_RADIUS, DIST_CARDINAL, DIST_DIAGONAL
+from test_chase_planner import RandomWorld, FakeAnalyzer, WORLD_SIZE, window_tiles, reference_costs
+
+_INF = float('inf')
+_STEPS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+def walkable_cells(world, px, py):
+    """Tiles andáveis do grid do walker (o anel SEARCH_RADIUS é sempre bloqueado)."""
+    radius = SEARCH_RADIUS - 1
+    return {(rel_x, rel_y)
+            for rel_x in range(-radius, radius + 1) for rel_y in range(-radius, radius + 1)
+            if world.tile(px + rel_x, py + rel_y)[0]}
+
+
+def reference_distances(walkable):
+    """Dijkstra do get_path_cost: só tiles andáveis servem de passagem, qualquer um é destino."""
+    dist = {(0, 0): 0}
+    open_list = [(0, (0, 0))]
+    while open_list:
+        d, u = heapq.heappop(open_list)
+        if d != dist[u]:
+            continue
+        if u != (0, 0) and u not in walkable:
+            continue
+        for dx, dy in _STEPS:
+            v = (u[0] + dx, u[1] + dy)
+            if max(abs(v[0]), abs(v[1])) > SEARCH_RADIUS:
+                continue
+            nd = d + (DIST_DIAGONAL if dx and dy else DIST_CARDINAL)
+            if nd < dist.get(v, _INF):
+                dist[v] = nd
+                heapq.heappush(open_list, (nd, v))
+    return dist
+
+
+def check_next_step(tiles, goal, step):
+    best = reference_costs(tiles, goal)
+    if best == _INF:
+        return None if step is None else f"passo {step} sem caminho"
+    if step is None:
+        return f"sem passo, Dijkstra achou custo {best}"
+    dx, dy = step
+    if max(abs(dx), abs(dy)) != 1:
+        return f"passo {step} não é vizinho"
+    blocked, cost, s = tiles[step]
+    if step != goal and blocked:
+        return f"passo {step} em tile bloqueado"
+    first = (s * 3 if dx and dy else s) + (0 if step == goal else cost)
+    rest = reference_costs(tiles, goal, source=step)
+    if first + rest != best:
+        return f"passo {step} custa {first + rest}, ótimo {best}"
+    return None
+
+
+def check_full_path(walkable, goal, path):
+    x = y = 0
+    for i, (dx, dy) in enumerate(path):
+        if max(abs(dx), abs(dy)) != 1:
+            return f"passo {i} ({dx}, {dy}) não é vizinho"
+        x, y = x + dx, y + dy
+        if (x, y) != goal and (x, y) not in walkable:
+            return f"passo {i} entra em ({x}, {y}) não andável"
+    if path and (x, y) != goal:
+        return f"caminho termina em ({x}, {y})"
+    return None
+
+
+def run(seed, queries):
+    """Faz queries consultas no mesmo AStarWalker. Retorna a lista de falhas."""
+    rng = random.Random(seed)
+    world = RandomWorld(rng)
+    analyzer = FakeAnalyzer(world)
+    walker = AStarWalker(analyzer)
+    center = WORLD_SIZE // 2
+    px, py = center, center
+    failures = []
+
+    variance = astar_walker._VARIANCE[:]
+    astar_walker._VARIANCE[:] = [1.0] * len(variance)
+    try:
+        for n in range(queries):
+            roll = rng.random()
+            if roll < 0.1:
+                world.mutate(px, py, rng.randint(1, 12))
+            elif roll < 0.4:
+                px = min(max(px + rng.randint(-2, 2), 16), WORLD_SIZE - 17)
+                py = min(max(py + rng.randint(-2, 2), 16), WORLD_SIZE - 17)
+            analyzer.pos = (px, py)
+
+            tiles = window_tiles(world, px, py)
+            walkable = walkable_cells(world, px, py)
+            goal = (0, 0)
+            while goal == (0, 0):
+                goal = (rng.randint(-SEARCH_RADIUS, SEARCH_RADIUS),
+                        rng.randint(-SEARCH_RADIUS, SEARCH_RADIUS))
+
+            kind = rng.random()
+            if kind < 0.5:
+                error = check_next_step(tiles, goal, walker.get_next_step(*goal, activate_fallback=False))
+            elif kind < 0.8:
+                cost = walker.get_path_cost(*goal)
+                expected = reference_distances(walkable).get(goal, _INF)
+                error = None if cost == expected else f"get_path_cost {cost}, Dijkstra {expected}"
+            else:
+                error = check_full_path(walkable, goal, walker.get_full_path(*goal))
+            if error:
+                failures.append(f"seed {seed} consulta {n} player ({px}, {py}) alvo {goal}: {error}")
+    finally:
+        astar_walker._VARIANCE[:] = variance
+    return failures
+
+
+def test_astar_walker_matches_dijkstra():
+    failures = []
+    for seed in range(1, 5):
+        failures += run(seed, 3000)
+    assert not failures, "\n".join(failures[:10])
+
+
+def main():
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else random.randrange(1 << 30)
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    print(f"=== AStarWalker x Dijkstra (seed {seed}, {queries} consultas) ===")
+    failures = run(seed, queries)
+    for line in failures[:20]:
+        print(f"❌ {line}")
+    if failures:
+        print(f"❌ {len(failures)} consultas divergentes")
+        sys.exit(1)
+    print("✅ Todas as consultas batem com o Dijkstra")
+
+
+if __name__ == '__main__':
+    main()
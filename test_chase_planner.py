@@ -0,0 +1,226 @@
+"""
+Teste randomizado do ChasePlanner (D* Lite) contra um Dijkstra simples.
+
+Simula um chase em um mundo aleatório: o player segue os passos do planner
+(às vezes anda para outro lado ou é teleportado), a criatura anda/pula ao redor
+dele e o mapa muda de tempos em tempos (tiles bloqueados, custos e ground speed).
+A cada chamada o passo devolvido precisa estar em um caminho de custo mínimo
+dentro da janela visível, recalculado do zero pelo Dijkstra de referência.
+
+Como usar:
+    python test_chase_planner.py [seed] [passos]
+    python -m pytest test_chase_planner.py
+"""
+import heapq
+import random
+import sys
+
+from core.astar_walker import AStarWalker, ChasePlanner, SEARCH_RADIUS
+from core.map_analyzer import GRID_RADIUS, LocalCostGrid
+
+WORLD_SIZE = 128
+_INF = float('inf')
+_STEPS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class RandomWorld:
+    """Mapa absoluto com walkable/custo/ground speed por tile."""
+
+    def __init__(self, rng, size=WORLD_SIZE):
+        self.rng = rng
+        self.size = size
+        self.version = 0
+        self.tiles = {}
+        for x in range(size):
+            for y in range(size):
+                self.tiles[(x, y)] = self._random_tile()
+
+    def _random_tile(self):
+        rng = self.rng
+        walkable = rng.random() < 0.75
+        roll = rng.random()
+        if roll < 0.8:
+            cost = 0
+        elif roll < 0.95:
+            cost = rng.choice((10, 25, 50, 120))
+        else:
+            cost = 999
+        speed = rng.choice((100, 110, 125, 150, 200, 250))
+        return walkable, cost, speed
+
+    def tile(self, x, y):
+        return self.tiles.get((x, y), (False, 999, 150))
+
+    def mutate(self, cx, cy, count):
+        """Troca count tiles perto de (cx, cy) (nova versão do snapshot)."""
+        for _ in range(count):
+            x = cx + self.rng.randint(-GRID_RADIUS, GRID_RADIUS)
+            y = cy + self.rng.randint(-GRID_RADIUS, GRID_RADIUS)
+            if (x, y) in self.tiles:
+                self.tiles[(x, y)] = self._random_tile()
+        self.version += 1
+
+
+class FakeAnalyzer:
+    """MapAnalyzer mínimo: um LocalCostGrid por (posição do player, versão do mapa)."""
+
+    def __init__(self, world):
+        self.world = world
+        self.pos = (0, 0)
+        self._key = None
+        self._grid = None
+
+    def get_cost_grid(self):
+        key = (self.pos, self.world.version)
+        if key != self._key:
+            px, py = self.pos
+            props = []
+            speed = []
+            for rel_y in range(-GRID_RADIUS, GRID_RADIUS + 1):
+                for rel_x in range(-GRID_RADIUS, GRID_RADIUS + 1):
+                    walkable, cost, s = self.world.tile(px + rel_x, py + rel_y)
+                    props.append({'walkable': walkable, 'cost': cost})
+                    speed.append(s)
+            self._grid = LocalCostGrid(key, props, speed)
+            self._key = key
+        return self._grid
+
+
+def window_tiles(world, px, py):
+    """
+    {(rel_x, rel_y): (bloqueado, custo, speed)} como a janela do walker vê:
+    fora do grid (anel SEARCH_RADIUS) o tile é bloqueado.
+    """
+    tiles = {}
+    for rel_x in range(-SEARCH_RADIUS, SEARCH_RADIUS + 1):
+        for rel_y in range(-SEARCH_RADIUS, SEARCH_RADIUS + 1):
+            if abs(rel_x) > GRID_RADIUS or abs(rel_y) > GRID_RADIUS:
+                tiles[(rel_x, rel_y)] = (True, 999, 150)
+            else:
+                walkable, cost, speed = world.tile(px + rel_x, py + rel_y)
+                tiles[(rel_x, rel_y)] = (not walkable or cost >= 999, cost, speed)
+    return tiles
+
+
+def reference_costs(tiles, goal, source=(0, 0)):
+    """
+    Dijkstra na janela com o modelo do ChasePlanner: entrar em v custa
+    speed * (3 na diagonal) + custo do tile (0 no destino); tiles bloqueados
+    (ou custo >= 999) só entram como destino e não servem de passagem.
+    """
+    dist = {source: 0}
+    open_list = [(0, source)]
+    while open_list:
+        d, u = heapq.heappop(open_list)
+        if d != dist[u]:
+            continue
+        if u == goal:
+            break
+        if u != source and tiles[u][0]:
+            continue
+        for dx, dy in _STEPS:
+            v = (u[0] + dx, u[1] + dy)
+            tile = tiles.get(v)
+            if tile is None or (tile[0] and v != goal):
+                continue
+            _, cost, s = tile
+            nd = d + (s * 3 if dx and dy else s) + (0 if v == goal else cost)
+            if nd < dist.get(v, _INF):
+                dist[v] = nd
+                heapq.heappush(open_list, (nd, v))
+    return dist.get(goal, _INF)
+
+
+def check_step(world, px, py, goal, step):
+    """Erro (str) se step não é o primeiro passo de um caminho ótimo, senão None."""
+    tiles = window_tiles(world, px, py)
+    best = reference_costs(tiles, goal)
+    if best == _INF:
+        return None if step is None else f"passo {step} sem caminho"
+    if step is None:
+        return f"sem passo, Dijkstra achou custo {best}"
+    dx, dy = step
+    if max(abs(dx), abs(dy)) != 1:
+        return f"passo {step} não é vizinho"
+    blocked, cost, s = tiles[step]
+    if step != goal and blocked:
+        return f"passo {step} em tile bloqueado"
+    first = (s * 3 if dx and dy else s) + (0 if step == goal else cost)
+    rest = reference_costs(tiles, goal, source=step)
+    if first + rest != best:
+        return f"passo {step} custa {first + rest}, ótimo {best}"
+    return None
+
+
+def run(seed, steps):
+    """Simula steps chamadas do ChasePlanner. Retorna a lista de falhas."""
+    rng = random.Random(seed)
+    world = RandomWorld(rng)
+    analyzer = FakeAnalyzer(world)
+    planner = ChasePlanner(AStarWalker(analyzer))
+    center = WORLD_SIZE // 2
+    px, py = center, center
+    tx, ty = px + 3, py + 2
+    failures = []
+
+    for n in range(steps):
+        roll = rng.random()
+        if roll < 0.05:
+            world.mutate(px, py, rng.randint(1, 12))
+        elif roll < 0.06:
+            planner.reset()
+
+        # Criatura anda (ou pula) sem sair da janela
+        if rng.random() < 0.05:
+            tx = px + rng.randint(-SEARCH_RADIUS, SEARCH_RADIUS)
+            ty = py + rng.randint(-SEARCH_RADIUS, SEARCH_RADIUS)
+        elif rng.random() < 0.5:
+            dx, dy = rng.choice(_STEPS)
+            tx, ty = tx + dx, ty + dy
+        tx = min(max(tx, px - SEARCH_RADIUS), px + SEARCH_RADIUS)
+        ty = min(max(ty, py - SEARCH_RADIUS), py + SEARCH_RADIUS)
+        if (tx, ty) == (px, py):
+            tx += 1
+
+        analyzer.pos = (px, py)
+        goal = (tx - px, ty - py)
+        step = planner.get_next_step(px, py, *goal)
+        error = check_step(world, px, py, goal, step)
+        if error:
+            failures.append(f"seed {seed} passo {n} player ({px}, {py}) alvo {goal}: {error}")
+
+        # Player segue o planner na maior parte do tempo
+        roll = rng.random()
+        if roll < 0.01 or not (16 <= px < WORLD_SIZE - 16 and 16 <= py < WORLD_SIZE - 16):
+            px = center + rng.randint(-20, 20)
+            py = center + rng.randint(-20, 20)
+        elif step is not None and step != goal and roll < 0.85:
+            px, py = px + step[0], py + step[1]
+        elif roll < 0.95:
+            dx, dy = rng.choice(_STEPS)
+            px, py = px + dx, py + dy
+    return failures
+
+
+def test_chase_planner_matches_dijkstra():
+    failures = []
+    for seed in range(1, 5):
+        failures += run(seed, 3000)
+    assert not failures, "\n".join(failures[:10])
+
+
+def main():
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else random.randrange(1 << 30)
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    print(f"=== ChasePlanner x Dijkstra (seed {seed}, {steps} passos) ===")
+    failures = run(seed, steps)
+    for line in failures[:20]:
+        print(f"❌ {line}")
+    if failures:
+        print(f"❌ {len(failures)} passos fora do ótimo")
+        sys.exit(1)
+    print("✅ Todos os passos em caminhos ótimos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Gera o atlas do mundo (arquivo único) a partir dos arquivos .map.
+
+Empacota todos os chunks, as máscaras de walkability (já com archways e
+transições), o floor_transitions.json e os archway*.txt em um único arquivo
+indexado, aberto via mmap pelo GlobalMap (parâmetro atlas_file).
+
+Uso:
+    python utils/generate_atlas.py [maps_directory] [output_file]
+
+Se maps_directory não for passado, usa MAPS_DIRECTORY do config.py.
+Se output_file não for passado, salva MAP_ATLAS_FILENAME dentro do diretório dos mapas.
+Rode novamente sempre que os .map ou o floor_transitions.json mudarem.
+"""
+import os
+import sys
+import time
+
+# Adiciona root do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.global_map import GlobalMap
+from core.map_atlas import write_atlas
+from config import WALKABLE_COLORS, MAP_ATLAS_FILENAME
+
+
+def build_atlas(maps_dir, output_path, transitions_file, archway_files):
+    gmap = GlobalMap(maps_dir, WALKABLE_COLORS, transitions_file=transitions_file,
+                     archway_files=archway_files)
+    gmap._ensure_transitions_loaded()
+    if gmap._overlay_index is None:
+        gmap._overlay_index = gmap._build_overlay_index()
+
+    # Antes de ler: chunk regravado durante a geração conta como alterado
+    fingerprints = gmap._chunk_store.fingerprints()
+    store = gmap._chunks
+    keys = sorted(set(store.keys()) | set(gmap._overlay_index.keys()))
+    print(f"Chunks: {len(store)} arquivos .map, {len(keys)} com máscara")
+
+    chunks = []
+    for i, (cx, cy, z) in enumerate(keys):
+        colors = store.get(cx, cy, z)
+        mask = gmap._build_walk_mask(cx, cy, z)
+        chunks.append(((cx, cy, z), bytes(colors) if colors is not None else None, mask))
+        if (i + 1) % 200 == 0:
+            print(f"  Processados {i + 1}/{len(keys)} chunks...")
+
+    transitions = [(x, y, z_from, z_to)
+                   for (x, y, z_from), z_tos in gmap._transition_lookup.items()
+                   for z_to in z_tos]
+    overrides = sorted(gmap._walkable_overrides)
+
+    write_atlas(output_path, chunks, gmap._walk_table, transitions, overrides, fingerprints)
+    return len(chunks), len(transitions), len(overrides)
+
+
+def main():
+    if len(sys.argv) > 1:
+        maps_dir = sys.argv[1]
+    else:
+        from config import MAPS_DIRECTORY
+        maps_dir = MAPS_DIRECTORY
+
+    if not os.path.isdir(maps_dir):
+        print(f"Diretorio nao encontrado: {maps_dir}")
+        sys.exit(1)
+
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(maps_dir, MAP_ATLAS_FILENAME)
+
+    project_root = os.path.join(os.path.dirname(__file__), '..')
+    transitions_file = os.path.join(project_root, "floor_transitions.json")
+    archway_files = [os.path.join(project_root, f"archway{i}.txt") for i in range(1, 5)]
+
+    print(f"Escaneando mapas em: {maps_dir}")
+    start_time = time.time()
+    n_chunks, n_trans, n_over = build_atlas(maps_dir, output_path, transitions_file, archway_files)
+
+    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"\nConcluido em {time.time() - start_time:.1f}s")
+    print(f"Chunks: {n_chunks}, Transicoes: {n_trans}, Archways: {n_over}")
+    print(f"Salvo em: {output_path} ({size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Gera os labels de conectividade (componentes conexas por andar) a partir dos .map.
+
+Cada chunk é rotulado em paralelo; o processo principal une os labels que se
+tocam nas bordas dos chunks e através das transições entre andares, e salva
+tudo em um único arquivo, carregado pelo GlobalMap via load_connectivity().
+
+Uso:
+    python utils/generate_connectivity.py [maps_directory] [output_file]
+
+Se maps_directory não for passado, usa MAPS_DIRECTORY do config.py.
+Se output_file não for passado, salva CONNECTIVITY_FILENAME dentro do diretório dos mapas.
+Rode novamente sempre que os .map, archways ou o floor_transitions.json mudarem.
+"""
+import os
+import sys
+import time
+import zlib
+import multiprocessing
+
+# Adiciona root do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.global_map import GlobalMap
+from core.connectivity import ConnectivityBuilder, label_chunk, border_strips
+from config import WALKABLE_COLORS, CONNECTIVITY_FILENAME
+
+
+# ── Worker para multiprocessing ──────────────────────────────────────────
+
+_worker_gmap = None
+
+def _init_worker(maps_dir, walkable_colors, transitions_file, archway_files):
+    """Inicializa GlobalMap por worker (cada processo tem seu próprio cache)."""
+    global _worker_gmap
+    _worker_gmap = GlobalMap(maps_dir, walkable_colors, transitions_file=transitions_file,
+                             archway_files=archway_files)
+    _worker_gmap._ensure_transitions_loaded()
+
+
+def _label_chunk(key):
+    """Rotula um chunk. Retorna (key, nº labels, labels comprimidos, bordas)."""
+    labels, count = label_chunk(_worker_gmap._get_walk_mask(*key))
+    if not count:
+        return key, 0, None, None
+    return key, count, zlib.compress(labels.tobytes(), 6), border_strips(labels)
+
+
+def build_connectivity(maps_dir, output_path, transitions_file, archway_files):
+    gmap = GlobalMap(maps_dir, WALKABLE_COLORS, transitions_file=transitions_file,
+                     archway_files=archway_files)
+    gmap._ensure_transitions_loaded()
+    # Antes de rotular: chunk regravado durante a geração conta como alterado
+    fingerprints = gmap._chunk_store.fingerprints()
+    chunk_keys = sorted(gmap._chunks.keys())
+    builder = ConnectivityBuilder()
+
+    num_workers = max(1, multiprocessing.cpu_count() - 1)
+    print(f"Rotulando {len(chunk_keys)} chunks com {num_workers} workers...", flush=True)
+
+    start_time = time.time()
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_init_worker,
+        initargs=(maps_dir, WALKABLE_COLORS, transitions_file, archway_files)
+    ) as pool:
+        for idx, (key, count, compressed, borders) in enumerate(
+                pool.imap_unordered(_label_chunk, chunk_keys)):
+            if count:
+                builder.add_chunk(key, count, compressed, borders)
+
+            if (idx + 1) % 20 == 0 or idx == 0:
+                elapsed = time.time() - start_time
+                rate = (idx + 1) / elapsed if elapsed > 0 else 0
+                remaining = (len(chunk_keys) - idx - 1) / rate if rate > 0 else 0
+                print(f"  {idx + 1}/{len(chunk_keys)} chunks rotulados "
+                      f"~{remaining:.0f}s restantes", flush=True)
+
+    transitions = [(x, y, z_from, z_to)
+                   for (x, y, z_from), targets in gmap._transition_lookup.items()
+                   for z_to in targets]
+    labels = builder.build(transitions)
+    labels.save(output_path, gmap.signature(), fingerprints)
+    return labels
+
+
+def main():
+    if len(sys.argv) > 1:
+        maps_dir = sys.argv[1]
+    else:
+        from config import MAPS_DIRECTORY
+        maps_dir = MAPS_DIRECTORY
+
+    if not os.path.isdir(maps_dir):
+        print(f"Diretorio nao encontrado: {maps_dir}")
+        sys.exit(1)
+
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(maps_dir, CONNECTIVITY_FILENAME)
+
+    project_root = os.path.join(os.path.dirname(__file__), '..')
+    transitions_file = os.path.join(project_root, "floor_transitions.json")
+    archway_files = [os.path.join(project_root, f"archway{i}.txt") for i in range(1, 5)]
+
+    print(f"Escaneando mapas em: {maps_dir}")
+    start_time = time.time()
+    labels = build_connectivity(maps_dir, output_path, transitions_file, archway_files)
+
+    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"\nConcluido em {time.time() - start_time:.1f}s")
+    print(f"Componentes: {labels.component_count}")
+    print(f"Salvo em: {output_path} ({size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
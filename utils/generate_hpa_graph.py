@@ -0,0 +1,107 @@
+"""Gera o grafo de clusters do pathfinding hierárquico (HPA*) a partir dos .map.
+
+Para cada chunk .map calcula os clusters (entradas nas bordas, tiles de
+transição e custos intra-cluster) e salva tudo em um único arquivo binário,
+carregado pelo GlobalMap via hpa_file / enable_hierarchical().
+
+Uso:
+    python utils/generate_hpa_graph.py [maps_directory] [output_file]
+
+Se maps_directory não for passado, usa MAPS_DIRECTORY do config.py.
+Se output_file não for passado, salva HPA_GRAPH_FILENAME dentro do diretório dos mapas.
+Rode novamente sempre que os .map, archways ou o floor_transitions.json mudarem.
+"""
+import os
+import sys
+import time
+import multiprocessing
+
+# Adiciona root do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.global_map import GlobalMap
+from core.hpa_pathfinder import HierarchicalPathfinder
+from config import WALKABLE_COLORS, HPA_GRAPH_FILENAME
+
+
+# ── Worker para multiprocessing ──────────────────────────────────────────
+
+_worker_hpa = None
+
+def _init_worker(maps_dir, walkable_colors, transitions_file, archway_files):
+    """Inicializa GlobalMap + HPA por worker (cada processo tem seu próprio cache)."""
+    global _worker_hpa
+    gmap = GlobalMap(maps_dir, walkable_colors, transitions_file=transitions_file,
+                     archway_files=archway_files)
+    _worker_hpa = HierarchicalPathfinder(gmap)
+
+
+def _compute_chunk(key):
+    """Calcula os clusters de um chunk. Retorna [(cluster_key, nodes, costs), ...]."""
+    _worker_hpa._clusters.clear()
+    _worker_hpa.build_chunk(*key)
+    return [(ckey, nodes, costs) for ckey, (nodes, _, costs) in _worker_hpa._clusters.items()]
+
+
+def build_hpa_graph(maps_dir, output_path, transitions_file, archway_files):
+    gmap = GlobalMap(maps_dir, WALKABLE_COLORS, transitions_file=transitions_file,
+                     archway_files=archway_files)
+    hpa = HierarchicalPathfinder(gmap)
+    # Antes de calcular: chunk regravado durante a geração conta como alterado
+    fingerprints = gmap._chunk_store.fingerprints()
+    chunk_keys = sorted(gmap._chunks.keys())
+
+    num_workers = max(1, multiprocessing.cpu_count() - 1)
+    print(f"Calculando clusters de {len(chunk_keys)} chunks com {num_workers} workers...", flush=True)
+
+    start_time = time.time()
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_init_worker,
+        initargs=(maps_dir, WALKABLE_COLORS, transitions_file, archway_files)
+    ) as pool:
+        for idx, records in enumerate(pool.imap_unordered(_compute_chunk, chunk_keys)):
+            for ckey, nodes, costs in records:
+                hpa._clusters[ckey] = (nodes, {xy: i for i, xy in enumerate(nodes)}, costs)
+
+            if (idx + 1) % 20 == 0 or idx == 0:
+                elapsed = time.time() - start_time
+                rate = (idx + 1) / elapsed if elapsed > 0 else 0
+                remaining = (len(chunk_keys) - idx - 1) / rate if rate > 0 else 0
+                print(f"  {idx + 1}/{len(chunk_keys)} chunks processados "
+                      f"({len(hpa._clusters)} clusters) ~{remaining:.0f}s restantes", flush=True)
+
+    hpa.save(output_path, fingerprints)
+    return hpa
+
+
+def main():
+    if len(sys.argv) > 1:
+        maps_dir = sys.argv[1]
+    else:
+        from config import MAPS_DIRECTORY
+        maps_dir = MAPS_DIRECTORY
+
+    if not os.path.isdir(maps_dir):
+        print(f"Diretorio nao encontrado: {maps_dir}")
+        sys.exit(1)
+
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(maps_dir, HPA_GRAPH_FILENAME)
+
+    project_root = os.path.join(os.path.dirname(__file__), '..')
+    transitions_file = os.path.join(project_root, "floor_transitions.json")
+    archway_files = [os.path.join(project_root, f"archway{i}.txt") for i in range(1, 5)]
+
+    print(f"Escaneando mapas em: {maps_dir}")
+    start_time = time.time()
+    hpa = build_hpa_graph(maps_dir, output_path, transitions_file, archway_files)
+
+    total_nodes = sum(len(nodes) for nodes, _, _ in hpa._clusters.values())
+    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"\nConcluido em {time.time() - start_time:.1f}s")
+    print(f"Clusters: {len(hpa._clusters)}, Nos abstratos: {total_nodes}")
+    print(f"Salvo em: {output_path} ({size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Gera a tabela de landmarks da heurística ALT do A* 3D a partir dos .map.
+
+Os landmarks são escolhidos por componente conexa (labels de conectividade,
+gerados antes se ainda não existirem), espalhados pela periferia de cada uma
+(farthest-point). As distâncias de/para cada landmark são calculadas em
+paralelo (um Dijkstra por direção) e salvas em um único arquivo, carregado
+pelo GlobalMap via load_landmarks().
+
+Uso:
+    python utils/generate_landmarks.py [maps_directory] [output_file] [landmarks_por_componente]
+
+Se maps_directory não for passado, usa MAPS_DIRECTORY do config.py.
+Se output_file não for passado, salva LANDMARKS_FILENAME dentro do diretório dos mapas.
+Rode novamente sempre que os .map, archways ou o floor_transitions.json mudarem.
+"""
+import os
+import re
+import sys
+import time
+import multiprocessing
+
+# Adiciona root do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.global_map import GlobalMap, LEVEL_PENALTY
+from core.connectivity import ConnectivityLabels
+from core.landmarks import LandmarkTable, landmark_blocks, pack_record
+from config import WALKABLE_COLORS, CONNECTIVITY_FILENAME, LANDMARKS_FILENAME
+
+DEFAULT_LANDMARKS = 16
+CANDIDATE_STEP = 32          # Um candidato por área de 32x32 tiles
+MIN_COMPONENT_CANDIDATES = 16  # Componentes menores que ~4 áreas não ganham landmarks
+
+_WALKABLE_RE = re.compile(rb"[^\x00]")
+
+
+# ── Worker para multiprocessing ──────────────────────────────────────────
+
+_worker_gmap = None
+
+def _init_worker(maps_dir, walkable_colors, transitions_file, archway_files, num_chunks):
+    """Inicializa GlobalMap por worker (cada processo tem seu próprio cache)."""
+    global _worker_gmap
+    _worker_gmap = GlobalMap(maps_dir, walkable_colors, transitions_file=transitions_file,
+                             archway_files=archway_files)
+    # O Dijkstra percorre a componente inteira: mantém todas as máscaras em memória
+    _worker_gmap._walk_masks_max = max(_worker_gmap._walk_masks_max, num_chunks)
+
+
+def _compute_landmark(args):
+    """Dijkstra de um landmark. Retorna (índice, reverse, {chunk: (lo, hi)})."""
+    idx, landmark, reverse = args
+    return idx, reverse, landmark_blocks(_worker_gmap, landmark, reverse)
+
+
+# ── Escolha dos landmarks ────────────────────────────────────────────────
+
+def _candidates(gmap, labels, chunk_keys):
+    """Um tile walkable por área CANDIDATE_STEP x CANDIDATE_STEP, agrupado por componente."""
+    by_component = {}
+    for cx, cy, z in chunk_keys:
+        mask = gmap._get_walk_mask(cx, cy, z)
+        for ax in range(0, 256, CANDIDATE_STEP):
+            for ay in range(0, 256, CANDIDATE_STEP):
+                for rx in range(ax, ax + CANDIDATE_STEP):
+                    m = _WALKABLE_RE.search(mask, (rx << 8) | ay, (rx << 8) | (ay + CANDIDATE_STEP))
+                    if m:
+                        x, y = (cx << 8) | rx, (cy << 8) | (m.start() & 255)
+                        component = labels.world_label(x, y, z)
+                        if component:
+                            by_component.setdefault(component, []).append((x, y, z))
+                        break
+    return by_component
+
+
+def _distance(a, b):
+    return 10 * (abs(a[0] - b[0]) + abs(a[1] - b[1])) + LEVEL_PENALTY * abs(a[2] - b[2])
+
+
+def select_landmarks(candidates, count):
+    """Farthest-point: começa pelo candidato mais distante do centro e segue maximizando a distância mínima."""
+    cx = sum(p[0] for p in candidates) / len(candidates)
+    cy = sum(p[1] for p in candidates) / len(candidates)
+    first = max(candidates, key=lambda p: abs(p[0] - cx) + abs(p[1] - cy))
+    chosen = [first]
+    nearest = [_distance(p, first) for p in candidates]
+    while len(chosen) < min(count, len(candidates)):
+        i = max(range(len(candidates)), key=nearest.__getitem__)
+        if nearest[i] == 0:
+            break
+        chosen.append(candidates[i])
+        nearest = [min(d, _distance(p, candidates[i])) for d, p in zip(nearest, candidates)]
+    return chosen
+
+
+# ── Build ────────────────────────────────────────────────────────────────
+
+def build_landmarks(maps_dir, output_path, transitions_file, archway_files,
+                    per_component=DEFAULT_LANDMARKS):
+    gmap = GlobalMap(maps_dir, WALKABLE_COLORS, transitions_file=transitions_file,
+                     archway_files=archway_files)
+    signature = gmap.signature()
+    # Antes das distâncias: chunk regravado durante a geração conta como alterado
+    fingerprints = gmap._chunk_store.fingerprints()
+    chunk_keys = sorted(gmap._chunks.keys())
+
+    connectivity_path = os.path.join(maps_dir, CONNECTIVITY_FILENAME)
+    labels = ConnectivityLabels.load(connectivity_path, signature)
+    if labels is not None and gmap._chunk_store.changed_chunks(labels.fingerprints):
+        labels = None
+    if labels is None:
+        print("Labels de conectividade ausentes ou desatualizados, gerando...", flush=True)
+        from utils.generate_connectivity import build_connectivity
+        labels = build_connectivity(maps_dir, connectivity_path, transitions_file, archway_files)
+
+    landmarks = []
+    for component, candidates in sorted(_candidates(gmap, labels, chunk_keys).items()):
+        if len(candidates) >= MIN_COMPONENT_CANDIDATES:
+            landmarks.extend(select_landmarks(candidates, per_component))
+    del gmap
+
+    work_items = [(i, landmark, reverse) for i, landmark in enumerate(landmarks)
+                  for reverse in (False, True)]
+    num_workers = max(1, min(len(work_items), multiprocessing.cpu_count() - 1))
+    print(f"Calculando {len(landmarks)} landmarks ({len(work_items)} Dijkstras) "
+          f"com {num_workers} workers...", flush=True)
+
+    records = {}
+    pending = {}   # índice -> blocos da primeira direção que chegou
+    start_time = time.time()
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_init_worker,
+        initargs=(maps_dir, WALKABLE_COLORS, transitions_file, archway_files, len(chunk_keys))
+    ) as pool:
+        for done, (idx, reverse, blocks) in enumerate(
+                pool.imap_unordered(_compute_landmark, work_items)):
+            other = pending.pop(idx, None)
+            if other is None:
+                pending[idx] = (reverse, blocks)
+            else:
+                from_blocks, to_blocks = (other[1], blocks) if reverse else (blocks, other[1])
+                for key in from_blocks.keys() | to_blocks.keys():
+                    records.setdefault(key, {})[idx] = pack_record(from_blocks.get(key),
+                                                                   to_blocks.get(key))
+
+            elapsed = time.time() - start_time
+            rate = (done + 1) / elapsed if elapsed > 0 else 0
+            remaining = (len(work_items) - done - 1) / rate if rate > 0 else 0
+            print(f"  {done + 1}/{len(work_items)} Dijkstras ~{remaining:.0f}s restantes", flush=True)
+
+    table = LandmarkTable(landmarks, records)
+    table.save(output_path, signature, fingerprints)
+    return table
+
+
+def main():
+    if len(sys.argv) > 1:
+        maps_dir = sys.argv[1]
+    else:
+        from config import MAPS_DIRECTORY
+        maps_dir = MAPS_DIRECTORY
+
+    if not os.path.isdir(maps_dir):
+        print(f"Diretorio nao encontrado: {maps_dir}")
+        sys.exit(1)
+
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(maps_dir, LANDMARKS_FILENAME)
+    per_component = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_LANDMARKS
+
+    project_root = os.path.join(os.path.dirname(__file__), '..')
+    transitions_file = os.path.join(project_root, "floor_transitions.json")
+    archway_files = [os.path.join(project_root, f"archway{i}.txt") for i in range(1, 5)]
+
+    print(f"Escaneando mapas em: {maps_dir}")
+    start_time = time.time()
+    table = build_landmarks(maps_dir, output_path, transitions_file, archway_files, per_component)
+
+    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"\nConcluido em {time.time() - start_time:.1f}s")
+    print(f"Landmarks: {len(table.landmarks)}")
+    print(f"Salvo em: {output_path} ({size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Pré-computa as rotas entre waypoints de um script do cavebot (bundle .routes).
+
+Uso:
+    python utils/generate_route_bundle.py <script> [maps_directory]
+
+<script> pode ser o caminho do .json ou só o nome dentro de cavebot_scripts/.
+Se maps_directory não for passado, usa MAPS_DIRECTORY do config.py.
+Salva <script>.routes ao lado do .json; o cavebot carrega o bundle junto com o
+script. Rode novamente sempre que editar os waypoints ou atualizar os mapas.
+"""
+import os
+import sys
+import json
+import time
+import multiprocessing
+
+# Adiciona root do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.global_map import GlobalMap
+from core.route_bundle import (bundle_path, waypoint_legs, waypoints_signature, write_bundle,
+                               KIND_SAME_FLOOR, KIND_MULTILEVEL)
+from config import WALKABLE_COLORS
+
+
+# ── Worker para multiprocessing ──────────────────────────────────────────
+
+_worker_gmap = None
+
+def _init_worker(maps_dir, walkable_colors, transitions_file, archway_files):
+    """Inicializa GlobalMap por worker (cada processo tem seu próprio cache)."""
+    global _worker_gmap
+    _worker_gmap = GlobalMap(maps_dir, walkable_colors, transitions_file=transitions_file,
+                             archway_files=archway_files)
+
+
+def _compute_leg(args):
+    """
+    Calcula a rota de um trecho com as mesmas chamadas do Cavebot._navigate_hybrid.
+    Retorna (idx, tipo, início, destino, path) ou (idx, None, início, destino, None).
+    """
+    idx, start, end = args
+    if start[2] == end[2]:
+        path = _worker_gmap.get_path_with_fallback(start, end, max_offset=2)
+        if path:
+            return (idx, KIND_SAME_FLOOR, start, end, path)
+    path = _worker_gmap.get_path_multilevel(start, end, offline=True)
+    if path:
+        return (idx, KIND_MULTILEVEL, start, end, path)
+    return (idx, None, start, end, None)
+
+
+# ── Build bundle ─────────────────────────────────────────────────────────
+
+def build_route_bundle(waypoints, maps_dir, walkable_colors, transitions_file, archway_files=None):
+    """Calcula a rota de cada trecho do script. Retorna lista ordenada de trechos."""
+    work_items = [(i, start, end) for i, (start, end) in enumerate(waypoint_legs(waypoints))
+                  if start != end]
+
+    num_workers = max(1, min(len(work_items), multiprocessing.cpu_count() - 1))
+    print(f"Calculando {len(work_items)} trechos com {num_workers} workers...", flush=True)
+
+    legs = {}
+    failed = 0
+    start_time = time.time()
+
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_init_worker,
+        initargs=(maps_dir, walkable_colors, transitions_file, archway_files)
+    ) as pool:
+        for idx, kind, start, end, path in pool.imap_unordered(_compute_leg, work_items):
+            if path:
+                legs[idx] = (kind, start, end, path)
+                label = "multifloor" if kind == KIND_MULTILEVEL else "mesmo andar"
+                print(f"  #{idx} {start} -> {end}: {len(path)} tiles ({label})", flush=True)
+            else:
+                failed += 1
+                print(f"  #{idx} {start} -> {end}: SEM CAMINHO", flush=True)
+
+    print(f"\nConcluido em {time.time() - start_time:.1f}s")
+    print(f"Trechos: {len(legs)}, Sem caminho: {failed}")
+    return [legs[i] for i in sorted(legs)]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    project_root = os.path.join(os.path.dirname(__file__), '..')
+    script_path = sys.argv[1]
+    if not os.path.isfile(script_path):
+        script_path = os.path.join(project_root, "cavebot_scripts", f"{sys.argv[1]}.json")
+    if not os.path.isfile(script_path):
+        print(f"Script nao encontrado: {sys.argv[1]}")
+        sys.exit(1)
+
+    if len(sys.argv) > 2:
+        maps_dir = sys.argv[2]
+    else:
+        from config import MAPS_DIRECTORY
+        maps_dir = MAPS_DIRECTORY
+
+    if not os.path.isdir(maps_dir):
+        print(f"Diretorio nao encontrado: {maps_dir}")
+        sys.exit(1)
+
+    with open(script_path, 'r', encoding='utf-8') as f:
+        waypoints = json.load(f)
+    if not isinstance(waypoints, list):
+        print(f"Formato de script invalido: {script_path}")
+        sys.exit(1)
+    # Mesma validação do Cavebot.load_waypoints (a assinatura é calculada sobre a lista validada)
+    waypoints = [wp for wp in waypoints
+                 if isinstance(wp, dict) and all(isinstance(wp.get(k), (int, float)) for k in ('x', 'y', 'z'))]
+    print(f"Script: {script_path} ({len(waypoints)} waypoints)")
+
+    transitions_file = os.path.join(project_root, "floor_transitions.json")
+    archway_files = [os.path.join(project_root, f"archway{i}.txt") for i in range(1, 5)]
+
+    gmap = GlobalMap(maps_dir, WALKABLE_COLORS, transitions_file=transitions_file,
+                     archway_files=archway_files)
+    map_signature = gmap.signature()
+    del gmap
+
+    legs = build_route_bundle(waypoints, maps_dir, WALKABLE_COLORS, transitions_file, archway_files)
+
+    output_path = bundle_path(script_path)
+    write_bundle(output_path, map_signature, waypoints_signature(waypoints), legs)
+
+    total_tiles = sum(len(leg[3]) for leg in legs)
+    size_kb = os.path.getsize(output_path) / 1024
+    print(f"\nSalvo em: {output_path} ({size_kb:.1f} KB, {total_tiles} tiles)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,11 @@
-"""Gera spawn_graph.json com custos A* pré-computados entre spawn points adjacentes.
+"""Gera spawn_graph.json com custos de rota pré-computados entre spawn points adjacentes.
+
+Cada spawn faz uma única expansão limitada a MAX_PATH_DIST (no grafo do
+get_path e, se houver vizinhos em outro andar, no do get_path_multilevel) que
+alcança todos os spawns vizinhos de uma vez, em vez de um A* independente por
+par. Os pares candidatos saem de uma grade espacial (células de
+NEIGHBOR_RADIUS), sem o loop O(n²). Com os labels de conectividade gerados,
+vizinhos inalcançáveis são descartados antes da expansão.
 
 Uso:
     python utils/generate_spawn_graph.py [maps_directory]
@@ -10,23 +17,58 @@ import os
 import sys
 import json
 import time
+import heapq
 import multiprocessing
 
 # Adiciona root do projeto ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from core.spawn_parser import parse_spawns
-from core.global_map import GlobalMap
-from config import WALKABLE_COLORS
+from core.global_map import GlobalMap, WALK_OPEN, COST_TRANSITION
+from config import WALKABLE_COLORS, CONNECTIVITY_FILENAME
 
 NEIGHBOR_RADIUS = 100   # Manhattan distance máxima entre spawns adjacentes
 MAX_FLOOR_DIFF = 1     # Diferença máxima de andares para considerar adjacência
+MAX_PATH_DIST = 200     # Limite da expansão (sqm), mesmo max_dist do get_path antigo
+
+# Movimentos do get_path (mesmo andar): (dx, dy, custo, offset na máscara)
+_FLOOR_MOVES = (
+    (0, 1, 10, 1), (0, -1, 10, -1), (1, 0, 10, 256), (-1, 0, 10, -256),
+    (1, 1, 35, 257), (1, -1, 35, 255), (-1, 1, 35, -255), (-1, -1, 35, -257),
+)
 
 
 def make_key(spawn):
     return f"{spawn.cx}_{spawn.cy}_{spawn.cz}"
 
 
+# ── Pares candidatos ─────────────────────────────────────────────────────
+
+def candidate_neighbors(spawns):
+    """
+    Vizinhos de cada spawn (Manhattan <= NEIGHBOR_RADIUS, dZ <= MAX_FLOOR_DIFF)
+    por grade espacial: só as 3x3 células ao redor precisam ser comparadas.
+
+    Returns:
+        {i: [j, ...]} com j > i (cada par aparece uma vez)
+    """
+    grid = {}
+    for i, s in enumerate(spawns):
+        grid.setdefault((s.cx // NEIGHBOR_RADIUS, s.cy // NEIGHBOR_RADIUS, s.cz), []).append(i)
+
+    neighbors = {}
+    for i, a in enumerate(spawns):
+        gx, gy = a.cx // NEIGHBOR_RADIUS, a.cy // NEIGHBOR_RADIUS
+        for z in range(a.cz - MAX_FLOOR_DIFF, a.cz + MAX_FLOOR_DIFF + 1):
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for j in grid.get((gx + dx, gy + dy, z), ()):
+                        b = spawns[j]
+                        if j > i and abs(a.cx - b.cx) + abs(a.cy - b.cy) <= NEIGHBOR_RADIUS:
+                            neighbors.setdefault(i, []).append(j)
+    return neighbors
+
+
 # ── Worker para multiprocessing ──────────────────────────────────────────
 
 _worker_gmap = None
@@ -36,56 +78,148 @@ def _init_worker(maps_dir, walkable_colors, transitions_file, archway_files):
     global _worker_gmap
     _worker_gmap = GlobalMap(maps_dir, walkable_colors, transitions_file=transitions_file,
                              archway_files=archway_files)
+    _worker_gmap._ensure_transitions_loaded()
+    # Labels de conectividade (se gerados) descartam vizinhos inalcançáveis antes da expansão
+    connectivity_path = os.path.join(maps_dir, CONNECTIVITY_FILENAME)
+    if os.path.isfile(connectivity_path):
+        _worker_gmap.load_connectivity(connectivity_path)
+
+
+def _snap_target(gmap, x, y, z):
+    """Mesmo ajuste do get_path: destino em parede vira o primeiro vizinho walkable."""
+    if gmap.is_walkable_offline(x, y, z):
+        return (x, y, z)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if (dx or dy) and gmap.is_walkable_offline(x + dx, y + dy, z):
+                return (x + dx, y + dy, z)
+    return None
 
 
-def _compute_pair(args):
-    """Calcula custo A* para um par de spawns. Retorna (key_a, key_b, cost) ou None."""
-    ax, ay, az, bx, by, bz, key_a, key_b = args
-    pos_a = (ax, ay, az)
-    pos_b = (bx, by, bz)
-
-    if az == bz:
-        path = _worker_gmap.get_path(pos_a, pos_b, max_dist=200, max_iter=3000, offline=True)
-    else:
-        path = _worker_gmap.get_path_multilevel(pos_a, pos_b, max_iter=5000, offline=True)
-
-    if path:
-        return (key_a, key_b, len(path))
-    return None
+def _floor_neighbors(gmap, x, y, z):
+    """Vizinhos do get_path (só WALK_OPEN, cardinal 10, diagonal 35), no formato do _get_neighbors_3d."""
+    rx, ry = x & 255, y & 255
+    if 0 < rx < 255 and 0 < ry < 255:
+        mask = gmap._get_walk_mask(x >> 8, y >> 8, z)
+        base = (rx << 8) | ry
+        return [((x + dx, y + dy, z), cost) for dx, dy, cost, offset in _FLOOR_MOVES
+                if mask[base + offset] == WALK_OPEN]
+    return [((x + dx, y + dy, z), cost) for dx, dy, cost, _ in _FLOOR_MOVES
+            if gmap._walk_value(x + dx, y + dy, z) == WALK_OPEN]
+
+
+def search_targets(start, targets, neighbors, max_cost):
+    """
+    Expansão única a partir de start que alcança todos os targets (Dijkstra
+    guiado por A*). A heurística é a distância até a caixa envolvente dos targets
+    pendentes (10 por tile, COST_TRANSITION por andar): nunca superestima, porque
+    diagonal nunca sai mais barata que dois cardinais, e custa O(1) por tile.
+    Quando um target é alcançado a caixa encolhe e a fila é re-priorizada.
+
+    Args:
+        targets: conjunto de tiles (x, y, z)
+        neighbors: função (x, y, z) -> [((nx, ny, nz), custo), ...]
+        max_cost: rotas mais caras que isso são ignoradas
+
+    Returns:
+        {tile: nº de passos da rota} dos targets alcançados
+    """
+    remaining = set(targets)
+    found = {}
+
+    def _box():
+        xs, ys, zs = zip(*remaining)
+        return min(xs), max(xs), min(ys), max(ys), min(zs), max(zs)
+
+    def _h(pos):
+        x, y, z = pos
+        return (10 * ((x0 - x if x < x0 else x - x1 if x > x1 else 0)
+                      + (y0 - y if y < y0 else y - y1 if y > y1 else 0))
+                + COST_TRANSITION * (z0 - z if z < z0 else z - z1 if z > z1 else 0))
+
+    x0, x1, y0, y1, z0, z1 = _box()
+    g_score = {start: 0}
+    heap = [(_h(start), 0, 0, start)]
+    while heap:
+        f, g, steps, pos = heapq.heappop(heap)
+        if f > max_cost:
+            break
+        if g > g_score[pos]:
+            continue
+
+        if pos in remaining:
+            remaining.discard(pos)
+            found[pos] = steps
+            if not remaining:
+                break
+            x0, x1, y0, y1, z0, z1 = _box()
+            heap = [(eg + _h(epos), eg, esteps, epos) for _, eg, esteps, epos in heap]
+            heapq.heapify(heap)
+
+        for neighbor, move_cost in neighbors(*pos):
+            new_g = g + move_cost
+            if new_g < g_score.get(neighbor, new_g + 1):
+                g_score[neighbor] = new_g
+                heapq.heappush(heap, (new_g + _h(neighbor), new_g, steps + 1, neighbor))
+    return found
+
+
+def _compute_spawn(args):
+    """
+    Custos do spawn até os vizinhos (nº de tiles da rota, como len(path) do A*).
+    Retorna (key_a, [(key_b, cost), ...], nº de vizinhos sem caminho).
+    """
+    ax, ay, az, key_a, neighbors = args
+    gmap = _worker_gmap
+    start = (ax, ay, az)
+    labels = gmap._connectivity
+
+    floor_targets = {}   # tile ajustado -> [key_b, ...]
+    multi_targets = {}
+    for bx, by, bz, key_b in neighbors:
+        target = _snap_target(gmap, bx, by, bz)
+        if target is None or target == start:
+            continue
+        if labels is not None and labels.disconnected(start, target, same_floor=(bz == az)):
+            continue
+        (floor_targets if bz == az else multi_targets).setdefault(target, []).append(key_b)
+
+    no_blocks = frozenset()
+    searches = (
+        (floor_targets, lambda x, y, z: _floor_neighbors(gmap, x, y, z)),
+        (multi_targets, lambda x, y, z: gmap._get_neighbors_3d(x, y, z, _blocked=no_blocks)),
+    )
+    edges = []
+    for targets, expand in searches:
+        if not targets:
+            continue
+        for target, steps in search_targets(start, targets, expand, MAX_PATH_DIST * 10).items():
+            edges.extend((key_b, steps) for key_b in targets[target])
+    return key_a, edges, len(neighbors) - len(edges)
 
 
 # ── Build graph ──────────────────────────────────────────────────────────
 
 def build_spawn_graph(spawns, maps_dir, walkable_colors, transitions_file, archway_files=None):
-    """Calcula custo A* entre todos os pares de spawns adjacentes."""
+    """Calcula o custo de rota entre todos os pares de spawns adjacentes."""
     total = len(spawns)
     print(f"Total de spawns: {total}")
 
-    # Pré-computar pares candidatos (filtro Manhattan)
-    pairs = []
-    for i, a in enumerate(spawns):
-        for j, b in enumerate(spawns):
-            if j <= i:
-                continue
-            dz = abs(a.cz - b.cz)
-            if dz > MAX_FLOOR_DIFF:
-                continue
-            manhattan = abs(a.cx - b.cx) + abs(a.cy - b.cy)
-            if manhattan > NEIGHBOR_RADIUS:
-                continue
-            pairs.append((i, j))
-
-    print(f"Pares candidatos (Manhattan <= {NEIGHBOR_RADIUS}, dZ <= {MAX_FLOOR_DIFF}): {len(pairs)}", flush=True)
-
-    # Preparar args para workers
+    neighbors = candidate_neighbors(spawns)
+    num_pairs = sum(len(v) for v in neighbors.values())
+    print(f"Pares candidatos (Manhattan <= {NEIGHBOR_RADIUS}, dZ <= {MAX_FLOOR_DIFF}): {num_pairs}", flush=True)
+
+    # Um item por spawn de origem; os com mais vizinhos primeiro (balanceia os workers)
     work_items = []
-    for i, j in pairs:
-        a, b = spawns[i], spawns[j]
-        work_items.append((a.cx, a.cy, a.cz, b.cx, b.cy, b.cz, make_key(a), make_key(b)))
+    for i in sorted(neighbors, key=lambda i: -len(neighbors[i])):
+        a = spawns[i]
+        work_items.append((a.cx, a.cy, a.cz, make_key(a),
+                           [(spawns[j].cx, spawns[j].cy, spawns[j].cz, make_key(spawns[j]))
+                            for j in neighbors[i]]))
 
     # Multiprocessing
     num_workers = max(1, multiprocessing.cpu_count() - 1)
-    print(f"Iniciando calculo de {len(pairs)} pares A* com {num_workers} workers...", flush=True)
+    print(f"Iniciando {len(work_items)} expansoes Dijkstra com {num_workers} workers...", flush=True)
 
     edges = {}
     computed = 0
@@ -97,21 +231,19 @@ def build_spawn_graph(spawns, maps_dir, walkable_colors, transitions_file, archw
         initializer=_init_worker,
         initargs=(maps_dir, walkable_colors, transitions_file, archway_files)
     ) as pool:
-        for idx, result in enumerate(pool.imap_unordered(_compute_pair, work_items, chunksize=20)):
-            if result is not None:
-                key_a, key_b, cost = result
+        for idx, (key_a, found, missing) in enumerate(pool.imap_unordered(_compute_spawn, work_items)):
+            for key_b, cost in found:
                 edges.setdefault(key_a, []).append({"to": key_b, "cost": cost})
                 edges.setdefault(key_b, []).append({"to": key_a, "cost": cost})
-                computed += 1
-            else:
-                failed += 1
+            computed += len(found)
+            failed += missing
 
             # Progress
             if (idx + 1) % 100 == 0 or idx == 0:
                 elapsed = time.time() - start_time
                 rate = (idx + 1) / elapsed if elapsed > 0 else 0
-                remaining = (len(pairs) - idx - 1) / rate if rate > 0 else 0
-                print(f"  {idx + 1}/{len(pairs)} pares processados "
+                remaining = (len(work_items) - idx - 1) / rate if rate > 0 else 0
+                print(f"  {idx + 1}/{len(work_items)} spawns processados "
                       f"({computed} conexoes, {failed} sem caminho) "
                       f"~{remaining:.0f}s restantes", flush=True)
 
@@ -3,10 +3,11 @@ Real-Time Minimap Visualizer for Cavebot
 Generates minimap images with optimized caching for high-frequency updates
 """
 
-import os
 from PIL import Image
 from collections import defaultdict, OrderedDict
 
+from core.chunk_store import get_chunk_store
+
 
 class RealtimeMinimapVisualizer:
     """
@@ -38,10 +39,9 @@ class RealtimeMinimapVisualizer:
         self.base_map_cache = OrderedDict()
         self._base_map_cache_max = 20  # ~3 MB max (150x150 RGB = ~68 KB each)
 
-        # Cache of raw chunk data from disk
-        # Key: (cx, cy, z) -> bytes
-        self.chunk_cache = OrderedDict()
-        self._chunk_cache_max = 50  # ~3.2 MB max (64 KB each)
+        # Raw chunk data comes from the process-wide chunk store
+        # (shared with GlobalMap, so chunks are never loaded twice)
+        self.chunk_store = get_chunk_store(maps_dir)
 
     def generate_minimap(self, player_pos, target_wp, all_waypoints,
                         global_route=None, local_cache=None, current_wp_index=None,
@@ -163,35 +163,8 @@ class RealtimeMinimapVisualizer:
         return img, pixels_per_tile
 
     def _load_chunk(self, cx, cy, z):
-        """Load chunk from disk (with LRU cache)."""
-        cache_key = (cx, cy, z)
-
-        if cache_key in self.chunk_cache:
-            # Move to end (most recently used)
-            self.chunk_cache.move_to_end(cache_key)
-            return self.chunk_cache[cache_key]
-
-        # Try both filename formats
-        filenames = [f"{cx:03}{cy:03}{z:02}.map", f"{cx}{cy}{z:02}.map"]
-
-        for fname in filenames:
-            path = os.path.join(self.maps_dir, fname)
-            if os.path.exists(path):
-                try:
-                    with open(path, "rb") as f:
-                        data = f.read()
-                    self.chunk_cache[cache_key] = data
-
-                    # LRU eviction: remove oldest entries if over limit
-                    while len(self.chunk_cache) > self._chunk_cache_max:
-                        self.chunk_cache.popitem(last=False)
-
-                    return data
-                except Exception as e:
-                    print(f"[Minimap] Error loading chunk {fname}: {e}")
-                    return None
-
-        return None
+        """Get chunk data (bytes) from the shared chunk store."""
+        return self.chunk_store.get(cx, cy, z)
 
     def _render_chunk_to_image(self, pixels, chunk_data, cx, cy, bbox, pixels_per_tile):
         """
@@ -490,5 +463,9 @@ class RealtimeMinimapVisualizer:
         self.base_map_cache.clear()
 
     def clear_chunk_cache(self):
-        """Clear chunk cache to free memory."""
-        self.chunk_cache.clear()
+        """
+        Drop terrain rendered from chunk data so it is rebuilt on the next update.
+        The shared chunk store is left alone (other consumers use it); it finds
+        newly saved chunk files on its own.
+        """
+        self.base_map_cache.clear()
@@ -0,0 +1,127 @@
+"""Mede o throughput dos scanners de memória a partir de uma gravação (sem o cliente).
+
+A gravação é feita pelo bot com MEMORY_RECORDING_FILE no config.py
+(core/memory_replay.py). Cada scanner roda em loop sobre o replay, do início
+ao fim da gravação, com o relógio acelerado por speed.
+
+Uso:
+    python utils/replay_benchmark.py gravacao.mbrec [speed] [scanner ...]
+
+speed: aceleração do relógio do replay (padrão 10; 1 = tempo real).
+scanner: battlelist, memory_map, containers, game_state (padrão: todos).
+Scanners cujo módulo não importa neste ambiente são pulados.
+"""
+import os
+import sys
+import time
+
+# Adiciona root do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.memory_replay import ReplayMemory
+
+
+# ── Scanners ─────────────────────────────────────────────────────────────
+# Cada fábrica recebe (pm, base_addr) e retorna a função medida por chamada.
+
+def _battlelist(pm, base_addr):
+    from core.battlelist import BattleListScanner
+    return BattleListScanner(pm, base_addr).scan_all
+
+
+def _memory_map(pm, base_addr):
+    from core.memory_map import MemoryMap
+    from core.player_core import get_player_id
+    memory_map = MemoryMap(pm, base_addr)
+    return lambda: memory_map.read_full_map(get_player_id(pm, base_addr))
+
+
+def _containers(pm, base_addr):
+    from modules.auto_loot import scan_containers
+    return lambda: scan_containers(pm, base_addr)
+
+
+def _game_state(pm, base_addr):
+    from core.game_state import GameState
+    from core.battlelist import BattleListScanner
+    from core.memory_map import MemoryMap
+    from core.map_analyzer import MapAnalyzer
+    # Sem init(): não sobe a thread de polling, o benchmark chama _update_state direto
+    gs = GameState()
+    gs.pm, gs.base_addr = pm, base_addr
+    gs.battlelist = BattleListScanner(pm, base_addr)
+    gs.memory_map = MemoryMap(pm, base_addr)
+    gs.map_analyzer = MapAnalyzer(gs.memory_map)
+    return gs._update_state
+
+
+SCANNERS = {
+    "battlelist": _battlelist,
+    "memory_map": _memory_map,
+    "containers": _containers,
+    "game_state": _game_state,
+}
+
+
+def run_scanner(replay, name, speed):
+    """Roda um scanner do início ao fim da gravação. Retorna dict de estatísticas ou None."""
+    try:
+        scan = SCANNERS[name](replay, replay.base_addr)
+    except ImportError as e:
+        print(f"  {name:<12} indisponível neste ambiente ({e})")
+        return None
+
+    replay.speed = speed
+    replay.seek(0.0)
+    reads_before = replay.reads
+    durations = []
+    errors = 0
+    wall_start = time.perf_counter()
+    while not replay.finished():
+        t0 = time.perf_counter()
+        try:
+            scan()
+        except Exception:
+            errors += 1
+        durations.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - wall_start
+
+    durations.sort()
+    calls = len(durations)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "mean_ms": sum(durations) / calls * 1000 if calls else 0.0,
+        "p95_ms": durations[int(calls * 0.95)] * 1000 if calls else 0.0,
+        "calls_per_s": calls / wall if wall > 0 else 0.0,
+        "reads_per_call": (replay.reads - reads_before) / calls if calls else 0.0,
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    path = sys.argv[1]
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    names = sys.argv[3:] or list(SCANNERS)
+    unknown = [n for n in names if n not in SCANNERS]
+    if unknown:
+        print(f"Scanners desconhecidos: {', '.join(unknown)} (opções: {', '.join(SCANNERS)})")
+        sys.exit(1)
+
+    replay = ReplayMemory(path)
+    print(f"Gravação: {path} ({replay.duration:.1f}s, base 0x{replay.base_addr:X}), speed={speed:g}x")
+    print(f"  {'scanner':<12} {'chamadas':>9} {'erros':>6} {'média ms':>9} {'p95 ms':>8} "
+          f"{'chamadas/s':>11} {'leituras/chamada':>17}")
+    for name in names:
+        stats = run_scanner(replay, name, speed)
+        if stats is None:
+            continue
+        print(f"  {name:<12} {stats['calls']:>9} {stats['errors']:>6} {stats['mean_ms']:>9.3f} "
+              f"{stats['p95_ms']:>8.3f} {stats['calls_per_s']:>11.1f} {stats['reads_per_call']:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
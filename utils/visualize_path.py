@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import MAPS_DIRECTORY, WALKABLE_COLORS
 from core.global_map import GlobalMap
+from core.chunk_store import get_chunk_store
 from utils.color_palette import get_color
 
 # Arquivos de stone archways (tiles que aparecem como montanha mas são walkable)
@@ -58,20 +59,15 @@ def create_visualization(maps_dir, path_data, output_filename="debug_mapa.png",
     pixels = img.load()
 
     # 3. Carregar o Mapa de Fundo
+    chunks = get_chunk_store(maps_dir)
     start_cx, end_cx = min_x // 256, max_x // 256
     start_cy, end_cy = min_y // 256, max_y // 256
     
     for cx in range(start_cx, end_cx + 1):
         for cy in range(start_cy, end_cy + 1):
-            filenames = [f"{cx:03}{cy:03}{z:02}.map", f"{cx}{cy}{z:02}.map"]
-            map_data = None
-            for fname in filenames:
-                p = os.path.join(maps_dir, fname)
-                if os.path.exists(p):
-                    with open(p, "rb") as f: map_data = f.read()
-                    break
-            
-            if map_data:
+            map_data = chunks.get(cx, cy, z)
+
+            if map_data is not None:
                 base_x, base_y = cx * 256, cy * 256
                 for i, val in enumerate(map_data):
                     if val == 0: continue
@@ -246,21 +242,15 @@ def _create_floor_visualization(maps_dir, path_coords, transitions, output_file,
     pixels = img.load()
 
     # Carregar chunks do mapa
+    chunks = get_chunk_store(maps_dir)
     start_cx, end_cx = min_x // 256, max_x // 256
     start_cy, end_cy = min_y // 256, max_y // 256
 
     for cx in range(start_cx, end_cx + 1):
         for cy in range(start_cy, end_cy + 1):
-            filenames = [f"{cx:03}{cy:03}{floor_z:02}.map", f"{cx}{cy}{floor_z:02}.map"]
-            map_data = None
-            for fname in filenames:
-                p = os.path.join(maps_dir, fname)
-                if os.path.exists(p):
-                    with open(p, "rb") as f:
-                        map_data = f.read()
-                    break
-
-            if map_data:
+            map_data = chunks.get(cx, cy, floor_z)
+
+            if map_data is not None:
                 base_x, base_y = cx * 256, cy * 256
                 for i, val in enumerate(map_data):
                     if val == 0: